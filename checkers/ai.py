@@ -0,0 +1,535 @@
+"""
+Computer opponent for checkers: negamax with alpha-beta pruning, iterative
+deepening and a transposition table, using the rules module the Board uses.
+
+A move in the search is a whole turn. The Board keeps the same player moving
+while the piece that just captured can capture again, so a capture turn is
+a full jump route (see capture_turns) and never half of one.
+
+The search runs on a plain copy of the board in a background thread so the
+main loop can keep drawing at FPS, the main loop only polls for the result.
+The thread can also post a pygame event when it is done, to wake up a main
+loop that is sleeping until something happens.
+"""
+import threading
+import time
+
+from . import rules
+from . import zobrist
+from .constants import DARK_PINK, ROWS
+
+WIN_SCORE = 100000  # more than any material count could ever be
+# scores past this are wins or losses, no search gets 1000 plies deep
+WIN_BOUND = WIN_SCORE - 1000
+PAWN_VALUE = 100
+KING_VALUE = 300  # same 1 to 3 ratio as Piece.points
+SAFETY_MARGIN = 0.5  # seconds always left on the clock after thinking
+
+
+class SearchTimeout(Exception):
+    """Raised inside the search when the time is up or it was cancelled."""
+
+
+def evaluate(grid, color):
+    """
+    Scores the position from color's point of view: material first, then a
+    little bonus for pawns that are closer to becoming kings.
+
+    Args:
+        grid (list): the board
+        color (tuple): the side to score for
+    Raises:
+        None
+    Returns:
+        int: positive if color is better
+    """
+    score = 0
+    for row in grid:
+        for piece in row:
+            if piece == 0:
+                continue
+            if piece.king:
+                value = KING_VALUE
+            else:
+                # rows advanced towards the last row
+                if piece.color == DARK_PINK:
+                    advanced = piece.row
+                else:
+                    advanced = ROWS - 1 - piece.row
+                value = PAWN_VALUE + advanced * 2
+            score += value if piece.color == color else -value
+    return score
+
+
+def score_to_table(score, ply):
+    """
+    Wins and losses are scored by how many plies from the root they are,
+    the same position reached at another ply would get a different score
+    out of the table. So they are stored counted from the position itself.
+
+    Args:
+        score (int): score from the search, counted from the root
+        ply (int): plies between the root and the position
+    Returns:
+        int: score counted from the position
+    """
+    if score > WIN_BOUND:
+        return score + ply
+    if score < -WIN_BOUND:
+        return score - ply
+    return score
+
+
+def score_from_table(score, ply):
+    """
+    The other way round from score_to_table, for a stored score probed at
+    this ply.
+
+    Args:
+        score (int): score from the table, counted from the position
+        ply (int): plies between the root and the position
+    Returns:
+        int: score counted from the root
+    """
+    if score > WIN_BOUND:
+        return score - ply
+    if score < -WIN_BOUND:
+        return score + ply
+    return score
+
+
+def make_turn(grid, piece, route, steps):
+    """
+    Plays a whole turn the way the Board does it, one click at a time, so a
+    pawn that is promoted halfway goes on jumping as a king.
+
+    Args:
+        grid (list): the board
+        piece (Piece): the piece that moves
+        route (tuple): (row, column) squares from the piece's square to
+            where it ends up, one for every click
+        steps (list): the pieces taken by each click, a list for each
+            square of the route after the first
+    Raises:
+        None
+    Returns:
+        tuple: (records, key) the rules.make_move records to pass to
+        unmake_turn and what the turn changes in the Zobrist key (without
+        the side to move)
+    """
+    records = []
+    key = 0
+    for (row, col), taken in zip(route[1:], steps):
+        record = rules.make_move(grid, piece, row, col, taken)
+        moved = record.piece  # still the pawn object if it got promoted
+        key ^= zobrist.move_key(
+            moved.color, moved.king, record.origin, (row, col),
+            record.captured, record.promoted,
+        )
+        records.append(record)
+        piece = grid[row][col]  # the new king if it got promoted
+    return records, key
+
+
+def unmake_turn(grid, records):
+    """Takes back a turn made with make_turn."""
+    for record in reversed(records):
+        rules.unmake_move(grid, record)
+
+
+def capture_turns(grid, piece):
+    """
+    The complete capture turns of a piece, the Board keeps the turn going
+    while the piece that captured can capture again.
+
+    A pawn's are the routes of rules.capture_sequences, one jump a click: it
+    only goes forward, so the pieces it took (which the Board takes off
+    after every click) are always behind it. Only a pawn promoted on the
+    way can have more to take, as a king, after the route.
+
+    A king can go round in a circle, and a click on a square takes the
+    last path find_captures found to it (more than one jump sometimes), so
+    its turns are every way of clicking through get_capture_moves like on
+    the Board, each end found once.
+
+    Args:
+        grid (list): the board, changed while searching and restored
+        piece (Piece): the piece that captures
+    Returns:
+        list: (route, steps) pairs for make_turn
+    """
+    if piece.king:
+        turns = []
+        _king_turns(grid, piece, ((piece.row, piece.column),), [], turns,
+                    set())
+        return turns
+
+    turns = []
+    for route, captured in rules.capture_sequences(grid, piece):
+        steps = [[taken] for taken in captured]
+        records, _ = make_turn(grid, piece, route, steps)
+        row, col = route[-1]
+        try:
+            if rules.can_capture(grid, grid[row][col]):  # promoted
+                for more_route, more_steps in capture_turns(
+                    grid, grid[row][col]
+                ):
+                    turns.append((route + more_route[1:], steps + more_steps))
+            else:
+                turns.append((route, steps))
+        finally:
+            unmake_turn(grid, records)
+    return turns
+
+
+def _king_turns(grid, piece, route, steps, turns, seen):
+    for (row, col), taken in rules.get_capture_moves(grid, piece).items():
+        record = rules.make_move(grid, piece, row, col, taken)
+        try:
+            more_route = route + ((row, col),)
+            more_steps = steps + [taken]
+            if rules.can_capture(grid, grid[row][col]):
+                _king_turns(grid, grid[row][col], more_route, more_steps,
+                            turns, seen)
+            else:
+                # the same end through other clicks is the same turn
+                end = ((row, col), frozenset(
+                    (captured.row, captured.column)
+                    for step in more_steps for captured in step
+                ))
+                if end not in seen:
+                    seen.add(end)
+                    turns.append((more_route, more_steps))
+        finally:
+            rules.unmake_move(grid, record)
+
+
+def captured_count(move):
+    return sum(len(taken) for taken in move[2])
+
+
+def generate_moves(grid, color, forced=False):
+    """
+    Every turn for color with the biggest captures first, which makes the
+    alpha-beta cut much more.
+
+    Args:
+        grid (list): the board
+        color (tuple): the side to move
+        forced (bool, optional): only captures when there is one (forced
+            captures rule). Defaults to False
+    Returns:
+        list: (piece, route, steps) tuples like make_turn takes, the route
+        starts with the piece's own square
+    """
+    pieces = rules.get_all_pieces(grid, color)
+    quiet = not (forced and rules.has_capture(grid, pieces))
+    moves = []
+    for piece in pieces:
+        origin = (piece.row, piece.column)
+        if quiet:
+            for target in rules.get_regular_moves(grid, piece):
+                moves.append((piece, (origin, target), [[]]))
+        for route, steps in capture_turns(grid, piece):
+            moves.append((piece, route, steps))
+    moves.sort(key=captured_count, reverse=True)
+    return moves
+
+
+class AIPlayer:
+    """
+    The computer player. Call start() when it is its turn, then poll()
+    every frame until it hands back a move.
+
+    Attributes:
+        color (tuple): the color the computer plays
+        max_depth (int): deepest iteration of the search
+        max_think_time (float): most seconds spent on one move
+        moves_to_go (int): the clock is shared as if this many moves were left
+        nodes (int): positions searched for the last move
+        depth (int): last depth the search fully finished
+        nps (float): nodes per second of the last search
+        table (TranspositionTable): search results kept between moves
+        forced_captures (bool): whether it plays with mandatory captures,
+            start() copies it from the board
+        done_event (int): pygame event type posted when a search ends, or
+            None to post nothing
+    """
+
+    def __init__(
+        self, color=DARK_PINK, max_depth=32, max_think_time=2.0,
+        moves_to_go=20, table_size=1 << 16, forced_captures=False,
+        done_event=None,
+    ):
+        """
+        Creates the computer player.
+
+        Args:
+            color (tuple, optional): color it plays. Defaults to DARK_PINK
+            max_depth (int, optional): deepest search. Defaults to 32
+            max_think_time (float, optional): seconds per move. Defaults to 2
+            moves_to_go (int, optional): how many moves the remaining clock
+                time is split between. Defaults to 20
+            table_size (int, optional): transposition table slots.
+                Defaults to 65536
+            forced_captures (bool, optional): mandatory captures.
+                Defaults to False
+            done_event (int, optional): pygame event type to post when the
+                move is ready. Defaults to None
+        """
+        self.color = color
+        self.max_depth = max_depth
+        self.max_think_time = max_think_time
+        self.moves_to_go = moves_to_go
+        self.table = zobrist.TranspositionTable(table_size)
+        self.forced_captures = forced_captures
+        self.done_event = done_event
+        self.nodes = 0
+        self.depth = 0
+        self.nps = 0.0
+        self._deadline = 0.0
+        self._seen = set()  # keys of the game so far and the line searched
+        self._stop = threading.Event()
+        self._finished = threading.Event()  # the result is ready
+        self._thread = None
+        self._result = None
+
+    def think_time(self, time_left):
+        """
+        Seconds the computer may use for this move, always leaving the
+        safety margin on its PlayerTimer.
+
+        Args:
+            time_left (float): seconds left on the computer's clock
+        Returns:
+            float: seconds to think
+        """
+        budget = min(self.max_think_time, time_left / self.moves_to_go)
+        return max(0.0, min(budget, time_left - SAFETY_MARGIN))
+
+    # ___________ search ___________
+    def choose_move(self, grid, color, think_time, only=None, history=()):
+        """
+        Searches deeper and deeper until the time is up and returns the best
+        move of the deepest finished search. Blocks, so the game calls it
+        through start() instead.
+
+        Args:
+            grid (list): the board, changed during the search and restored
+            color (tuple): side to move
+            think_time (float): seconds to search
+            only (tuple, optional): (row, column) of the piece that must move
+                and may only capture, for the rest of a multi-jump
+            history (iterable, optional): Zobrist keys of the positions the
+                game had so far, a move back into one of them is scored as
+                a draw. Defaults to none
+        Raises:
+            None
+        Returns:
+            tuple: the route, (row, column) of the piece and then every
+            square it lands on, one jump at a time. None if there is no move
+            at all
+        """
+        start = time.perf_counter()
+        self._deadline = start + think_time
+        self.nodes = 0
+        self.depth = 0
+        self._seen = set(history)
+        if only is None:  # in the middle of a jump it's not a turn's end
+            self._seen.add(zobrist.hash_grid(grid, color))
+
+        moves = generate_moves(grid, color, self.forced_captures)
+        if only is not None:
+            moves = [
+                move for move in moves
+                if move[1][0] == only and captured_count(move)
+            ]
+        if not moves:
+            return None
+
+        best = moves[0]  # something to play even if depth 1 isn't done
+        try:
+            for depth in range(1, self.max_depth + 1):
+                best = self._search_root(grid, color, depth, moves)
+                self.depth = depth
+                # the best move goes first in the next iteration
+                moves.remove(best)
+                moves.insert(0, best)
+        except SearchTimeout:
+            pass
+
+        elapsed = time.perf_counter() - start
+        self.nps = self.nodes / elapsed if elapsed > 0 else 0.0
+        return best[1]
+
+    def _search_root(self, grid, color, depth, moves):
+        key = zobrist.hash_grid(grid, color)
+        alpha = -WIN_SCORE - 1
+        best = moves[0]
+        for move in moves:
+            piece, route, steps = move
+            records, change = make_turn(grid, piece, route, steps)
+            try:
+                score = -self._negamax(
+                    grid, rules.opponent(color), depth - 1,
+                    -WIN_SCORE - 1, -alpha, 1,
+                    key ^ zobrist.SIDE_KEY ^ change,
+                )
+            finally:
+                unmake_turn(grid, records)
+            if score > alpha:
+                alpha = score
+                best = move
+        return best
+
+    def _negamax(self, grid, color, depth, alpha, beta, ply, key):
+        self.nodes += 1
+        if self.nodes & 1023 == 0:
+            if self._stop.is_set() or time.perf_counter() > self._deadline:
+                raise SearchTimeout()
+            time.sleep(0)  # let the drawing thread have the GIL
+
+        # back in a position the game or this line already had: going round
+        # again ends in the threefold repetition draw, so it's scored as one
+        if key in self._seen:
+            return 0
+
+        if depth <= 0:
+            return evaluate(grid, color)
+
+        # the same position may have been searched already, through another
+        # move order or on an earlier iteration
+        entry = self.table.probe(key)
+        best_move = None
+        if entry is not None:
+            if entry.depth >= depth:
+                score = score_from_table(entry.score, ply)
+                if entry.flag == zobrist.EXACT:
+                    return score
+                if entry.flag == zobrist.LOWER:
+                    alpha = max(alpha, score)
+                else:
+                    beta = min(beta, score)
+                if alpha >= beta:
+                    return score
+            best_move = entry.move
+
+        moves = generate_moves(grid, color, self.forced_captures)
+        if not moves:
+            # no pieces or no moves left loses, sooner is worse
+            return -WIN_SCORE + ply
+        if best_move is not None:
+            # what was best last time is tried first
+            for index, move in enumerate(moves):
+                if move[1] == best_move:
+                    moves.insert(0, moves.pop(index))
+                    break
+
+        original_alpha = alpha
+        best_score = -WIN_SCORE - 1
+        self._seen.add(key)  # on the line while its moves are searched
+        try:
+            for piece, route, steps in moves:
+                records, change = make_turn(grid, piece, route, steps)
+                try:
+                    score = -self._negamax(
+                        grid, rules.opponent(color), depth - 1, -beta,
+                        -alpha, ply + 1, key ^ zobrist.SIDE_KEY ^ change,
+                    )
+                finally:
+                    unmake_turn(grid, records)
+                if score > best_score:
+                    best_score = score
+                    best_move = route
+                if score > alpha:
+                    alpha = score
+                if alpha >= beta:
+                    break
+        finally:
+            self._seen.discard(key)
+
+        if best_score >= beta:
+            flag = zobrist.LOWER
+        elif best_score <= original_alpha:
+            flag = zobrist.UPPER
+        else:
+            flag = zobrist.EXACT
+        self.table.store(
+            key, depth, score_to_table(best_score, ply), flag, best_move
+        )
+        return best_score
+
+    # ___________ running next to the game loop ___________
+    @property
+    def thinking(self):
+        return self._thread is not None
+
+    def start(self, board, time_left):
+        """
+        Starts thinking about the board's position in the background.
+
+        Args:
+            board (Board): the game, only copied, never changed
+            time_left (float): seconds left on the computer's PlayerTimer
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.cancel()
+        grid = rules.copy_grid(board.board)
+        if board.forced_captures != self.forced_captures:
+            # the stored results were for the other rules
+            self.table.clear()
+            self.forced_captures = board.forced_captures
+        only = None
+        if board.selected is not None:  # in the middle of a multi-jump
+            only = (board.selected.row, board.selected.column)
+        history = tuple(board.position_counts)  # the keys, copied
+        think_time = self.think_time(time_left)
+        self._stop.clear()
+        self._finished.clear()
+        self._result = None
+        self._thread = threading.Thread(
+            target=self._run,
+            args=(grid, board.turn, think_time, only, history),
+            daemon=True,
+        )
+        self._thread.start()
+
+    def _run(self, grid, color, think_time, only, history):
+        self._result = self.choose_move(
+            grid, color, think_time, only, history
+        )
+        self._finished.set()
+        if self.done_event is not None:
+            import pygame  # only the game needs it, the search doesn't
+
+            # posting is thread safe, poll() picks the result up
+            pygame.event.post(pygame.event.Event(self.done_event))
+
+    def poll(self):
+        """
+        Checks if the background search is done. How it went is left in
+        depth, nodes and nps for whoever wants to show it.
+
+        Returns:
+            tuple: the move as in choose_move once it is ready, None while
+            still thinking
+        """
+        # the thread may still be finishing up after posting done_event
+        if self._thread is None or not self._finished.is_set():
+            return None
+        self._thread.join()
+        self._thread = None
+        return self._result
+
+    def cancel(self):
+        """
+        Stops a search that is still running and forgets its result.
+        """
+        if self._thread is not None:
+            self._stop.set()
+            self._thread.join()
+            self._thread = None
+        self._result = None
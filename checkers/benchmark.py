@@ -0,0 +1,466 @@
+"""
+Benchmarks for the checkers code, each one prints how long the old way and
+the new way take on the same work.
+
+Usage:
+    python -m checkers.benchmark captures
+    python -m checkers.benchmark frame
+    python -m checkers.benchmark render --budget 10
+
+The drawing benchmarks need no real screen, they run with SDL's dummy video
+driver. render exits with 1 when a position takes longer than --budget
+milliseconds a frame, so it can catch drawing getting slower on a machine
+without a display.
+"""
+import argparse
+import contextlib
+import os
+import time
+import tracemalloc
+
+from . import rules
+from .constants import BLUE, DARK_PINK, SQUARE_SIZE
+from .perft import parse_position
+
+# crowded king endgames, where find_captures has the most paths to walk
+DENSE_POSITIONS = {
+    "king lattice": """
+        ........
+        P.P.P.P.
+        ........
+        P.P.P.P.
+        ...B....
+        P.P.P.P.
+        ........
+        P.P.P.P.
+    """,
+    "kings everywhere": """
+        .P...P..
+        ........
+        .P.P.P.P
+        B.......
+        .P.P.P.P
+        ......B.
+        .P.P.P.P
+        ........
+    """,
+    # a ring the king can go round either way, then the same jumps follow
+    "king ring": """
+        .B......
+        ..p.p.p.
+        ........
+        ..p.p.p.
+        ........
+        ..p.p.p.
+        ........
+        ........
+    """,
+}
+
+
+def grid_from_text(text):
+    """
+    Builds a plain grid (no pygame pieces) from a position in the perft
+    text format.
+
+    Args:
+        text (str): the 8 lines
+    Returns:
+        list: grid of rules.Checker pieces
+    """
+    grid = [[0] * 8 for _ in range(8)]
+    for row, column, color, king in parse_position(text).cells():
+        grid[row][column] = rules.Checker(row, column, color, king)
+    return grid
+
+
+def time_per_call(function, repeat, rounds=5):
+    """
+    Times repeat calls rounds times and keeps the quickest round, the slow
+    ones are other programs getting in the way, not the function.
+
+    Returns:
+        float: average seconds per call of function() in the best round
+    """
+    best = None
+    for _ in range(rounds):
+        start = time.perf_counter()
+        for _ in range(repeat):
+            function()
+        elapsed = time.perf_counter() - start
+        if best is None or elapsed < best:
+            best = elapsed
+    return best / repeat
+
+
+def bench_captures(repeat=200):
+    """
+    find_captures (through get_capture_moves) against capture_sequences for
+    every piece of both colors on the dense positions.
+
+    Args:
+        repeat (int, optional): calls timed per position. Defaults to 200
+    Raises:
+        None
+    Returns:
+        None: prints the results
+    """
+    for name, text in DENSE_POSITIONS.items():
+        grid = grid_from_text(text)
+        pieces = (
+            rules.get_all_pieces(grid, BLUE)
+            + rules.get_all_pieces(grid, DARK_PINK)
+        )
+
+        def old():
+            return [rules.get_capture_moves(grid, piece) for piece in pieces]
+
+        def new():
+            return [rules.capture_sequences(grid, piece) for piece in pieces]
+
+        old_time = time_per_call(old, repeat)
+        new_time = time_per_call(new, repeat)
+        landings = sum(len(moves) for moves in old())
+        paths = sum(len(sequences) for sequences in new())
+        print(f"{name}:")
+        print(
+            f"  find_captures     {old_time * 1e6:9.1f} us  "
+            f"({landings} landing squares)"
+        )
+        print(
+            f"  capture_sequences {new_time * 1e6:9.1f} us  "
+            f"({paths} complete paths)  {old_time / new_time:.1f}x"
+        )
+
+
+# a game in the middle, kings on both sides and pieces in the side panel
+MIDGAME = """
+    .p.p.P.p
+    p.p.....
+    .....p.p
+    ..B.....
+    .b...b..
+    b.P.b.b.
+    .b.b...b
+    B...b.b.
+"""
+
+
+def headless_window():
+    """
+    Opens the game window with the dummy video driver, nothing shows up.
+    The scoreboard's stats are an in-memory store, the benchmark doesn't
+    need (or change) the real ones.
+
+    Returns:
+        tuple: (window surface, font) like checkers_main has them
+    """
+    os.environ.setdefault("SDL_VIDEODRIVER", "dummy")
+    import pygame
+    from .constants import WIDTH, HEIGHT, FONT_NAME, FONT_SIZE
+    from .stats import stats
+
+    stats.open("memory")
+    pygame.init()
+    window = pygame.display.set_mode((WIDTH, HEIGHT))
+    return window, pygame.font.Font(FONT_NAME, FONT_SIZE)
+
+
+# only kings left, most of the pieces are in the side panel
+KINGS_ENDGAME = """
+    .P...P..
+    ........
+    ...B....
+    ........
+    .....P..
+    ..B.....
+    ........
+    B.....B.
+"""
+
+
+def new_board(window, text=MIDGAME, captured=(3, 2)):
+    """
+    A Board with the position loaded and a few pieces captured by each side.
+
+    Args:
+        window (pygame.Surface): the window
+        text (str, optional): position in the perft format. Defaults to
+            MIDGAME
+        captured (tuple, optional): how many (pink, blue) pieces are in the
+            side panel, every third one a king. Defaults to (3, 2)
+    Returns:
+        Board: the board
+    """
+    from .board import Board
+    from .pieces import Pawn, King
+
+    board = Board(window)
+    board.load_bitboard(parse_position(text))
+    for color, count in zip((DARK_PINK, BLUE), captured):
+        for index in range(count):
+            kind = King if index % 3 == 1 else Pawn
+            board.capture_piece(kind(0, 1, color))
+    return board
+
+
+# ____ the piece drawing from before the sprite cache, to compare with ____
+def _old_draw_base(self, win):
+    import pygame
+
+    radius = SQUARE_SIZE // 2 - 10
+    shadow_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(
+        shadow_surface, (0, 0, 0, 100), (radius, radius), radius
+    )
+    win.blit(shadow_surface, (self.x - radius, self.y - radius + 5))
+    pygame.draw.circle(win, self.color, (self.x, self.y), radius)
+    highlight_surface = pygame.Surface(
+        (radius * 2, radius * 2), pygame.SRCALPHA
+    )
+    pygame.draw.circle(
+        highlight_surface, (255, 255, 255, 80), (radius, radius), radius // 2
+    )
+    win.blit(highlight_surface, (self.x - radius, self.y - radius))
+
+
+def _old_draw_small(self, win, x, y):
+    import pygame
+
+    radius = SQUARE_SIZE // 4
+    pygame.draw.circle(win, (255, 255, 255), (x, y), radius + 2)
+    shadow_surface = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(shadow_surface, (0, 0, 0, 90), (radius, radius), radius)
+    win.blit(shadow_surface, (x - radius, y - radius + 3))
+    pygame.draw.circle(win, self.color, (x, y), radius)
+    highlight_surface = pygame.Surface(
+        (radius * 2, radius * 2), pygame.SRCALPHA
+    )
+    pygame.draw.circle(
+        highlight_surface, (255, 255, 255, 80), (radius, radius), radius // 2
+    )
+    win.blit(highlight_surface, (x - radius, y - radius))
+
+
+def _old_king_draw(self, win):
+    import pygame
+    from .constants import CROWN
+
+    _old_draw_base(self, win)
+    crown_size = (SQUARE_SIZE // 2 - 10) * 1.5
+    crown = pygame.transform.smoothscale(
+        CROWN, (int(crown_size), int(crown_size))
+    )
+    crown = pygame.transform.rotate(crown, 30)
+    crown_rect = crown.get_rect()
+    win.blit(crown, (
+        self.x - crown_rect.width // 2 - 23,
+        self.y - crown_rect.height // 2 - 32,
+    ))
+
+
+def _old_king_draw_small(self, win, x, y):
+    import pygame
+    from .constants import CROWN
+
+    _old_draw_small(self, win, x, y)
+    radius = SQUARE_SIZE // 4
+    crown_size = radius * 1.7
+    crown = pygame.transform.smoothscale(
+        CROWN, (int(crown_size), int(crown_size))
+    )
+    crown = pygame.transform.rotate(crown, 30)
+    win.blit(crown, (
+        x - crown_size // 2 - 22, y - crown_size // 2 - radius * 0.7 - 10,
+    ))
+
+
+@contextlib.contextmanager
+def old_piece_drawing():
+    """Puts the drawing from before the sprite cache back for a while."""
+    from .pieces import Piece, King
+
+    saved = (Piece.draw_base, Piece.draw_small, King.draw, King.draw_small)
+    Piece.draw_base, Piece.draw_small = _old_draw_base, _old_draw_small
+    King.draw, King.draw_small = _old_king_draw, _old_king_draw_small
+    try:
+        yield
+    finally:
+        (Piece.draw_base, Piece.draw_small,
+         King.draw, King.draw_small) = saved
+
+
+def time_frames(draw, frames):
+    """
+    Returns:
+        float: average milliseconds per call of draw()
+    """
+    draw()  # first frame builds whatever gets cached
+    start = time.perf_counter()
+    for _ in range(frames):
+        draw()
+    return (time.perf_counter() - start) * 1000 / frames
+
+
+def bench_frame(frames=300):
+    """
+    A whole frame of the game (board, pieces and side panel) drawn with the
+    old piece drawing and with the sprite cache.
+
+    Args:
+        frames (int, optional): frames timed each way. Defaults to 300
+    Raises:
+        None
+    Returns:
+        None: prints the results
+    """
+    from .timers import GameTimer
+
+    window, font = headless_window()
+    board = new_board(window)
+    game_timer = GameTimer()
+
+    def frame():
+        board.draw_whole(window)
+        board.draw_side_panel(window, font, game_timer)
+
+    with old_piece_drawing():
+        before = time_frames(frame, frames)
+    after = time_frames(frame, frames)
+    print(f"frame, {len(board.captured)} captured pieces in the panel:")
+    print(f"  before (drawn every frame) {before:7.2f} ms")
+    print(f"  after (sprite cache)       {after:7.2f} ms  "
+          f"{before / after:.1f}x")
+
+    # dirty rectangles: what the main loop really draws each frame
+    board.render(window, font, game_timer)
+    idle = time_frames(lambda: board.render(window, font, game_timer), frames)
+
+    def click():
+        # select a piece then click an empty square to unselect it
+        board.handle_click(6, 1)
+        board.render(window, font, game_timer)
+        board.handle_click(3, 0)
+        board.render(window, font, game_timer)
+
+    clicked = time_frames(click, frames) / 2
+    print("dirty rectangles (Board.render):")
+    print(f"  nothing changed            {idle:7.3f} ms")
+    print(f"  one piece selected         {clicked:7.3f} ms")
+
+
+def render_positions(window):
+    """
+    The recorded positions the render benchmark draws.
+
+    Returns:
+        dict: name -> Board
+    """
+    from .board import Board
+
+    paused = new_board(window)
+    paused.toggle_pause()
+    game_over = new_board(window)
+    game_over.status = "game_over"
+    game_over.winner = "Blue"
+    return {
+        "opening": Board(window),
+        "midgame": new_board(window),
+        "all kings endgame": new_board(window, KINGS_ENDGAME, (9, 8)),
+        "paused": paused,
+        "game over": game_over,
+    }
+
+
+def bench_render(frames=200):
+    """
+    Draws whole frames (draw_whole and draw_side_panel, plus the menu when
+    there is one) of each recorded position on an off-screen surface.
+
+    The allocations are the Python ones tracemalloc sees, in a second run
+    so tracing doesn't slow down the timed one: "KiB" is the most extra
+    memory a frame used while drawing and "kept" the blocks still there
+    afterwards, per frame. The pixels of pygame surfaces aren't traced.
+
+    Args:
+        frames (int, optional): frames drawn for each position.
+            Defaults to 200
+    Raises:
+        None
+    Returns:
+        dict: name -> (ms per frame, KiB per frame, kept blocks per frame)
+    """
+    import pygame
+    from .constants import WIDTH, HEIGHT
+    from .timers import GameTimer
+
+    window, font = headless_window()
+    # off-screen, in the same pixel format as the window
+    surface = pygame.Surface((WIDTH, HEIGHT)).convert()
+    game_timer = GameTimer()
+
+    results = {}
+    print(f"render, {frames} whole frames a position, off-screen:")
+    print(f"  {'position':<18} {'ms/frame':>9} {'frames/s':>9} "
+          f"{'KiB':>7} {'kept':>6}")
+    for name, board in render_positions(window).items():
+        def draw():
+            board.draw_frame(surface, font, game_timer)
+
+        ms = time_frames(draw, frames)
+
+        tracemalloc.start()
+        peak = 0
+        before = tracemalloc.take_snapshot()
+        for _ in range(frames):
+            tracemalloc.reset_peak()
+            start = tracemalloc.get_traced_memory()[0]
+            draw()
+            peak += tracemalloc.get_traced_memory()[1] - start
+        after = tracemalloc.take_snapshot()
+        tracemalloc.stop()
+        kept = sum(
+            stat.count_diff for stat in after.compare_to(before, "lineno")
+        )
+
+        results[name] = (ms, peak / 1024 / frames, kept / frames)
+        print(f"  {name:<18} {ms:9.2f} {1000 / ms:9.1f} "
+              f"{peak / 1024 / frames:7.1f} {kept / frames:6.2f}")
+    return results
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m checkers.benchmark",
+        description="Time parts of the checkers game.",
+    )
+    parser.add_argument("name", choices=["captures", "frame", "render"])
+    parser.add_argument(
+        "--repeat", type=int, default=200,
+        help="calls (or frames) timed for each result",
+    )
+    parser.add_argument(
+        "--budget", type=float,
+        help="render: fail when a position takes more milliseconds a frame",
+    )
+    args = parser.parse_args(argv)
+
+    if args.name == "captures":
+        bench_captures(args.repeat)
+    elif args.name == "frame":
+        bench_frame(args.repeat)
+    elif args.name == "render":
+        results = bench_render(args.repeat)
+        if args.budget is not None:
+            slow = [
+                name for name, (ms, _, _) in results.items()
+                if ms > args.budget
+            ]
+            if slow:
+                print(f"over {args.budget} ms a frame: {', '.join(slow)}")
+                return 1
+    return 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,411 @@
+from .constants import BLUE, DARK_PINK, ROWS, COLUMNS
+from .rules import KING_DIRECTIONS, BLUE_DIRECTIONS, PINK_DIRECTIONS
+
+
+# The 32 playable (dark) squares are numbered row by row, four per row, so
+# square = row * 4 + column // 2. On even rows the playable columns are
+# 1, 3, 5, 7 and on odd rows they are 0, 2, 4, 6 (same as make_board).
+FULL = 0xFFFFFFFF
+EVEN_ROWS = 0x0F0F0F0F  # rows 0, 2, 4, 6
+ODD_ROWS = 0xF0F0F0F0  # rows 1, 3, 5, 7
+LEFT_EDGE = 0x10101010  # column 0, only on odd rows
+RIGHT_EDGE = 0x08080808  # column 7, only on even rows
+TOP_ROW = 0x0000000F  # where blue pawns become kings
+BOTTOM_ROW = 0xF0000000  # where pink pawns become kings
+
+# how far the bits move for each diagonal step, the step is different on
+# even and odd rows because the rows are shifted by half a square
+# (mask of squares allowed to make the step, shift amount)
+STEPS = {
+    (-1, -1): ((EVEN_ROWS, -4), (ODD_ROWS & ~LEFT_EDGE, -5)),
+    (-1, 1): ((EVEN_ROWS & ~RIGHT_EDGE, -3), (ODD_ROWS, -4)),
+    (1, -1): ((EVEN_ROWS, 4), (ODD_ROWS & ~LEFT_EDGE, 3)),
+    (1, 1): ((EVEN_ROWS & ~RIGHT_EDGE, 5), (ODD_ROWS, 4)),
+}
+
+
+def square_index(row, column):
+    """
+    Converts a board position to its playable square number.
+
+    Args:
+        row (int): Board row
+        column (int): Board column
+    Raises:
+        ValueError: If the position is off the board or a light square
+    Returns:
+        int: square number between 0 and 31
+    """
+    on_board = 0 <= row < ROWS and 0 <= column < COLUMNS
+    if not on_board or (row + column) % 2 == 0:
+        raise ValueError(f"({row}, {column}) is not a playable square")
+    return row * 4 + column // 2
+
+
+def square_position(square):
+    """
+    Converts a playable square number back to its (row, column).
+
+    Args:
+        square (int): square number between 0 and 31
+    Raises:
+        None
+    Returns:
+        tuple: (row, column)
+    """
+    row = square // 4
+    column = 2 * (square % 4) + (1 if row % 2 == 0 else 0)
+    return row, column
+
+
+def shift(bits, dr, dc):
+    """
+    Moves every bit in the mask one diagonal step, bits that would leave
+    the board are dropped.
+
+    Args:
+        bits (int): mask of squares
+        dr (int): row direction (-1 or 1)
+        dc (int): column direction (-1 or 1)
+    Raises:
+        None
+    Returns:
+        int: the shifted mask
+    """
+    result = 0
+    for mask, amount in STEPS[(dr, dc)]:
+        part = bits & mask
+        if amount > 0:
+            result |= part << amount
+        else:
+            result |= part >> -amount
+    return result & FULL
+
+
+def iter_bits(bits):
+    """
+    Goes through the square numbers set in a mask from lowest to highest,
+    which is the same top-left to bottom-right order as Board.get_all_pieces.
+
+    Args:
+        bits (int): mask of squares
+    Raises:
+        None
+    Returns:
+        generator: square numbers
+    """
+    while bits:
+        low = bits & -bits
+        yield low.bit_length() - 1
+        bits ^= low
+
+
+class BitBoard:
+    """
+    Compact checkers position stored as four 32 bit masks, one bit per
+    playable square. Moves follow the exact same rules as Board: pawns go
+    forward only (captures too), kings go one square in every direction and
+    every step of a jump chain is a move of its own.
+
+    Attributes:
+        pink_men (int): pink pawns
+        pink_kings (int): pink kings
+        blue_men (int): blue pawns
+        blue_kings (int): blue kings
+    """
+
+    __slots__ = ("pink_men", "pink_kings", "blue_men", "blue_kings")
+
+    def __init__(self, pink_men=0, pink_kings=0, blue_men=0, blue_kings=0):
+        """
+        Creates a position from the four piece masks.
+
+        Args:
+            pink_men (int, optional): pink pawns mask. Defaults to 0
+            pink_kings (int, optional): pink kings mask. Defaults to 0
+            blue_men (int, optional): blue pawns mask. Defaults to 0
+            blue_kings (int, optional): blue kings mask. Defaults to 0
+        """
+        self.pink_men = pink_men
+        self.pink_kings = pink_kings
+        self.blue_men = blue_men
+        self.blue_kings = blue_kings
+
+    @classmethod
+    def start(cls):
+        """
+        The starting position, same as Board.make_board.
+
+        Returns:
+            BitBoard: pink on the top three rows and blue on the bottom three
+        """
+        return cls(pink_men=0x00000FFF, blue_men=0xFFF00000)
+
+    @classmethod
+    def from_grid(cls, grid):
+        """
+        Builds the masks from a Board style 2D list of pieces and zeros.
+
+        Args:
+            grid (list): 8x8 list of pieces or 0
+        Raises:
+            None
+        Returns:
+            BitBoard: the same position as masks
+        """
+        bitboard = cls()
+        for row in range(ROWS):
+            for column in range(COLUMNS):
+                piece = grid[row][column]
+                if piece == 0:
+                    continue
+                bit = 1 << square_index(row, column)
+                if piece.color == BLUE:
+                    if piece.king:
+                        bitboard.blue_kings |= bit
+                    else:
+                        bitboard.blue_men |= bit
+                else:
+                    if piece.king:
+                        bitboard.pink_kings |= bit
+                    else:
+                        bitboard.pink_men |= bit
+        return bitboard
+
+    def copy(self):
+        """
+        Returns:
+            BitBoard: an independent copy of this position
+        """
+        return BitBoard(
+            self.pink_men, self.pink_kings, self.blue_men, self.blue_kings
+        )
+
+    def __eq__(self, other):
+        if not isinstance(other, BitBoard):
+            return NotImplemented
+        return (
+            self.pink_men == other.pink_men
+            and self.pink_kings == other.pink_kings
+            and self.blue_men == other.blue_men
+            and self.blue_kings == other.blue_kings
+        )
+
+    def __hash__(self):
+        return hash(
+            (self.pink_men, self.pink_kings, self.blue_men, self.blue_kings)
+        )
+
+    def __repr__(self):
+        return (
+            f"BitBoard(pink_men={self.pink_men:#010x}, "
+            f"pink_kings={self.pink_kings:#010x}, "
+            f"blue_men={self.blue_men:#010x}, "
+            f"blue_kings={self.blue_kings:#010x})"
+        )
+
+    # ___________ masks ___________
+    @property
+    def occupied(self):
+        pink = self.pink_men | self.pink_kings
+        return pink | self.blue_men | self.blue_kings
+
+    @property
+    def empty(self):
+        return ~self.occupied & FULL
+
+    def men(self, color):
+        return self.blue_men if color == BLUE else self.pink_men
+
+    def kings(self, color):
+        return self.blue_kings if color == BLUE else self.pink_kings
+
+    def pieces(self, color):
+        if color == BLUE:
+            return self.blue_men | self.blue_kings
+        return self.pink_men | self.pink_kings
+
+    def count(self, color):
+        """
+        Returns:
+            int: number of pieces that color still has
+        """
+        return bin(self.pieces(color)).count("1")
+
+    # ___________ move generation ___________
+    def movers(self, color):
+        """
+        Every piece of the color that has at least one regular (non capture)
+        move, found for all pieces at once with shifts.
+
+        Args:
+            color (tuple): BLUE or DARK_PINK
+        Returns:
+            int: mask of the pieces that can move
+        """
+        empty = self.empty
+        forward = BLUE_DIRECTIONS if color == BLUE else PINK_DIRECTIONS
+        men = self.men(color)
+        kings = self.kings(color)
+        result = 0
+        # shifting the empty squares backwards lands on the pieces that
+        # could step into them
+        for dr, dc in KING_DIRECTIONS:
+            back = shift(empty, -dr, -dc)
+            result |= back & kings
+            if (dr, dc) in forward:
+                result |= back & men
+        return result
+
+    def jumpers(self, color):
+        """
+        Every piece of the color that can make at least one capture.
+
+        Args:
+            color (tuple): BLUE or DARK_PINK
+        Returns:
+            int: mask of the pieces that can capture
+        """
+        empty = self.empty
+        enemies = self.pieces(DARK_PINK if color == BLUE else BLUE)
+        forward = BLUE_DIRECTIONS if color == BLUE else PINK_DIRECTIONS
+        men = self.men(color)
+        kings = self.kings(color)
+        result = 0
+        for dr, dc in KING_DIRECTIONS:
+            # an enemy right behind an empty square, then one more step back
+            # to the piece that would jump
+            back = shift(shift(empty, -dr, -dc) & enemies, -dr, -dc)
+            result |= back & kings
+            if (dr, dc) in forward:
+                result |= back & men
+        return result
+
+    def piece_moves(self, square, color, king):
+        """
+        All moves of a single piece in the same form as
+        Board.get_valid_moves: regular moves first, then captures, with a
+        later capture path to the same square replacing an earlier one.
+
+        Args:
+            square (int): square the piece is on
+            color (tuple): BLUE or DARK_PINK
+            king (bool): whether the piece is a king
+        Returns:
+            dict: landing square mapped to the mask of captured squares
+        """
+        if king:
+            directions = KING_DIRECTIONS
+        else:
+            directions = BLUE_DIRECTIONS if color == BLUE else PINK_DIRECTIONS
+
+        empty = self.empty
+        bit = 1 << square
+        moves = {}
+        for dr, dc in directions:
+            target = shift(bit, dr, dc) & empty
+            if target:
+                moves[target.bit_length() - 1] = 0
+
+        enemies = self.pieces(DARK_PINK if color == BLUE else BLUE)
+        for dr, dc in directions:
+            self._find_jumps(bit, dr, dc, directions, enemies, empty, moves, 0)
+        return moves
+
+    def _find_jumps(
+        self, bit, dr, dc, directions, enemies, empty, moves, captured
+    ):
+        """
+        Bit version of Board.find_captures, the captured pieces stay on the
+        board until the move is made so they can't be jumped twice.
+        """
+        enemy = shift(bit, dr, dc) & enemies & ~captured
+        if not enemy:
+            return
+        land = shift(enemy, dr, dc) & empty
+        if not land:
+            return
+        new_captured = captured | enemy
+        moves[land.bit_length() - 1] = new_captured
+        for new_dr, new_dc in directions:
+            self._find_jumps(
+                land, new_dr, new_dc, directions, enemies, empty, moves,
+                new_captured,
+            )
+
+    def moves(self, color):
+        """
+        Every move for the color, pieces in the same order as
+        Board.get_all_pieces.
+
+        Args:
+            color (tuple): BLUE or DARK_PINK
+        Returns:
+            list: (from square, to square, captured mask) tuples
+        """
+        result = []
+        kings = self.kings(color)
+        for square in iter_bits(self.pieces(color)):
+            king = bool(kings >> square & 1)
+            piece_moves = self.piece_moves(square, color, king)
+            for target, captured in piece_moves.items():
+                result.append((square, target, captured))
+        return result
+
+    def make(self, origin, target, captured):
+        """
+        Plays a move in place: removes the captured pieces, moves the piece
+        and promotes it if it reached the last row.
+
+        Args:
+            origin (int): square the piece leaves
+            target (int): square the piece lands on
+            captured (int): mask of captured squares
+        Raises:
+            ValueError: If there is no piece on the origin square
+        Returns:
+            None
+        """
+        source = 1 << origin
+        dest = 1 << target
+        keep = ~captured & FULL
+        self.pink_men &= keep
+        self.pink_kings &= keep
+        self.blue_men &= keep
+        self.blue_kings &= keep
+
+        if self.blue_men & source:
+            self.blue_men ^= source
+            if dest & TOP_ROW:
+                self.blue_kings |= dest
+            else:
+                self.blue_men |= dest
+        elif self.blue_kings & source:
+            self.blue_kings ^= source | dest
+        elif self.pink_men & source:
+            self.pink_men ^= source
+            if dest & BOTTOM_ROW:
+                self.pink_kings |= dest
+            else:
+                self.pink_men |= dest
+        elif self.pink_kings & source:
+            self.pink_kings ^= source | dest
+        else:
+            raise ValueError(f"no piece on square {origin}")
+
+    def cells(self):
+        """
+        Goes through every piece on the board.
+
+        Returns:
+            generator: (row, column, color, king) for each piece
+        """
+        for mask, color, king in (
+            (self.pink_men, DARK_PINK, False),
+            (self.pink_kings, DARK_PINK, True),
+            (self.blue_men, BLUE, False),
+            (self.blue_kings, BLUE, True),
+        ):
+            for square in iter_bits(mask):
+                row, column = square_position(square)
+                yield row, column, color, king
@@ -1,3 +1,6 @@
+import bisect
+from operator import attrgetter
+
 import pygame
 from .constants import (
     COLUMNS,
@@ -11,9 +14,6 @@ from .constants import (
     WIDTH,
     HEIGHT,
     BLUE,
-    BOARD_BORDER_COLOR,
-    BOARD_RECT,
-    BOARD_BORDER,
     PANEL_COLOR,
     PANEL_RECT,
     PANEL_TIME_BG_COLOR,
@@ -35,9 +35,187 @@ from .constants import (
     PANEL_SCORE_UP_CENTRE,
 )
 from .timers import GameTimer, PlayerTimer
-from .pieces import DARK_PINK, Pawn, King
-from .utils import mergeSort
+from .clock import RealClock
+from .pieces import DARK_PINK, Pawn, King, piece_sprite
+from .utils import merge_rects, render_text
 from .stats import stats
+from .bitboard import BitBoard
+from . import constants
+from . import rules
+from . import zobrist
+
+
+# the squares and the border never change, so they are drawn once into this
+# surface and blitted every frame. The key is the sizes it was drawn with
+_background = {"key": None, "surface": None}
+
+
+def board_background():
+    """
+    The checkerboard pattern with the border around it, drawn the first
+    time it's needed and again only if the sizes (or the border) in
+    checkers.constants change. Everything it's drawn with is read from the
+    module, so the surface always matches its key. It only covers the board, the side panel covers the rest of the
+    window.
+
+    Args:
+        None
+    Raises:
+        None
+    Returns:
+        pygame.Surface: board sized surface to blit at (0, 0)
+    """
+    key = (
+        constants.BOARD_WIDTH, constants.BOARD_HEIGHT, constants.ROWS,
+        constants.COLUMNS, constants.SQUARE_SIZE, constants.BOARD_BORDER,
+        tuple(constants.BOARD_RECT), constants.BOARD_BORDER_COLOR,
+    )
+    if _background["key"] != key:
+        surface = pygame.Surface(
+            (constants.BOARD_WIDTH, constants.BOARD_HEIGHT)
+        )
+        draw_squares(surface)
+        pygame.draw.rect(
+            surface, constants.BOARD_BORDER_COLOR, constants.BOARD_RECT,
+            constants.BOARD_BORDER,
+        )
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()  # same pixel format as the window
+        _background["key"] = key
+        _background["surface"] = surface
+    return _background["surface"]
+
+
+# where the captured pieces go in the side panel: rows of CAPTURED_PER_ROW
+# small pieces, the pink ones (captured by blue) at the bottom and the blue
+# ones (captured by pink) at the top
+CAPTURED_START_X = 930
+CAPTURED_START_Y = {DARK_PINK: HEIGHT - 310, BLUE: 264}
+CAPTURED_SPACING = 44
+CAPTURED_PER_ROW = 6
+# the win counts are asked from the stats at most this often, so wins
+# another window records show up within a second
+WINS_REFRESH_NS = 1_000_000_000
+
+# the pause and winner menus: a see-through dark sheet over the window with a
+# few lines of text on it. Both are built the first time a menu is shown and
+# only blitted after that
+_overlays = {"sheet": None}
+
+# (text, color, how far below the middle of the window)
+PAUSE_LINES = (
+    ("GAME PAUSED", (255, 215, 0), -20),
+    ("Press P to resume or ESC to quit to Main Menu", (200, 200, 200), 30),
+    ("Press L to reset scores", WHITE, 100),
+)
+
+
+def winner_lines(winner):
+    """
+    The text of the winner screen.
+
+    Args:
+        winner (str): "Blue", "Pink" or "Draw"
+    Returns:
+        tuple: (text, color, offset) lines like PAUSE_LINES
+    """
+    if winner == "Draw":  # threefold repetition
+        title = "DRAW!"
+    else:
+        title = f"{winner.upper()} WINS!"
+    return (
+        (title, (255, 215, 0), -20),  # Gold
+        (
+            "Press R to restart or ESC to quit to Main Menu",
+            (200, 200, 200),
+            30,
+        ),
+        ("Press L to reset scores", WHITE, 100),
+    )
+
+
+def menu_overlay(font, lines):
+    """
+    A menu laid out once: the dark sheet and each line of text with where it
+    goes. The same font and lines give back the same list every time.
+
+    Args:
+        font (pygame.font.Font): font of the text
+        lines (tuple): (text, color, offset) tuples like PAUSE_LINES
+    Raises:
+        None
+    Returns:
+        list: (surface, position) pairs to blit in order, the sheet first
+    """
+    key = (font, lines)
+    if key not in _overlays:
+        if _overlays["sheet"] is None:
+            sheet = pygame.Surface((WIDTH, HEIGHT))
+            sheet.set_alpha(180)
+            sheet.fill((0, 0, 0))
+            _overlays["sheet"] = sheet
+        layers = [(_overlays["sheet"], (0, 0))]
+        for text, color, offset in lines:
+            surface = render_text(font, text, True, color)
+            layers.append((surface, surface.get_rect(
+                center=(WIDTH // 2, HEIGHT // 2 + offset)
+            )))
+        _overlays[key] = layers
+    return _overlays[key]
+
+
+def draw_overlay(screen, font, lines):
+    """Blits a menu from menu_overlay onto the screen."""
+    for surface, position in menu_overlay(font, lines):
+        screen.blit(surface, position)
+
+
+def draw_squares(win):
+    """
+    Draws the checkerboard pattern and tile of alternating colored squares.
+    this leads to the classic checkers board this time cyan and white.
+
+    Args:
+        win (pygame.Surface): Surface to draw the board on
+    Raises:
+        None
+    Returns:
+        None
+    """
+    # read from the module so the background follows the sizes in it
+    rows, columns = constants.ROWS, constants.COLUMNS
+    square_size = constants.SQUARE_SIZE
+    win.fill(CYAN)
+    for row in range(rows):
+        if row % 2 == 1:  # start drawing from second square if row is odd
+            # number
+            for column in range(1, columns, 2):
+                pygame.draw.rect(
+                    win,
+                    WHITE,
+                    (
+                        row * square_size,
+                        column * square_size,
+                        square_size,
+                        square_size,
+                    ),  # makes sure we have enough squares correct color
+                )
+        else:  # draw from the first square, every second squares if row is
+            # even
+            for column in range(0, columns, 2):
+                pygame.draw.rect(
+                    win,
+                    WHITE,
+                    (
+                        row * square_size,
+                        column * square_size,
+                        square_size,
+                        square_size,
+                    ),
+                )
+        # puts squares once in two squares, we always start
+        # drawing from top left corner, so when we start drawing,
+        # we're at point 00
 
 
 # NOTE: dc is direction of column(going up or down) and dr is left or right
@@ -47,37 +225,68 @@ class Board:
     display the scores,time,etc.
     
     The board manages the game logic including piece positions, captured 
-    pieces,turn management, timers, and win conditions. It handles all 
-    game logic including valid moves, piece captures, and king promotions.
+    pieces,turn management, timers, and win conditions. The rules themselves
+    (valid moves, piece captures, king promotions and winners) live in
+    checkers.rules which has no pygame, the board calls them on self.board.
 
     Attributes:
         SCREEN (pygame.Surface): The game display surface
+        clock: what the player timers run on, see checkers.clock
         status (str): Current game status ("playing" or "game_over")
         board (list): 2D list representing the game board
-        captured (list): List of captured pieces
+        captured (list): List of captured pieces, in the order they were
+            captured
+        captured_sorted (dict): color -> that color's captured pieces,
+            kings first, kept in order as pieces are captured
+        captured_strips (dict): color -> (surface, position) of the
+            captured pieces drawn for the side panel, None until drawn
         pink_pawns (int): Count of pink pawns
         cyan_pawns (int): Count of blue pawns
         selected (Piece): Currently selected piece
         pink_kings (int): Count of pink kings
         cyan_kings (int): Count of blue kings
+        pieces (dict): color -> set of that color's pieces on the board, kept
+            up to date by count_piece so nothing has to scan the 64 squares
         turn (tuple): Current player's turn (BLUE or DARK_PINK)
         valid_moves (dict): Dictionary of valid moves for selected piece
-        winner (str): Winner of the game (None if game ongoing)
+        legal_moves (dict): piece -> valid moves for every piece of the side
+            to move, None until get_legal_moves works it out for the
+            current position
+        forced_captures (bool): whether capturing is mandatory (when any
+            piece can capture, only captures are allowed and a jump chain
+            has to be finished)
+        jumping (bool): a forced captures jump chain is half done
+        dirty_squares (set): (row, col) squares to draw again next frame
+        dirty_rects (list): other parts of the window to draw again
+        redraw_all (bool): the next frame draws the whole window
+        shown (dict): what the last drawn frame showed, to find changes
+        winner (str): Winner of the game (None if game ongoing, "Draw" on
+            threefold repetition)
         paused (bool): Game pause status
         blue_timer (PlayerTimer): Timer for blue player
         pink_timer (PlayerTimer): Timer for pink player
+        history (list): (undo record, whether the turn passed) pairs of
+            the moves made with make_move
+        key (int): Zobrist key of the current position
+        position_counts (dict): how many times each key came up after a turn
+        wins (dict): the all time win counts shown in the panel, None until
+            first read (see refresh_wins)
         
     Raises:
         pygame.error: If game display fails or any unexpected errors
 
     """
-    def __init__(self, win):
+    def __init__(self, win, forced_captures=False, clock=None):
         """
         Initializes a new game board with starting piece positions
         and starts the main logic of the game.
 
         Args:
             win (pygame.Surface): The game window to draw on.
+            forced_captures (bool, optional): play with mandatory captures.
+                Defaults to False
+            clock (optional): what the player timers run on, a clock from
+                checkers.clock. Defaults to the RealClock
 
         Raises:
             None
@@ -86,21 +295,66 @@ class Board:
             None
         """
         self.SCREEN = win
+        self.clock = clock or RealClock()
         self.status = "playing"
         self.board = []
         self.captured = []
-        self.pink_pawns = self.cyan_pawns = 12
+        self.captured_sorted = {BLUE: [], DARK_PINK: []}
+        self.captured_strips = {BLUE: None, DARK_PINK: None}
         self.selected = None
-        self.pink_kings = self.cyan_kings = 0
         self.turn = BLUE  # Blue starts first
         self.valid_moves = {}
+        self.legal_moves = None  # worked out when first needed
+        self.forced_captures = forced_captures
+        self.jumping = False
+        # dirty rectangle drawing: only what changed gets drawn again and
+        # sent to the screen, the first frame draws everything
+        self.dirty_squares = set()
+        self.dirty_rects = []
+        self.redraw_all = True
+        self.shown = {}
         self.winner = None
+        self.move_count = 0  # turns played, for the game history
+        # every step played: (color, from, to, pieces captured), a multi
+        # jump is one step per jump
+        self.moves_played = []
+        self.history = []  # undo records of make_move
         self.make_board()
+        # Zobrist key of the position, kept up to date on every move, and how
+        # many times each position happened (threefold repetition is a draw)
+        self.key = zobrist.hash_grid(self.board, self.turn)
+        self.position_counts = {self.key: 1}
         self.paused = False  # pause functionality
-        self.blue_timer = PlayerTimer()  # initialize the blue timer
-        self.pink_timer = PlayerTimer()  # initialize the pink timer
-        self.last_update = pygame.time.get_ticks()  # update the timer
+        # the player timers count on the board's clock
+        self.blue_timer = PlayerTimer(clock=self.clock)
+        self.pink_timer = PlayerTimer(clock=self.clock)
         self.blue_timer.is_active = True  #  blue starts first
+        self.wins = None
+        self.wins_checked = 0  # clock time in ns wins were last read
+
+    def refresh_wins(self, force=False):
+        """
+        The all time win counts for the panel. Asking the stats costs a
+        file or database check, too much for every frame, so they are only
+        read again once a second, or straight away when forced (after this
+        game recorded its result or the scores were reset).
+
+        Args:
+            force (bool, optional): read them now. Defaults to False
+        Raises:
+            None
+        Returns:
+            dict: "Blue" and "Pink" win counts
+        """
+        now = self.clock.ticks_ns()
+        if (
+            force
+            or self.wins is None
+            or now - self.wins_checked >= WINS_REFRESH_NS
+        ):
+            self.wins = stats.get()
+            self.wins_checked = now
+        return self.wins
 
     def make_board(self):
         """
@@ -118,25 +372,81 @@ class Board:
             list: 2D list representing board with pieces
         """
 
-        for row in range(ROWS):
-            self.board.append([])
-            for columns in range(COLUMNS):
-                if (columns % 2 == 0 and row % 2 == 1) or (
-                    columns % 2 == 1 and row % 2 == 0
-                ):  # this is to be able to create the famous
-                    # checkers and chess structure using row numbers
-                    # and columns, if one even and the other odd, we
-                    # draw the squares, otherwise, just 0 to represent
-                    # the empty squares(all created in the 2D list)
-
-                    if row < 3:  # if top of the board
-                        self.board[row].append(Pawn(row, columns, DARK_PINK))
-                    elif row > 4:  # bottom of the board
-                        self.board[row].append(Pawn(row, columns, BLUE))
-                    else:
-                        self.board[row].append(0)
-                else:
-                    self.board[row].append(0)
+        self.board = rules.make_grid(Pawn)
+        self.index_pieces()
+
+    def index_pieces(self):
+        """
+        Recounts the pawns and kings and refills the per color piece sets from
+        self.board. Only needed when the whole board is replaced, moves keep
+        them up to date through count_piece.
+
+        Args:
+            None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.pieces = {BLUE: set(), DARK_PINK: set()}
+        self.legal_moves = None
+        self.pink_pawns = self.cyan_pawns = 0
+        self.pink_kings = self.cyan_kings = 0
+        for row in self.board:
+            for piece in row:
+                if piece != 0:
+                    self.count_piece(piece, 1)
+
+    def to_bitboard(self):
+        """
+        Packs the current position into a BitBoard so that analysis code
+        can work on four integers instead of the 2D list of pieces.
+
+        Args:
+            None
+        Raises:
+            None
+        Returns:
+            BitBoard: the pieces on the board as masks
+        """
+        return BitBoard.from_grid(self.board)
+
+    def load_bitboard(self, bitboard, turn=None):
+        """
+        Replaces the pieces on the board with the ones in the BitBoard and
+        recounts the pawns and kings. Selection and valid moves are cleared
+        since the old pieces are gone.
+
+        Args:
+            bitboard (BitBoard): the position to load
+            turn (tuple, optional): who moves next, the turn stays the
+                same if not given
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.board = [[0] * COLUMNS for _ in range(ROWS)]
+        for row, column, color, king in bitboard.cells():
+            if king:
+                piece = King(row, column, color)
+            else:
+                piece = Pawn(row, column, color)
+            self.board[row][column] = piece
+        self.index_pieces()
+
+        if turn is not None and turn != self.turn:
+            self.turn = turn
+            self.blue_timer.is_active = turn == BLUE
+            self.pink_timer.is_active = turn != BLUE
+
+        self.selected = None
+        self.valid_moves = {}
+        self.jumping = False
+        self.history = []
+        self.redraw_all = True
+        self.key = zobrist.hash_grid(self.board, self.turn)
+        self.position_counts = {self.key: 1}
 
     def toggle_pause(self):
         """
@@ -167,33 +477,9 @@ class Board:
                 self.pink_timer.is_active = True
 
     def draw_pause_menu(self, screen, font):
-        # the very clean menu that we have been using
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-
-        # pause message, telling the user that the game is paused
-        pause_text = font.render("GAME PAUSED", True, (255, 215, 0))
-        text_rect = pause_text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-
-        screen.blit(pause_text, text_rect)
-
-        # pause message instructions
-        subtext = font.render(
-            "Press P to resume or ESC to quit to Main Menu",
-            True,
-            (200, 200, 200),
-        )
-        subtext_rect = subtext.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-        screen.blit(subtext, subtext_rect)
-
-        # reset scores(that are being saved for each color) instruction
-        reset_text = font.render("Press L to reset scores", True, WHITE)
-        reset_rect = reset_text.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 + 100)
-        )
-        screen.blit(reset_text, reset_rect)
+        # the very clean menu that we have been using, the dark sheet and the
+        # text are only made the first time
+        draw_overlay(screen, font, PAUSE_LINES)
 
     def get_piece(
         self, row, column
@@ -215,20 +501,9 @@ class Board:
         Returns:
             dict: Dictionary with valid move positions as keys and captured pieces as values
         """
-        # first check for capture moves, whether the piece could capture and
-        # where it could
-        capture_moves = self.get_capture_moves(piece)
-        regular_moves = self.get_regular_moves(piece)
-
-        # Combine them into a single dictionary
-        all_moves = {
-            **regular_moves,
-            **capture_moves,
-        }  # since the game written
-        # does not restrict user's choice, but for further consideration the
-        # system is designed to be able to have a forcing captures mode as well
-
-        return all_moves
+        # this doesn't restrict the user's choice, the forced captures mode
+        # (forced_captures) filters these in get_legal_moves instead
+        return rules.get_valid_moves(self.board, piece)
 
     def get_regular_moves(self, piece):
         """
@@ -241,39 +516,7 @@ class Board:
         Returns:
             dict: dictionary with valid move positions as keys and empty lists as values
         """
-
-
-        moves = {}
-        if piece.king:  # when the piece becomes a king we need to change
-            # the directions that the king moves in because it is different
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]  # the king could
-            # go to every single diagonal
-        else:
-            if piece.color == BLUE:  # if the pieces are blue and not kings
-                # they could only move up
-                directions = [(-1, -1), (-1, 1)]  # move up, -1 is up and
-                # second -1 is left, due to the index of the board
-            else:
-                directions = [(1, -1), (1, 1)]  # move down
-
-        for dirrow, dircol in directions:
-            new_row, new_col = (
-                piece.row + dirrow,
-                piece.column + dircol,
-            )  # calculate
-            # the new possible rows and columns that could be gone to using the
-            # directions that we have set before,
-
-            if (
-                0 <= new_row < ROWS
-                and 0 <= new_col < COLUMNS
-                and self.board[new_row][new_col] == 0
-            ):  # if the new row and column are within the board and are empty
-                moves[(new_row, new_col)] = []  # we add the moves to the moves
-                # dictionary and associate no values to it since it does not
-                # involve any capturing (I almost crashed out twice to figure
-                # this out)
-        return moves
+        return rules.get_regular_moves(self.board, piece)
 
     def get_capture_moves(self, piece):
         """
@@ -289,39 +532,14 @@ class Board:
             as the captured
 
         """
-        # no commnets for this function since it's essentially the same as the
-        # get_regular_moves except the last section
-        moves = {}
-
-        if piece.king:
-            directions = [(-1, -1), (-1, 1), (1, -1), (1, 1)]  # these
-            # directions are about the index and not the actual direction adn
-            # this means that they are actually reveresed, -1 is up and left
-            # (first index up, second left) and so on
-        else:
-            if piece.color == BLUE:
-                directions = [(-1, -1), (-1, 1)]
-            else:
-                directions = [(1, -1), (1, 1)]
-
-        for (
-            dr,
-            dc,
-        ) in directions:  # then we call the find_captures since it's a
-            # recursive algorithm(which I wish it wasn't)
-            self.find_captures(
-                piece.row, piece.column, dr, dc, piece.color, moves, piece.king
-            )
-
-        return moves
+        return rules.get_capture_moves(self.board, piece)
 
     # Researched and got inspiration from the internet
     # and the idea of using recurion here is by ChatGPT: (I know it's not that
     # difficult)
     def find_captures(
         self, row, col, dr, dc, color, moves, is_king, captured=None
-    ):  # a recursive algorithm that checks for the captures that a piece could
-        # do and eventually appends them into the captured list
+    ):
         """
         By far the most complicated function which involves recursion.
         Recursively finds all possible capture sequences for a piece.
@@ -340,81 +558,72 @@ class Board:
         Returns:
             None: Updates moves dictionary in place
         """
-        if captured is None:
-            captured = []  # to make sure that the list doesn't reset everytime
-            # the function is recursively called
+        rules.find_captures(
+            self.board, row, col, dr, dc, color, moves, is_king, captured
+        )
 
-        # check for enemy piece
-        enemy_row, enemy_col = row + dr, col + dc  # checking the higher or
-        # lower direcitons and saving them into temp values
+    def get_capture_sequences(self, piece):
+        """
+        Every complete capture path of the piece with its full route, see
+        checkers.rules.capture_sequences.
 
-        if not (
-            0 <= enemy_row < ROWS and 0 <= enemy_col < COLUMNS
-        ):  # if we're
-            # out of range just return and stop checking)
-            return
+        Args:
+            piece (Piece): the piece that captures
 
-        enemy_piece = self.board[enemy_row][enemy_col]  # saving temporarily
-        # where the enemy pieces are
+        Returns:
+            list: (route, captured pieces) pairs
+        """
+        return rules.capture_sequences(self.board, piece)
 
-        if (
-            enemy_piece != 0
-            and enemy_piece.color != color
-            and enemy_piece not in captured
-        ):  # if the square above or below is not captured or same color or none
-            # Found enemy, check landing square
-            land_row, land_col = (
-                enemy_row + dr,
-                enemy_col + dc,
-            )  # this is where
-            # we are going to land in
-
-            if (
-                0 <= land_row < ROWS
-                and 0 <= land_col < COLUMNS
-                and self.board[land_row][land_col] == 0
-            ):  # now check if the landing is inside the board and if it's empty
-
-                new_captured = captured + [enemy_piece]  # more than 1 captures
-                moves[(land_row, land_col)] = new_captured  # add them to the
-                # moves
-
-                # look for additional captures from landing position
-                if is_king:
-                    # kings can capture in all directions
-                    for new_dr, new_dc in [(-1, -1), (-1, 1), (1, -1), (1, 1)]:
-                        self.find_captures(
-                            land_row,
-                            land_col,
-                            new_dr,
-                            new_dc,
-                            color,
-                            moves,
-                            is_king,
-                            new_captured,
-                        )
-                else:
-                    # REgular pieces continue in their allowed directions
-                    if color == BLUE:
-                        next_directions = [(-1, -1), (-1, 1)]
-                    else:
-                        next_directions = [(1, -1), (1, 1)]
-
-                    for new_dr, new_dc in next_directions:
-                        self.find_captures(
-                            land_row,
-                            land_col,
-                            new_dr,
-                            new_dc,
-                            color,
-                            moves,
-                            is_king,
-                            new_captured,
-                        )  # recursively do until hitting base
+    def get_legal_moves(self):
+        """
+        Every valid move of the side to move, worked out once per position.
+        select_piece, the highlighting and check_winner all read this, and
+        it's thrown away (legal_moves = None) whenever the pieces or the turn
+        change. Anything that edits self.board by hand has to do the same.
+
+        Args:
+            None
+        Raises:
+            None
+        Returns:
+            dict: piece -> {(row, col): captured pieces} for the side to move
+        """
+        if self.legal_moves is None:
+            pieces = self.pieces[self.turn]
+            if self.forced_captures:
+                self.legal_moves = rules.forced_moves(self.board, pieces)
+            else:
+                self.legal_moves = {
+                    piece: rules.get_valid_moves(self.board, piece)
+                    for piece in pieces
+                }
+        return self.legal_moves
+
+    def set_forced_captures(self, forced):
+        """
+        Turns the forced captures rule on or off in the middle of a game.
+
+        Args:
+            forced (bool): whether captures are mandatory from now on
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.forced_captures = forced
+        self.legal_moves = None
+        if self.selected is not None and not self.jumping:
+            self.valid_moves = dict(
+                self.get_legal_moves().get(self.selected, {})
+            )
+        self.jumping = self.jumping and forced
 
     def get_all_pieces(self, color):  # gets the pieces that are on the board
         """
-        This gets all of the pieces from the color that are on the board.
+        This gets all of the pieces from the color that are on the board,
+        from top left to bottom right like the board itself. It sorts the
+        color's piece set instead of going through all 64 squares.
 
         Args:
             color (Piece.color): this is the color of the piece
@@ -422,12 +631,33 @@ class Board:
         Returns:
             list: list of all of the pieces with that color
         """
-        pieces = []  # the pieces on the board
-        for row in self.board:
-            for piece in row:
-                if piece != 0 and piece.color == color:
-                    pieces.append(piece)
-        return pieces
+        return sorted(self.pieces[color], key=attrgetter("row", "column"))
+
+    def piece_count(self, color):
+        """
+        Returns:
+            int: how many pieces of the color are on the board
+        """
+        return len(self.pieces[color])
+
+    def material(self):
+        """
+        The score shown on the side panel, a pawn is worth 1 and a king 3.
+
+        Returns:
+            dict: "Blue" and "Pink" -> material left on the board
+        """
+        return {
+            "Blue": self.piece_count(BLUE) + self.cyan_kings * 2,
+            "Pink": self.piece_count(DARK_PINK) + self.pink_kings * 2,
+        }
+
+    def time_control(self):
+        """
+        Returns:
+            int: seconds each player's clock started with
+        """
+        return self.blue_timer.initial_ns // 1_000_000_000
 
     def select_piece(self, row, col):
         """
@@ -448,7 +678,8 @@ class Board:
             return False
 
         self.selected = piece
-        self.valid_moves = self.get_valid_moves(piece)
+        # a copy, move() replaces valid_moves but the cache must stay as is
+        self.valid_moves = dict(self.get_legal_moves().get(piece, {}))
 
         return True
 
@@ -473,75 +704,194 @@ class Board:
 
         # get the captures for this move
         captures = self.valid_moves[(row, col)]
+        self.dirty_squares.add(self.selected.position)
+        self.dirty_squares.add((row, col))
+        for captured_piece in captures:
+            self.dirty_squares.add(captured_piece.position)
 
-        # remove captured pieces from the board since if they are still there
-        # the 2D borad is not accurate
+        # update each color's pieces for the captured ones
         for captured_piece in captures:
-            self.board[captured_piece.row][captured_piece.column] = 0  # turn
-            # captured pieces to zeros in the board
-            self.captured.append(captured_piece)  # add them to captures
-
-            # now let's update each color's pieces
-            if captured_piece.color == BLUE:
-                if captured_piece.king:  # if king reduce from kings
-                    self.cyan_kings -= 1
-                else:  # if not then it's a pawn
-                    self.cyan_pawns -= 1
-            else:
-                if captured_piece.king:
-                    self.pink_kings -= 1
-                else:
-                    self.pink_pawns -= 1
-
-        # now we move the piece
-        old_row, old_col = self.selected.row, self.selected.column
-        self.board[old_row][old_col] = 0
-        self.board[row][col] = self.selected
-        self.selected.move(row, col)
-
-        # check for king promotion
-        if not self.selected.king:  # only if already not a king, not necessary
-            # but better to have it just to make sure
-            if (self.selected.color == BLUE and row == 0) or (
-                self.selected.color == DARK_PINK and row == ROWS - 1
-            ):  # cheking for the last and first row
-
-                # Replace the pawn with a king ( this could be done by just
-                # changing the status of self.king,but for drawing them we
-                # would face some complications)
-                old_piece = self.selected
-                new_king = King(row, col, old_piece.color)
-                self.board[row][col] = new_king
-                self.selected = new_king
-
-                if self.selected.color == BLUE:  #  we add
-                    # to kings poplultion and reduce from pawns
-                    self.cyan_kings += 1
-                    self.cyan_pawns -= 1
-                else:
-                    self.pink_kings += 1
-                    self.pink_pawns -= 1
-
-        # check for additional captures after this move
+            self.capture_piece(captured_piece)  # add them to captures
+            self.count_piece(captured_piece, -1)
+
+        # now we move the piece, the rules take the captured pieces off the
+        # board and swap the pawn for a King object when it gets promoted
+        origin = self.selected.position
+        was_king = self.selected.king
+        moved = rules.apply_move(self.board, self.selected, row, col, captures)
+        self.moves_played.append((
+            "Blue" if moved.color == BLUE else "Pink",
+            origin, (row, col), len(captures),
+        ))
+        self.legal_moves = None  # the position changed
+        self.key ^= zobrist.move_key(
+            moved.color, was_king, origin, (row, col), captures, moved.king
+        )
+        if moved is not self.selected:  # promoted
+            # we add to kings poplultion and reduce from pawns
+            self.count_piece(self.selected, -1)
+            self.count_piece(moved, 1)
+            self.selected = moved
+
+        # check for additional captures after this move, only the captures
+        # of this piece can continue the turn
         if captures:
-            additional_moves = self.get_valid_moves(self.selected)  # function
-            # explained before
-
-            capture_moves = {}
-            for pos, caps in additional_moves.items():
-                if caps:  # only keep moves that have captured pieces
-                    capture_moves[pos] = caps
-
+            capture_moves = self.get_capture_moves(self.selected)
             if capture_moves:
                 self.valid_moves = capture_moves
+                # with forced captures the chain can't be stopped halfway
+                self.jumping = self.forced_captures
                 return True  # Keep the same piece selected for multi-jump
 
         # End turn, next player please
+        self.jumping = False
         self.selected = None
         self.valid_moves = {}  # empty the valid moves
         self.change_turn()
         return True
 
+    def capture_piece(self, piece):
+        """
+        Adds a piece to the captured ones. Its color's sorted list gets it
+        in its place (kings first, after the pieces of the same kind that
+        were captured before it) and that color's strip in the side panel
+        is drawn again next time.
+
+        Args:
+            piece (Piece): the piece taken off the board
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.captured.append(piece)
+        bisect.insort(
+            self.captured_sorted[piece.color], piece,
+            key=lambda captured: -captured.points,
+        )
+        self.captured_strips[piece.color] = None
+
+    def release_piece(self, piece):
+        """
+        Takes back the last captured piece, for unmake_move.
+
+        Args:
+            piece (Piece): the piece, the last one in self.captured
+        Raises:
+            ValueError: If the piece wasn't captured
+        Returns:
+            None
+        """
+        self.captured.pop()
+        self.captured_sorted[piece.color].remove(piece)
+        self.captured_strips[piece.color] = None
+
+    def count_piece(self, piece, amount):
+        """
+        Adds amount to the pawn or king counter of the piece's color and
+        adds the piece to (or takes it out of) the color's piece set.
+
+        Args:
+            piece (Piece): the piece being added or removed
+            amount (int): 1 when it joins the board, -1 when it leaves
+        Raises:
+            None
+        Returns:
+            None
+        """
+        if amount > 0:
+            self.pieces[piece.color].add(piece)
+        else:
+            self.pieces[piece.color].discard(piece)
+
+        if piece.color == BLUE:
+            if piece.king:
+                self.cyan_kings += amount
+            else:
+                self.cyan_pawns += amount
+        else:
+            if piece.king:
+                self.pink_kings += amount
+            else:
+                self.pink_pawns += amount
+
+    def make_move(self, piece, row, col, captures=None):
+        """
+        Plays a move for lookahead and analysis and remembers how to take
+        it back. Unlike move, this doesn't care about selection, timers or
+        winners, it only changes the pieces, the counters and the turn. The
+        turn goes on like in move: after a capture the same side moves
+        again while the piece can still capture, with that piece only.
+
+        Args:
+            piece (Piece): the piece that moves
+            row (int): row the piece is going to
+            col (int): column the piece is going to
+            captures (list, optional): pieces captured by the move, looked
+                up in get_valid_moves when not given
+        Raises:
+            KeyError: If the move isn't valid for the piece and no captures
+                were given
+        Returns:
+            None
+        """
+        if captures is None:
+            captures = self.get_valid_moves(piece)[(row, col)]
+
+        was_king = piece.king
+        record = rules.make_move(self.board, piece, row, col, captures)
+        self.legal_moves = None
+        self.key ^= zobrist.move_key(
+            piece.color, was_king, record.origin, (row, col), captures,
+            record.promoted,
+        )
+        for captured_piece in captures:
+            self.capture_piece(captured_piece)
+            self.count_piece(captured_piece, -1)
+        if record.promoted:
+            self.count_piece(piece, -1)
+            self.count_piece(self.board[row][col], 1)
+
+        passed = not (
+            captures and rules.can_capture(self.board, self.board[row][col])
+        )
+        self.history.append((record, passed))
+        if passed:
+            self.key ^= zobrist.SIDE_KEY
+            self.turn = DARK_PINK if self.turn == BLUE else BLUE
+
+    def unmake_move(self):
+        """
+        Takes back the last move made with make_move.
+
+        Args:
+            None
+        Raises:
+            IndexError: If there is no move to take back
+        Returns:
+            rules.UndoRecord: the record of the move taken back
+        """
+        record, passed = self.history.pop()
+        if record.promoted:
+            promoted = self.board[record.piece.row][record.piece.column]
+            self.count_piece(promoted, -1)
+            self.count_piece(record.piece, 1)
+
+        target = record.piece.position
+        rules.unmake_move(self.board, record)
+        self.legal_moves = None
+        for captured_piece in reversed(record.captured):
+            self.release_piece(captured_piece)
+            self.count_piece(captured_piece, 1)
+        self.key ^= zobrist.move_key(
+            record.piece.color, record.piece.king, record.origin, target,
+            record.captured, record.promoted,
+        )
+        if passed:
+            self.key ^= zobrist.SIDE_KEY
+            self.turn = DARK_PINK if self.turn == BLUE else BLUE
+        return record
+
     def change_turn(self):
         """
         Turn manager: Changes turn to other player and updates timers.
@@ -565,12 +915,19 @@ class Board:
             self.blue_timer.is_active = True
 
         self.turn = DARK_PINK if self.turn == BLUE else BLUE
+        self.move_count += 1
+        self.legal_moves = None  # the other side's moves now
+        self.key ^= zobrist.SIDE_KEY
+        self.position_counts[self.key] = (
+            self.position_counts.get(self.key, 0) + 1
+        )
         self.check_winner()
 
     def update_timers(self):
         """ 
-        updates game timers and checks for expired timers, if any, they lose.
-        also converts milliseconds to seconds and updates both player timers.
+        checks for expired timers, if any, they lose. The player timers
+        work out their time left from the clock themselves, so nothing is
+        counted here and calling it more than once a frame changes nothing.
 
         Args:
             None
@@ -579,22 +936,41 @@ class Board:
         Returns:
             None
         """
-        current_time = pygame.time.get_ticks()  # time is ticking
-        dt = (current_time - self.last_update) / 1000.0  # now we convert ms to
-        # seconds, dt is delta time
-        self.last_update = current_time
-        self.blue_timer.update(dt)
-        self.pink_timer.update(dt)
-
         # check for time already being expired and they're out of time
         # (or already done (the game))
         if self.blue_timer.is_expired():  # if blue's time is over pink wins
             self.winner = "Pink"
             self.status = "game_over"
+            self.blue_timer.is_active = False  # stop it at (about) 0
 
         elif self.pink_timer.is_expired():  # opposite of last statement
             self.winner = "Blue"
             self.status = "game_over"
+            self.pink_timer.is_active = False
+
+    def ms_to_next_second(self, game_timer):
+        """
+        How long until one of the clocks on screen shows a new second, the
+        overall timer or the player timer that is running. Until then
+        nothing on screen changes by itself.
+
+        Args:
+            game_timer (GameTimer): the overall timer
+        Raises:
+            None
+        Returns:
+            int: milliseconds, at least 1
+        """
+        elapsed = game_timer.clock.ticks() - game_timer.start_time
+        wait = 1000 - elapsed % 1000
+        for timer in (self.blue_timer, self.pink_timer):
+            left = timer.ns_left()
+            if timer.is_active and left > 0:
+                # the timer shows whole seconds, it changes when the time
+                # left goes below the next whole second down
+                part = (left - 1) % 1_000_000_000 + 1
+                wait = min(wait, part / 1_000_000)
+        return max(1, int(wait) + 1)
 
     # Clear winning and losing conditions:
     def check_winner(self):
@@ -602,6 +978,7 @@ class Board:
         Checks if game has a winner based on: whether there is pieces remaining
         or whether there is No valid moves left for either player
         Timer expired for either of the players which makes them lose.
+        The same position coming up a third time is a draw.
         Updates winner attribute and game status if winner found.
 
         Args:
@@ -611,33 +988,19 @@ class Board:
         Returns:
             None
         """
-        blue_pieces = self.get_all_pieces(BLUE)
-        pink_pieces = self.get_all_pieces(DARK_PINK)
-
-        # check if a player has no pieces left:
-
-        if not blue_pieces:
-            self.winner = "Pink"
+        winner = rules.find_winner(
+            self.board, self.turn, self.pieces, self.get_legal_moves()
+        )
+        if winner:
+            self.winner = winner
             self.status = "game_over"
 
-        elif not pink_pieces:
-            self.winner = "Blue"
+        # the same position for the third time with the same player to move
+        # is a draw
+        elif self.position_counts.get(self.key, 0) >= 3:
+            self.winner = "Draw"
             self.status = "game_over"
 
-        else:
-            # see if current player has no valid moves
-            current_pieces = blue_pieces if self.turn == BLUE else pink_pieces
-            has_moves = False
-
-            for piece in current_pieces:
-                if self.get_valid_moves(piece):
-                    has_moves = True
-                    break
-
-            if not has_moves:  # no no moves left they should loose
-                self.winner = "Pink" if self.turn == BLUE else "Blue"
-                self.status = "game_over"
-
     def handle_click(self, row, col):
         """
         checks the mouse clicks for piece selection and movement.
@@ -665,6 +1028,8 @@ class Board:
         ):  # if it's already selected(maybe another square) then
             # try to move to clicked position
             if not self.move(row, col):
+                if self.jumping:  # the jump chain has to go on
+                    return
                 # If move failed, try to select a new piece
                 if not self.select_piece(row, col):
                     self.selected = None
@@ -710,6 +1075,165 @@ class Board:
                 win, SELECTED_OUTLINE, (x, y, SQUARE_SIZE, SQUARE_SIZE), 5
             ) # the outline is gold so that it's visible
 
+    # ___________ dirty rectangles ___________
+    def square_bounds(self, row, col):
+        """
+        Everything that drawing on a square can cover: the square itself
+        and the biggest piece picture (a king, its crown sticks out up and
+        to the left into the next squares).
+
+        Args:
+            row (int): row of the square
+            col (int): column of the square
+        Raises:
+            None
+        Returns:
+            pygame.Rect: the area to draw again when the square changes
+        """
+        x, y = col * SQUARE_SIZE, row * SQUARE_SIZE
+        bounds = pygame.Rect(x, y, SQUARE_SIZE, SQUARE_SIZE)
+        sprite, (dx, dy) = piece_sprite(BLUE, True, "board")
+        bounds.union_ip(sprite.get_rect(topleft=(
+            x + SQUARE_SIZE // 2 + dx, y + SQUARE_SIZE // 2 + dy,
+        )))
+        return bounds
+
+    def border_rects(self):
+        """
+        Returns:
+            list: the four sides of the turn colored border around the board
+        """
+        x, y, width, height = constants.BOARD_RECT
+        border = constants.BOARD_BORDER
+        return [
+            pygame.Rect(x, y, width, border),
+            pygame.Rect(x, y + height - border, width, border),
+            pygame.Rect(x, y, border, height),
+            pygame.Rect(x + width - border, y, border, height),
+        ]
+
+    def find_changes(self, game_timer):
+        """
+        Compares what is on the screen with the game now and marks what
+        changed as dirty. Moves mark their own squares (see move), this
+        catches the rest: the selection, the timers, the panel and the
+        menus.
+
+        Args:
+            game_timer (GameTimer): Overall game timer
+        Raises:
+            None
+        Returns:
+            None
+        """
+        now = {
+            "selection": (
+                self.selected.position if self.selected else None,
+                frozenset(self.valid_moves),
+            ),
+            "blue_timer": self.blue_timer.format_time(),
+            "pink_timer": self.pink_timer.format_time(),
+            "overall_timer": game_timer.format_time(),
+            "turn": self.turn,
+            # scores, captured pieces and the all time wins in the panel
+            "panel": (len(self.captured), self.cyan_kings, self.pink_kings,
+                      tuple(self.refresh_wins().items())),
+            # the menus cover the whole window
+            "screen": (self.paused, self.status, self.winner),
+        }
+        shown = self.shown
+        self.shown = now
+        if not shown or shown["screen"] != now["screen"]:
+            self.redraw_all = True
+            return
+
+        if shown["selection"] != now["selection"]:
+            for state in (shown["selection"], now["selection"]):
+                selected, targets = state
+                if selected is not None:
+                    self.dirty_squares.add(selected)
+                self.dirty_squares.update(targets)
+        if shown["blue_timer"] != now["blue_timer"]:
+            self.dirty_rects.append(PANEL_TIMER_DOWN)
+        if shown["pink_timer"] != now["pink_timer"]:
+            self.dirty_rects.append(PANEL_TIMER_UP)
+        if shown["overall_timer"] != now["overall_timer"]:
+            self.dirty_rects.append(PANEL_OVERALL_TIMER_RECT)
+        if shown["turn"] != now["turn"]:
+            self.dirty_rects.extend(self.border_rects())
+            self.dirty_rects.append(PANEL_RECT)
+        elif shown["panel"] != now["panel"]:
+            self.dirty_rects.append(PANEL_RECT)
+
+    def draw_frame(self, win, font, game_timer, profiler=None):
+        """
+        Draws the whole window: the board, the side panel and the pause
+        menu when paused.
+
+        Args:
+            win (pygame.Surface): Surface to draw on
+            font (pygame.font.Font): Font for text
+            game_timer (GameTimer): Overall game timer
+            profiler (FrameProfiler, optional): times each part. Defaults
+                to None
+        Raises:
+            None
+        Returns:
+            None
+        """
+        self.draw_whole(win)
+        if profiler is not None:
+            profiler.mark("draw_whole")
+        self.draw_side_panel(win, font, game_timer)  # and the winner menu
+        if profiler is not None:
+            profiler.mark("draw_side_panel")
+        if self.paused:
+            self.draw_pause_menu(win, font)
+            if profiler is not None:
+                profiler.mark("menus")
+
+    def render(self, win, font, game_timer, profiler=None):
+        """
+        Draws only the parts of the window that changed since the last
+        frame. Each dirty area is drawn with the window clipped to it, so
+        pieces, borders and menus overlapping it come out right without
+        drawing anything outside it.
+
+        Args:
+            win (pygame.Surface): Surface to draw on
+            font (pygame.font.Font): Font for text
+            game_timer (GameTimer): Overall game timer
+            profiler (FrameProfiler, optional): times the drawing. Defaults
+                to None
+        Raises:
+            None
+        Returns:
+            list: the rectangles drawn, for pygame.display.update. Empty
+            when nothing changed so the frame can be skipped
+        """
+        self.find_changes(game_timer)
+        if self.redraw_all:
+            rects = [win.get_rect()]
+        else:
+            rects = [
+                self.square_bounds(row, col)
+                for row, col in self.dirty_squares
+            ]
+            rects = merge_rects(rects + self.dirty_rects)
+        self.redraw_all = False
+        self.dirty_squares.clear()
+        self.dirty_rects = []
+
+        window = win.get_rect()
+        rects = [rect.clip(window) for rect in rects]
+        if profiler is not None:
+            profiler.mark("dirty_rects")
+        for rect in rects:
+            win.set_clip(rect)
+            self.draw_frame(win, font, game_timer, profiler)
+        win.set_clip(None)
+        return rects
+
     def draw_side_panel(self, win, font, game_timer):
         """
         Draws game information and timer panel which includes player timers, 
@@ -725,7 +1249,8 @@ class Board:
         SCREEN = win
         self.font = font
 
-        pygame.draw.rect(SCREEN, BOARD_BORDER_COLOR, BOARD_RECT, BOARD_BORDER)
+        # the grey border is part of the board background now, the turn
+        # colored one further down goes over it
         pygame.draw.rect(SCREEN, PANEL_COLOR, PANEL_RECT)
 
         pygame.draw.rect(  # the pink timer
@@ -743,7 +1268,7 @@ class Board:
 
         self.draw_scoreboard(SCREEN, font)
         # Title
-        timer_text_title = font.render("Time", True, GOLD)
+        timer_text_title = render_text(font, "Time", True, GOLD)
         text_title_rect = timer_text_title.get_rect(
             center=PANEL_OVERALL_TIMER_TEXT_TITLE_CENTRE
         )
@@ -757,8 +1282,11 @@ class Board:
             border_radius=PANEL_TIME_RADIUS,
         )
         # Overall timer text
-        overall_timer_text = font.render(
-            f"{game_timer.format_time()}", True, PANEL_OVERALL_TIMER_TEXT_COLOR
+        overall_timer_text = render_text(
+            font,
+            f"{game_timer.format_time()}",
+            True,
+            PANEL_OVERALL_TIMER_TEXT_COLOR,
         )
         text_rect = overall_timer_text.get_rect(
             center=PANEL_OVERALL_TIMER_TEXT_CENTRE
@@ -767,11 +1295,17 @@ class Board:
 
         # Current turn indicator
         (
-            pygame.draw.rect(SCREEN, BLUE, BOARD_RECT, BOARD_BORDER)
+            pygame.draw.rect(
+                SCREEN, BLUE, constants.BOARD_RECT, constants.BOARD_BORDER
+            )
             if self.turn == BLUE
-            else pygame.draw.rect(SCREEN, DARK_PINK, BOARD_RECT, BOARD_BORDER)
+            else pygame.draw.rect(
+                SCREEN, DARK_PINK, constants.BOARD_RECT,
+                constants.BOARD_BORDER,
+            )
         )
-        turn_text = font.render(
+        turn_text = render_text(
+            font,
             "Blue's Turn" if self.turn == BLUE else "Pink's Turn",
             True,
             BLUE if self.turn == BLUE else DARK_PINK,
@@ -779,24 +1313,18 @@ class Board:
         SCREEN.blit(turn_text, (920, 120))
 
         # Scores
-        blue_score = (
-            len([p for p in self.get_all_pieces(BLUE)]) + self.cyan_kings * 2
-        )
-
-        pink_score = (
-            len([p for p in self.get_all_pieces(DARK_PINK)])
-            + self.pink_kings * 2
-        )
-        score_text = font.render(f"Blue: {blue_score}", True, WHITE)
+        material = self.material()
+        blue_score, pink_score = material["Blue"], material["Pink"]
+        score_text = render_text(font, f"Blue: {blue_score}", True, WHITE)
         SCREEN.blit(score_text, (920, 900 - 180))
 
-        score_text = font.render(f"Pink: {pink_score}", True, WHITE)
+        score_text = render_text(font, f"Pink: {pink_score}", True, WHITE)
         SCREEN.blit(score_text, (920, 180))
         self.draw_captured_pieces(SCREEN)
 
         # Render and center the blue timer text
-        blue_timer_text = font.render(
-            f"{self.blue_timer.format_time()}", True, BLUE
+        blue_timer_text = render_text(
+            font, f"{self.blue_timer.format_time()}", True, BLUE
         )
         blue_timer_rect = blue_timer_text.get_rect(
             center=PANEL_TIMER_DOWN.center
@@ -804,8 +1332,8 @@ class Board:
         SCREEN.blit(blue_timer_text, blue_timer_rect)
 
         # Render and center the pink timer text
-        pink_timer_text = font.render(
-            f"{self.pink_timer.format_time()}", True, DARK_PINK
+        pink_timer_text = render_text(
+            font, f"{self.pink_timer.format_time()}", True, DARK_PINK
         )
         pink_timer_rect = pink_timer_text.get_rect(
             center=PANEL_TIMER_UP.center
@@ -844,13 +1372,13 @@ class Board:
         )
 
         # Get stats data
-        game_stats = stats.get()
+        game_stats = self.refresh_wins()
         blue_wins = game_stats["Blue"]
         pink_wins = game_stats["Pink"]
 
         # Render the score texts
-        blue_wins_text = font.render(f"{blue_wins}", True, BLUE)
-        pink_wins_text = font.render(f"{pink_wins}", True, DARK_PINK)
+        blue_wins_text = render_text(font, f"{blue_wins}", True, BLUE)
+        pink_wins_text = render_text(font, f"{pink_wins}", True, DARK_PINK)
 
         # Get text rectangles centered on the panel centers
         blue_rect = blue_wins_text.get_rect(center=PANEL_SCORE_DOWN_CENTRE)
@@ -870,27 +1398,47 @@ class Board:
     #     )
     #     screen.blit(total_text, total_rect)
 
-    def get_sorted_captured(self, pieces):
+    def captured_strip(self, color):
         """
-        sorts the list of the captured pieces by their values.
-        Kings are 3 and pawns 1(why? because I want to).
+        The captured pieces of one color drawn the way the side panel
+        shows them, on a see-through surface just big enough for them. It
+        is drawn again only after a capture of that color (or undoing one).
 
         Args:
-            pieces (list): The list of pieces captured 
+            color (tuple): color of the captured pieces
         Raises:
             None
         Returns:
-            list: returns the sorted version of the list 
+            tuple: (pygame.Surface, (x, y)) to blit, None with no pieces
         """
-        # Sort kings first, then by row (optional)
-        sorted_list = pieces.copy()
-        mergeSort(sorted_list)  # sorts from highest to lowest
-        return sorted_list
+        if self.captured_strips[color] is None and self.captured_sorted[color]:
+            spots = []
+            for index, piece in enumerate(self.captured_sorted[color]):
+                row, column = divmod(index, CAPTURED_PER_ROW)
+                x = CAPTURED_START_X + column * CAPTURED_SPACING
+                y = CAPTURED_START_Y[color] + row * CAPTURED_SPACING
+                sprite, (dx, dy) = piece_sprite(piece.color, piece.king,
+                                                "small")
+                spots.append((piece, x, y,
+                              sprite.get_rect(topleft=(x + dx, y + dy))))
+            bounds = spots[0][3].unionall([spot[3] for spot in spots])
+
+            strip = pygame.Surface(bounds.size, pygame.SRCALPHA)
+            for piece, x, y, _ in spots:
+                piece.draw_small(strip, x - bounds.x, y - bounds.y)
+            if pygame.display.get_surface() is not None:
+                strip = strip.convert_alpha()
+            # run length encoded: the see-through pixels between the pieces
+            # are skipped in one go, the strip is never drawn on again
+            strip.set_alpha(255, pygame.RLEACCEL)
+            self.captured_strips[color] = (strip, bounds.topleft)
+        return self.captured_strips[color]
 
     def draw_captured_pieces(self, win):
         """
         shows the captured pieces in the side panel. these are
-        small versions of captured pieces organized by color and type.
+        small versions of captured pieces organized by color and type,
+        kings first.
 
         Args:
             win (pygame.Surface): Surface to draw on
@@ -899,33 +1447,12 @@ class Board:
         Returns:
             None
         """
-        # Constants
-        start_x = 930
-        blue_start_y = HEIGHT - 310  # Captured pink pieces (by blue)
-        pink_start_y = 264  # Captured blue pieces (by pink)
-        spacing = 44
-        pieces_per_row = 6
-        captured_by_blue = self.get_sorted_captured(
-            [piece for piece in self.captured if piece.color == DARK_PINK]
-        )
-        captured_by_pink = self.get_sorted_captured(
-            [piece for piece in self.captured if piece.color == BLUE]
-        )
-
-        for idx, piece in enumerate(
-            captured_by_blue
-        ):  # go through the list of
-            # pieces and draw the small version of them according to the
-            # panel's position and their own radius and dimensions
-            piece_x = start_x + (idx % pieces_per_row) * spacing
-            piece_y = blue_start_y + (idx // pieces_per_row) * spacing
-            piece.draw_small(win, piece_x, piece_y)
-
-        for idx, piece in enumerate(captured_by_pink):  # same but for blue
-            # pieces(captured by pink)
-            piece_x = start_x + (idx % pieces_per_row) * spacing
-            piece_y = pink_start_y + (idx // pieces_per_row) * spacing
-            piece.draw_small(win, piece_x, piece_y)
+        # the captured pink pieces (by blue) go at the bottom and the blue
+        # ones (by pink) at the top, each color drawn once into its strip
+        for color in (DARK_PINK, BLUE):
+            strip = self.captured_strip(color)
+            if strip is not None:
+                win.blit(*strip)
 
     # inspired from this YT video showing python transparency:
     # https://www.youtube.com/watch?v=8_HVdxBqJmE
@@ -946,42 +1473,15 @@ class Board:
         Returns:
             None
         """
-        # Semi-transparent overlay
-        overlay = pygame.Surface((WIDTH, HEIGHT))
-        overlay.set_alpha(180)
-        overlay.fill((0, 0, 0))
-        screen.blit(overlay, (0, 0))
-
-        # Winner message
-        win_text = f"{self.winner.upper()} WINS!"  # type:ignore
-        # (this is to tell nvim to ignore this error by pyright I was
-        # getting in nvim)
-
-        text = font.render(win_text, True, (255, 215, 0))  # Gold
-        text_rect = text.get_rect(center=(WIDTH // 2, HEIGHT // 2 - 20))
-        screen.blit(text, text_rect)
-
-        subtext = font.render(
-            "Press R to restart or ESC to quit to Main Menu",
-            True,
-            (200, 200, 200),
-        )
-        subtext_rect = subtext.get_rect(center=(WIDTH // 2, HEIGHT // 2 + 30))
-        screen.blit(subtext, subtext_rect)  # just draw the two text and the
-        # background
-
-        # Reset scores instruction
-        reset_text = font.render("Press L to reset scores", True, WHITE)
-        reset_rect = reset_text.get_rect(
-            center=(WIDTH // 2, HEIGHT // 2 + 100)
-        )
-        screen.blit(reset_text, reset_rect)
+        # Semi-transparent overlay and the messages, cached per winner
+        draw_overlay(screen, font, winner_lines(self.winner))
 
     def squares(self, win):
         """
         Draws the checkerboard pattern and tile of alternating colored squares.
         this leads to the classic checkers board this time cyan and white.
-        this is a visual representation. 
+        this is a visual representation. The pattern and the border are
+        drawn only once (board_background), this just blits them.
 
         Args:
             win (pygame.Surface): Surface to draw the board on
@@ -990,37 +1490,7 @@ class Board:
         Returns:
             None
         """
-        win.fill(CYAN)
-        for row in range(ROWS):
-            if row % 2 == 1:  # start drawing from second square if row is odd
-                # number
-                for column in range(1, COLUMNS, 2):
-                    pygame.draw.rect(
-                        win,
-                        WHITE,
-                        (
-                            row * SQUARE_SIZE,
-                            column * SQUARE_SIZE,
-                            SQUARE_SIZE,
-                            SQUARE_SIZE,
-                        ),  # makes sure we have enough squares correct color
-                    )
-            else:  # draw from the first square, every second squares if row is
-                # even
-                for column in range(0, COLUMNS, 2):
-                    pygame.draw.rect(
-                        win,
-                        WHITE,
-                        (
-                            row * SQUARE_SIZE,
-                            column * SQUARE_SIZE,
-                            SQUARE_SIZE,
-                            SQUARE_SIZE,
-                        ),
-                    )
-            # puts squares once in two squares, we always start
-            # drawing from top left corner, so when we start drawing,
-            # we're at point 00
+        win.blit(board_background(), (0, 0))
 
     def draw_whole(self, win):
         """
@@ -0,0 +1,89 @@
+"""
+Clocks for the game timers. GameTimer and the Board ask a clock for the time
+instead of calling pygame.time.get_ticks() themselves, so a game can run on
+a clock that is moved by hand (tests) or that goes faster than real time
+(simulating lots of timed games).
+
+Every clock has ticks(), milliseconds since some start, and ticks_ns(), the
+same in nanoseconds. Neither ever goes back.
+"""
+import time
+
+
+class RealClock:
+    """
+    The clock the game uses: pygame's milliseconds since pygame.init().
+    pygame is looked up on every call, so mock.patch on
+    pygame.time.get_ticks still works.
+    """
+
+    def ticks(self):
+        import pygame  # only this clock needs pygame
+
+        return pygame.time.get_ticks()
+
+    def ticks_ns(self):
+        return self.ticks() * 1_000_000  # pygame only counts milliseconds
+
+
+class ManualClock:
+    """
+    A clock that only moves when it's told to.
+
+    Attributes:
+        now (int): the time in milliseconds
+    """
+
+    def __init__(self, start=0):
+        self.now = start
+
+    def ticks(self):
+        return self.now
+
+    def ticks_ns(self):
+        return self.now * 1_000_000
+
+    def advance(self, ms):
+        """
+        Moves the clock forward.
+
+        Args:
+            ms (int): milliseconds to add
+        Raises:
+            ValueError: If ms is negative, clocks don't go back
+        Returns:
+            int: the new time
+        """
+        if ms < 0:
+            raise ValueError("a clock can't go back")
+        self.now += ms
+        return self.now
+
+
+class AcceleratedClock:
+    """
+    Real time (time.monotonic_ns, no pygame needed) sped up by factor, a
+    factor of 60 turns a 5 minutes timer into 5 seconds.
+
+    Attributes:
+        factor (float): how many times faster than real time
+    """
+
+    def __init__(self, factor):
+        """
+        Args:
+            factor (float): how many times faster than real time
+        Raises:
+            ValueError: If factor isn't more than 0
+        """
+        if factor <= 0:
+            raise ValueError("factor must be more than 0")
+        self.factor = factor
+        self._start = time.monotonic_ns()
+
+    def ticks(self):
+        return self.ticks_ns() // 1_000_000
+
+    def ticks_ns(self):
+        elapsed = time.monotonic_ns() - self._start
+        return int(elapsed * self.factor)
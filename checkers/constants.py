@@ -1,4 +1,3 @@
-import pygame
 import os
 
 # what is the parent directory? important to be able to access assets
@@ -73,20 +72,6 @@ PANEL_SCORE_DOWN_CENTRE = (910 + 90 // 2, 790 + 80 // 2)
 PANEL_TIMER_UP_TEXT_CENTRE = (1010 + 180 // 2, 30 + 80 // 2)
 PANEL_TIMER_DOWN_TEXT_CENTRE = (1010 + 180 // 2, 790 + 80 // 2)
 
-# PANEL:RECTS
-PANEL_RECT = pygame.Rect(899.9, 0, 900, 900)
-PANEL_TIMER_UP = pygame.Rect(1010, 30, 180, 80)  # higher time rectangle
-PANEL_TIMER_DOWN = pygame.Rect(1010, 790, 180, 80)  # low time rectangle
-PANEL_SCORE_TIMER_DOWN = pygame.Rect(910, 30, 90, 80)  # top score rectangle
-PANEL_SCORE_TIMER_UP = pygame.Rect(910, 790, 90, 80)
-PANEL_OVERALL_TIMER_RECT = pygame.Rect(
-    PANEL_OVERALL_TIMER_X,
-    PANEL_OVERALL_TIMER_Y,
-    PANEL_OVERALL_TIMER_WIDTH,
-    PANEL_OVERALL_TIMER_HEIGHT,
-)
-
-
 PANEL_TIME_RADIUS = 16  # for rounded corners
 PANEL_TIME_BG_COLOR = (197, 216, 228)
 PANEL_TIME_BORDER_COLOR = (255, 255, 255)  # White
@@ -97,13 +82,72 @@ PANEL_OVERALL_TIMER_TEXT_COLOR = (245, 222, 179)  # Warm Beige
 COLUMNS = 8
 ROWS = 8
 SQUARE_SIZE = HEIGHT // ROWS
-BOARD_RECT = pygame.Rect(0.5, 0, 899, 900)
 
 # Images
 # Get parent directory (culminating) path
 crown_path = os.path.join(parent_dir, "imgs", "crown.png")
 
-# Crown of the kings whenever a piece becomes a king
-CROWN = pygame.image.load(crown_path)
-CROWN = pygame.transform.scale(CROWN, (70, 65))
-CROWN_RECT = CROWN.get_rect()
+
+# Everything below needs pygame, so it is only built the first time someone
+# asks for it (module __getattr__, PEP 562). This keeps the plain numbers
+# above importable by the rules without pygame or loading the crown image.
+def _make_rects():
+    import pygame
+
+    return {
+        "BOARD_RECT": pygame.Rect(0.5, 0, 899, 900),
+        "PANEL_RECT": pygame.Rect(899.9, 0, 900, 900),
+        # higher time rectangle
+        "PANEL_TIMER_UP": pygame.Rect(1010, 30, 180, 80),
+        # low time rectangle
+        "PANEL_TIMER_DOWN": pygame.Rect(1010, 790, 180, 80),
+        # top score rectangle
+        "PANEL_SCORE_TIMER_DOWN": pygame.Rect(910, 30, 90, 80),
+        "PANEL_SCORE_TIMER_UP": pygame.Rect(910, 790, 90, 80),
+        "PANEL_OVERALL_TIMER_RECT": pygame.Rect(
+            PANEL_OVERALL_TIMER_X,
+            PANEL_OVERALL_TIMER_Y,
+            PANEL_OVERALL_TIMER_WIDTH,
+            PANEL_OVERALL_TIMER_HEIGHT,
+        ),
+    }
+
+
+def _make_crown():
+    import pygame
+
+    # Crown of the kings whenever a piece becomes a king
+    crown = pygame.image.load(crown_path)
+    crown = pygame.transform.scale(crown, (70, 65))
+    return {"CROWN": crown, "CROWN_RECT": crown.get_rect()}
+
+
+_LAZY = {
+    "BOARD_RECT": _make_rects,
+    "PANEL_RECT": _make_rects,
+    "PANEL_TIMER_UP": _make_rects,
+    "PANEL_TIMER_DOWN": _make_rects,
+    "PANEL_SCORE_TIMER_DOWN": _make_rects,
+    "PANEL_SCORE_TIMER_UP": _make_rects,
+    "PANEL_OVERALL_TIMER_RECT": _make_rects,
+    "CROWN": _make_crown,
+    "CROWN_RECT": _make_crown,
+}
+
+
+def __getattr__(name):
+    """
+    Builds the pygame objects of this module the first time they are used.
+
+    Args:
+        name (str): the missing module attribute
+    Raises:
+        AttributeError: If the name is not one of the lazy constants
+    Returns:
+        the pygame object (Rect or Surface)
+    """
+    if name not in _LAZY:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    values = _LAZY[name]()
+    globals().update(values)  # cached, next lookups don't come here
+    return values[name]
@@ -0,0 +1,302 @@
+"""
+Perft: counts every position reachable in exactly N turns. It's the usual way
+of checking a move generator (the counts must never change unless the rules
+do) and of timing it.
+
+A turn is what the game lets a player do before the other side moves: one
+regular move, or a capture and then every capture the same piece goes on
+with, like Board.move keeps the piece selected. Each way of clicking through
+a jump chain counts as its own turn.
+
+Our rules aren't the standard ones (captures aren't forced and a king's jump
+chain can go round back to where it was) so the usual published checkers
+numbers don't apply. KNOWN_COUNTS holds the numbers for our rules from the
+start position, and the BitBoard generator is a second, independent
+implementation the Board's counts can be compared with.
+
+Usage:
+    python -m checkers.perft 6
+    python -m checkers.perft 5 --divide
+    python -m checkers.perft 4 --position position.txt --turn pink
+
+A position file has 8 lines of 8 characters: "." empty, "b" blue pawn,
+"B" blue king, "p" pink pawn and "P" pink king.
+"""
+import argparse
+import time
+
+from .bitboard import BitBoard, square_index
+from .constants import BLUE, DARK_PINK, ROWS, COLUMNS
+
+# perft from the start position with blue to move, depth -> leaf count.
+# The first jump chain comes up 7 turns in, the counts before that are the
+# same whether a chain is one turn or not
+KNOWN_COUNTS = {
+    1: 7, 2: 49, 3: 379, 4: 2872, 5: 23582, 6: 190647, 7: 1605412,
+}
+
+SYMBOLS = {"b": (BLUE, False), "B": (BLUE, True),
+           "p": (DARK_PINK, False), "P": (DARK_PINK, True)}
+
+
+def parse_position(text):
+    """
+    Reads a position in the 8 lines format described at the top.
+
+    Args:
+        text (str): the 8 lines
+    Raises:
+        ValueError: If there aren't 8 rows of 8 squares, a symbol is unknown
+            or a piece is on a light square
+    Returns:
+        BitBoard: the position
+    """
+    rows = [line.strip() for line in text.splitlines() if line.strip()]
+    if len(rows) != ROWS or any(len(row) != COLUMNS for row in rows):
+        raise ValueError("a position needs 8 rows of 8 squares")
+
+    bitboard = BitBoard()
+    for row, line in enumerate(rows):
+        for column, symbol in enumerate(line):
+            if symbol == ".":
+                continue
+            if symbol not in SYMBOLS:
+                raise ValueError(f"unknown square {symbol!r}")
+            color, king = SYMBOLS[symbol]
+            bit = 1 << square_index(row, column)
+            if color == BLUE:
+                if king:
+                    bitboard.blue_kings |= bit
+                else:
+                    bitboard.blue_men |= bit
+            else:
+                if king:
+                    bitboard.pink_kings |= bit
+                else:
+                    bitboard.pink_men |= bit
+    return bitboard
+
+
+def board_moves(board):
+    """
+    Every move of the side to move on a Board.
+
+    Returns:
+        list: (piece, (row, column), captured pieces) tuples
+    """
+    moves = []
+    for piece in board.get_all_pieces(board.turn):
+        for target, captures in board.get_valid_moves(piece).items():
+            moves.append((piece, target, captures))
+    return moves
+
+
+def board_turns(board):
+    """
+    Plays every whole turn of the side to move on a Board, one at a time.
+    Each turn is taken back when the next one is asked for.
+
+    Args:
+        board (Board): the position, with board.turn to move
+    Raises:
+        None
+    Returns:
+        generator: the route of each turn, the piece's square and then
+        every square it lands on, with the turn played on the board
+    """
+    for piece, target, captures in board_moves(board):
+        yield from _board_turn(board, piece, target, captures,
+                               (piece.position,))
+
+
+def _board_turn(board, piece, target, captures, route):
+    row, col = target
+    color = board.turn
+    route += (target,)
+    board.make_move(piece, row, col, captures)
+    try:
+        if board.turn == color:  # the piece goes on jumping
+            moved = board.board[row][col]
+            for target, captures in board.get_capture_moves(moved).items():
+                yield from _board_turn(board, moved, target, captures, route)
+        else:
+            yield route
+    finally:
+        board.unmake_move()
+
+
+def perft(board, depth):
+    """
+    Counts the positions depth turns away on a Board using make_move and
+    unmake_move, the board is the same afterwards.
+
+    Args:
+        board (Board): the position, with board.turn to move
+        depth (int): how many turns deep
+    Raises:
+        None
+    Returns:
+        int: number of leaf positions
+    """
+    if depth == 0:
+        return 1
+    nodes = 0
+    for _ in board_turns(board):
+        nodes += perft(board, depth - 1)
+    return nodes
+
+
+def divide(board, depth):
+    """
+    Perft split by the first turn, to find which turn a wrong count is in.
+
+    Args:
+        board (Board): the position
+        depth (int): how many turns deep, at least 1
+    Raises:
+        None
+    Returns:
+        dict: "(row, col)-(row, col)..." turn names mapped to their counts
+    """
+    counts = {}
+    for route in board_turns(board):
+        name = "-".join(str(square) for square in route)
+        counts[name] = perft(board, depth - 1)
+    return counts
+
+
+def bitboard_turns(bitboard, color):
+    """
+    The positions after every whole turn of color with the BitBoard move
+    generator, a jump goes on while the piece that jumped can jump again.
+
+    Args:
+        bitboard (BitBoard): the position
+        color (tuple): side to move
+    Returns:
+        generator: a new BitBoard for each turn
+    """
+    for origin, target, captured in bitboard.moves(color):
+        child = bitboard.copy()
+        child.make(origin, target, captured)
+        if captured:
+            yield from _bitboard_jumps(child, target, color)
+        else:
+            yield child
+
+
+def _bitboard_jumps(bitboard, square, color):
+    king = bool(bitboard.kings(color) >> square & 1)
+    jumps = {
+        target: captured
+        for target, captured in bitboard.piece_moves(square, color, king)
+        .items()
+        if captured
+    }
+    if not jumps:
+        yield bitboard
+    for target, captured in jumps.items():
+        child = bitboard.copy()
+        child.make(square, target, captured)
+        yield from _bitboard_jumps(child, target, color)
+
+
+def perft_bitboard(bitboard, color, depth):
+    """
+    The same count with the BitBoard move generator.
+
+    Args:
+        bitboard (BitBoard): the position
+        color (tuple): side to move
+        depth (int): how many turns deep
+    Returns:
+        int: number of leaf positions
+    """
+    if depth == 0:
+        return 1
+    nodes = 0
+    other = DARK_PINK if color == BLUE else BLUE
+    for child in bitboard_turns(bitboard, color):
+        nodes += perft_bitboard(child, other, depth - 1)
+    return nodes
+
+
+def new_board(bitboard=None, turn=BLUE):
+    """
+    A Board to run perft on, without a window.
+
+    Args:
+        bitboard (BitBoard, optional): position to load, start if None
+        turn (tuple, optional): side to move. Defaults to BLUE
+    Returns:
+        Board: the board
+    """
+    from .board import Board  # drawing code, only loaded when needed
+
+    board = Board(None)
+    board.load_bitboard(bitboard or board.to_bitboard(), turn)
+    return board
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(
+        prog="python -m checkers.perft",
+        description="Count and time the checkers move generator.",
+    )
+    parser.add_argument("depth", type=int, help="deepest depth to count")
+    parser.add_argument("--position", help="file with an 8 lines position")
+    parser.add_argument("--turn", choices=["blue", "pink"], default="blue")
+    parser.add_argument(
+        "--divide", action="store_true",
+        help="split the deepest count by first move",
+    )
+    parser.add_argument(
+        "--bitboard", action="store_true",
+        help="also count with the BitBoard generator and compare",
+    )
+    args = parser.parse_args(argv)
+
+    bitboard = None
+    if args.position:
+        with open(args.position, "r") as f:
+            bitboard = parse_position(f.read())
+    turn = BLUE if args.turn == "blue" else DARK_PINK
+    board = new_board(bitboard, turn)
+    start_position = bitboard is None and turn == BLUE
+    if bitboard is None:
+        bitboard = board.to_bitboard()
+
+    failed = False
+    for depth in range(1, args.depth + 1):
+        start = time.perf_counter()
+        nodes = perft(board, depth)
+        elapsed = time.perf_counter() - start
+        nps = nodes / elapsed if elapsed > 0 else 0.0
+        line = (
+            f"depth {depth}: {nodes} nodes, {elapsed:.3f}s, "
+            f"{nps:.0f} nodes/sec"
+        )
+
+        if start_position and depth in KNOWN_COUNTS:
+            if nodes != KNOWN_COUNTS[depth]:
+                line += f"  WRONG, expected {KNOWN_COUNTS[depth]}"
+                failed = True
+        if args.bitboard:
+            start = time.perf_counter()
+            bit_nodes = perft_bitboard(bitboard, turn, depth)
+            bit_elapsed = time.perf_counter() - start
+            line += f" | bitboard {bit_nodes} nodes, {bit_elapsed:.3f}s"
+            if bit_nodes != nodes:
+                line += "  MISMATCH"
+                failed = True
+        print(line)
+
+    if args.divide:
+        print()
+        for name, nodes in divide(board, args.depth).items():
+            print(f"{name}: {nodes}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
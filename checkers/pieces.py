@@ -1,10 +1,155 @@
+import math
+
 import pygame
+from . import constants
+# the crown picture is left to crown_image, importing it here would load it
 from .constants import (
     DARK_PINK,
     SQUARE_SIZE,
-    CROWN,
 )
 
+# every piece picture drawn so far, (color, king, size) -> (surface, offset)
+# where offset is where the top left corner goes compared to the piece's
+# centre. They never change so each one is only drawn once and then blitted
+_sprites = {}
+# the crown image scaled and rotated, (size, angle) -> surface
+_crowns = {}
+
+
+def piece_sprite(color, king, size):
+    """
+    The picture of a piece with its shadow, highlight and (for kings) the
+    crown already on it, drawn the first time it is asked for.
+
+    Args:
+        color (tuple): RGB color of the piece
+        king (bool): whether to put the crown on it
+        size (str): "board" for the pieces on the squares or "small" for
+            the captured ones in the side panel
+    Raises:
+        KeyError: If size is not "board" or "small"
+    Returns:
+        tuple: (pygame.Surface, (x offset, y offset)) blit the surface at
+        the piece's centre plus the offset
+    """
+    key = (color, king, size)
+    if key not in _sprites:
+        _sprites[key] = _BUILDERS[size](color, king)
+    return _sprites[key]
+
+
+def clear_sprites():
+    """Forgets the drawn sprites, for when SQUARE_SIZE or the colors change."""
+    _sprites.clear()
+    _crowns.clear()
+
+
+def crown_image(size, angle=30):
+    """
+    The crown scaled to a square of size pixels and rotated by angle
+    degrees. smoothscale and rotate are slow, so each (size, angle) is only
+    done the first time it is asked for, and the crown picture itself is
+    only loaded then too.
+
+    Args:
+        size (int): width and height of the crown before rotating
+        angle (int, optional): degrees to the left. Defaults to 30
+    Raises:
+        None
+    Returns:
+        pygame.Surface: the crown, shared so it must not be drawn on
+    """
+    key = (size, angle)
+    if key not in _crowns:
+        crown = pygame.transform.smoothscale(constants.CROWN, (size, size))
+        _crowns[key] = pygame.transform.rotate(crown, angle)
+    return _crowns[key]
+
+
+def _crown_layer(crown_size):
+    # the crown scaled down and tilted about 30 degrees to the left
+    return crown_image(int(crown_size), 30)
+
+
+def _circle_layer(color, radius):
+    layer = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(layer, color, (radius, radius), radius)
+    return layer
+
+
+def _combine(layers):
+    """
+    Blends the layers on top of each other into one surface, the same as
+    blitting them on the window one by one.
+
+    Args:
+        layers (list): (surface, (x, y)) with x and y measured from the
+            piece's centre, bottom layer first
+    Returns:
+        tuple: (surface, offset) as piece_sprite returns it
+    """
+    bounds = pygame.Rect(layers[0][1], layers[0][0].get_size())
+    for layer, position in layers[1:]:
+        bounds.union_ip(pygame.Rect(position, layer.get_size()))
+
+    sprite = pygame.Surface(bounds.size, pygame.SRCALPHA)
+    for layer, (x, y) in layers:
+        sprite.blit(layer, (x - bounds.x, y - bounds.y))
+    if pygame.display.get_surface() is not None:
+        sprite = sprite.convert_alpha()  # faster to blit, needs a window
+    return sprite, bounds.topleft
+
+
+def _board_sprite(color, king):
+    radius = SQUARE_SIZE // 2 - 10
+    layers = [
+        # shadow: a soft transparent circle under the piece, slightly lower
+        (_circle_layer((0, 0, 0, 100), radius), (-radius, -radius + 5)),
+        # the piece circle (main piece)
+        (_circle_layer(color, radius), (-radius, -radius)),
+    ]
+    # highlight circle for a subtle 3D effect (lighter, smaller radius)
+    highlight = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(
+        highlight, (255, 255, 255, 80), (radius, radius), radius // 2
+    )
+    layers.append((highlight, (-radius, -radius)))
+
+    if king:  # _______THEEEEE CROWN_____, raised up and to the left
+        crown = _crown_layer(radius * 1.5)
+        crown_rect = crown.get_rect()
+        layers.append((crown, (
+            -(crown_rect.width // 2) - 23, -(crown_rect.height // 2) - 32,
+        )))
+    return _combine(layers)
+
+
+def _small_sprite(color, king):
+    radius = SQUARE_SIZE // 4
+    layers = [
+        # white border behind the piece (slightly bigger)
+        (_circle_layer((255, 255, 255), radius + 2),
+         (-radius - 2, -radius - 2)),
+        (_circle_layer((0, 0, 0, 90), radius), (-radius, -radius + 3)),
+        (_circle_layer(color, radius), (-radius, -radius)),
+    ]
+    highlight = pygame.Surface((radius * 2, radius * 2), pygame.SRCALPHA)
+    pygame.draw.circle(
+        highlight, (255, 255, 255, 80), (radius, radius), radius // 2
+    )
+    layers.append((highlight, (-radius, -radius)))
+
+    if king:  # raised above the piece centre
+        crown_size = radius * 1.7
+        layers.append((_crown_layer(crown_size), (
+            math.floor(-(crown_size // 2) - 22),
+            math.floor(-(crown_size // 2) - radius * 0.7 - 10),
+        )))
+    return _combine(layers)
+
+
+_BUILDERS = {"board": _board_sprite, "small": _small_sprite}
+
 
 class Piece:  # the intiailization and the idea to draw anything manually
     # is half inspired from Tech with Tim checkers although it has been
@@ -53,6 +198,7 @@ class Piece:  # the intiailization and the idea to draw anything manually
         """
         Draws the base piece with shadow and highlight on it, these are 
         basically the pawns, this creates 3D appearance(at least trying).
+        The picture is drawn once per color (piece_sprite) and blitted.
 
         Args:
             win (pygame.Surface): Surface to draw on
@@ -61,37 +207,8 @@ class Piece:  # the intiailization and the idea to draw anything manually
         Returns:
             None
         """
-
-
-        radius = SQUARE_SIZE // 2 - 10
-
-        # shadow: a soft transparent circle under the piece, slightly offset
-        shadow_color = (0, 0, 0, 100)  # black with some transparency (0-255)
-        shadow_surface = pygame.Surface(
-            (radius * 2, radius * 2), pygame.SRCALPHA
-        )
-        pygame.draw.circle(
-            shadow_surface, shadow_color, (radius, radius), radius
-        )
-        shadow_pos = (
-            self.x - radius,
-            self.y - radius + 5,
-        )  # slightly lower for shadow effect
-        win.blit(shadow_surface, shadow_pos)
-
-        # Draw the piece circle (main piece)
-        pygame.draw.circle(win, self.color, (self.x, self.y), radius)
-
-        # Draw a highlight circle for a subtle 3D effect (lighter color, smaller radius)
-        highlight_color = (255, 255, 255, 80)  # white with transparency
-        highlight_surface = pygame.Surface(
-            (radius * 2, radius * 2), pygame.SRCALPHA
-        )
-        pygame.draw.circle(
-            highlight_surface, highlight_color, (radius, radius), radius // 2
-        )
-        highlight_pos = (self.x - radius, self.y - radius)
-        win.blit(highlight_surface, highlight_pos)
+        sprite, (dx, dy) = piece_sprite(self.color, False, "board")
+        win.blit(sprite, (self.x + dx, self.y + dy))
 
     def draw(self, win):
         """
@@ -120,37 +237,8 @@ class Piece:  # the intiailization and the idea to draw anything manually
         Returns:
             None
         """
-
-
-        radius = SQUARE_SIZE // 4
-
-        # Draw white border behind piece (slightly bigger)
-        border_radius = radius + 2
-        pygame.draw.circle(win, (255, 255, 255), (x, y), border_radius)
-
-        # Shadow (optional, for consistency)
-        shadow_surface = pygame.Surface(
-            (radius * 2, radius * 2), pygame.SRCALPHA
-        )
-        pygame.draw.circle(
-            shadow_surface, (0, 0, 0, 90), (radius, radius), radius
-        )
-        win.blit(shadow_surface, (x - radius, y - radius + 3))
-
-        # Main piece
-        pygame.draw.circle(win, self.color, (x, y), radius)
-
-        # Highlight (light source reflection)
-        highlight_surface = pygame.Surface(
-            (radius * 2, radius * 2), pygame.SRCALPHA
-        )
-        pygame.draw.circle(
-            highlight_surface,
-            (255, 255, 255, 80),
-            (radius, radius),
-            radius // 2,
-        )
-        win.blit(highlight_surface, (x - radius, y - radius))
+        sprite, (dx, dy) = piece_sprite(self.color, False, "small")
+        win.blit(sprite, (x + dx, y + dy))
 
     def move(self, row, column):
         """
@@ -197,6 +285,16 @@ class Piece:  # the intiailization and the idea to draw anything manually
         """
         self.king = True
 
+    def promoted(self):
+        """
+        The King that replaces this piece when it reaches the last row,
+        used by checkers.rules so it never has to know about drawing.
+
+        Returns:
+            King: a new king on the same square with the same color
+        """
+        return King(self.row, self.column, self.color)
+
     @property
     def is_king(self):
         """
@@ -293,7 +391,8 @@ class King(Piece):
     def draw(self, win):
         """
         Draws king piece with crown decoration.
-        Overrides parent draw method to add tilted crown image.
+        Overrides parent draw method to add tilted crown image, the king
+        sprite has the crown already drawn on the base piece.
 
         Args:
             win (pygame.Surface): Surface to draw on
@@ -303,27 +402,8 @@ class King(Piece):
             None
 
         """
-        self.draw_base(win)
-        # _______THEEEEE CROWN_____
-        radius = SQUARE_SIZE // 2 - 10
-        crown_size = radius * 1.5
-        crown_img_scaled = pygame.transform.smoothscale(
-            CROWN, (int(crown_size), int(crown_size))
-        )
-
-        # Rotate the crown by about 30 degrees (tilt left)
-        rotated_crown = pygame.transform.rotate(crown_img_scaled, 30)
-
-        # Get the rect to help with positioning
-        crown_rect = rotated_crown.get_rect()
-
-        # Position it centered horizontally, but raised higher vertically (adjust y more negative)
-        crown_pos = (
-            self.x - crown_rect.width // 2 - 23,
-            self.y - crown_rect.height // 2 - 32,
-        )
-
-        win.blit(rotated_crown, crown_pos)
+        sprite, (dx, dy) = piece_sprite(self.color, True, "board")
+        win.blit(sprite, (self.x + dx, self.y + dy))
 
     def draw_small(self, win, x, y):  # hey I'm using polymorphism
         """
@@ -339,22 +419,9 @@ class King(Piece):
             None
         """
 
-        # base piece draw
-        super().draw_small(win, x, y) # inheriting the small pawn
-
-        # Crown drawing
-        radius = SQUARE_SIZE // 4
-        crown_size = radius * 1.7
-        crown_img = pygame.transform.smoothscale(
-            CROWN, (int(crown_size), int(crown_size))
-        )
-        crown_img = pygame.transform.rotate(crown_img, 30)  # stylish angle
-
-        crown_x = x - crown_size // 2 - 22
-        crown_y = (
-            y - crown_size // 2 - radius * 0.7
-        ) - 10  # raised above piece center
-        win.blit(crown_img, (crown_x, crown_y))
+        # the small pawn with the crown (at a stylish angle) on it
+        sprite, (dx, dy) = piece_sprite(self.color, True, "small")
+        win.blit(sprite, (x + dx, y + dy))
 
 
 class Pawn(Piece):
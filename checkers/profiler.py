@@ -0,0 +1,274 @@
+"""
+Frame profiler for the checkers main loop, off unless asked for. It times
+each phase of a frame with time.perf_counter_ns, keeps the last WINDOW frames
+for rolling percentiles (p50, p95 and p99), draws them in a small box over
+the board and can write one record per frame to a CSV or JSONL file.
+
+Turned on with the CHECKERS_PROFILE environment variable:
+    CHECKERS_PROFILE=1 python checkers_main.py             the box only
+    CHECKERS_PROFILE=frames.csv python checkers_main.py    and a CSV file
+    CHECKERS_PROFILE=frames.jsonl python checkers_main.py  and a JSONL file
+
+The times in the files are nanoseconds, the box shows milliseconds.
+"""
+import collections
+import csv
+import json
+import math
+import os
+import time
+
+import pygame
+
+ENV_VAR = "CHECKERS_PROFILE"
+
+# the parts of a frame in the order the main loop goes through them. "wait"
+# is the sleeping between frames, "work" is everything else added up
+PHASES = (
+    "wait",
+    "update_timers",
+    "events",
+    "ai",
+    "dirty_rects",
+    "draw_whole",
+    "draw_side_panel",
+    "menus",
+    "hud",
+    "display_update",
+)
+WINDOW = 300  # frames the percentiles are taken over, 10 seconds at 30 FPS
+HUD_REFRESH_NS = 500_000_000  # the numbers in the box change twice a second
+HUD_FONT_SIZE = 18
+HUD_POSITION = (12, 12)
+HUD_COLUMNS = (0, 120, 185, 250)  # x of the name and the three percentiles
+
+
+def percentile(values, p):
+    """
+    Nearest rank percentile.
+
+    Args:
+        values (list): numbers, sorted from small to big
+        p (float): which percentile, 0 to 100
+    Raises:
+        None
+    Returns:
+        the value p percent of the values are smaller than or equal to, 0
+        when there are none
+    """
+    if not values:
+        return 0
+    rank = max(1, math.ceil(p / 100 * len(values)))
+    return values[rank - 1]
+
+
+class FrameProfiler:
+    """
+    Times the phases of every frame. The main loop calls start_frame(), then
+    mark(phase) after each phase and end_frame() at the end. A disabled
+    profiler does nothing at all, so the loop can call it either way.
+
+    Attributes:
+        enabled (bool): whether anything is timed
+        history (dict): phase (and "work", "total") -> deque of the last
+            WINDOW frame times in nanoseconds
+        frames (int): frames ended so far
+        hud_rect (pygame.Rect): where the box is, None until it's drawn
+        note (str): an extra line at the bottom of the box, the main loop
+            puts the computer player's last search there
+    """
+
+    def __init__(self, output=None, enabled=True, window=WINDOW):
+        """
+        Args:
+            output (str, optional): file for the per frame records, CSV if
+                it ends with .csv and JSONL otherwise. Defaults to None
+            enabled (bool, optional): Defaults to True
+            window (int, optional): frames kept for the percentiles.
+                Defaults to WINDOW
+        Raises:
+            OSError: If the output file can't be opened
+        """
+        self.enabled = enabled
+        self.history = {
+            name: collections.deque(maxlen=window)
+            for name in PHASES + ("work", "total")
+        }
+        self.frames = 0
+        self.current = dict.fromkeys(PHASES, 0)
+        self.hud_rect = None
+        self.note = ""
+        self._last = None
+        self._file = None
+        self._writer = None
+        self._hud = None
+        self._hud_font = None
+        self._number_width = 0
+        self._hud_time = None
+        if enabled and output:
+            self._file = open(output, "w", newline="")
+            if output.lower().endswith(".csv"):
+                self._writer = csv.DictWriter(
+                    self._file, ["frame"] + list(PHASES) + ["work", "total"]
+                )
+                self._writer.writeheader()
+
+    @classmethod
+    def from_env(cls, environ=None):
+        """
+        A profiler set up the way CHECKERS_PROFILE asks for, disabled when
+        it isn't set (or is 0).
+
+        Args:
+            environ (dict, optional): Defaults to os.environ
+        Returns:
+            FrameProfiler: the profiler
+        """
+        value = (os.environ if environ is None else environ).get(ENV_VAR, "")
+        if value in ("", "0"):
+            return cls(enabled=False)
+        if value in ("1", "hud"):
+            return cls()
+        return cls(output=value)
+
+    # ___________ timing ___________
+    def start_frame(self):
+        if not self.enabled:
+            return
+        self.current = dict.fromkeys(PHASES, 0)
+        self._last = time.perf_counter_ns()
+
+    def mark(self, phase):
+        """
+        Adds the time since the last mark (or the start of the frame) to
+        phase. A phase can be marked more than once in a frame, the times
+        add up.
+
+        Args:
+            phase (str): one of PHASES
+        Raises:
+            KeyError: If phase isn't one of PHASES
+        """
+        if not self.enabled or self._last is None:
+            return
+        now = time.perf_counter_ns()
+        self.current[phase] += now - self._last
+        self._last = now
+
+    def end_frame(self):
+        """
+        Keeps the frame's times for the percentiles and writes its record.
+
+        Returns:
+            dict: the record, phase -> nanoseconds plus "frame", "work" and
+            "total". None when disabled
+        """
+        if not self.enabled or self._last is None:
+            return None
+        record = dict(self.current)
+        record["total"] = sum(self.current.values())
+        record["work"] = record["total"] - record["wait"]
+        for name, history in self.history.items():
+            history.append(record[name])
+        self.frames += 1
+        record["frame"] = self.frames
+        self._last = None
+
+        if self._writer is not None:
+            self._writer.writerow(record)
+        elif self._file is not None:
+            self._file.write(json.dumps(record) + "\n")
+        return record
+
+    def percentiles(self, phase):
+        """
+        Returns:
+            tuple: (p50, p95, p99) of phase over the last frames, in
+            milliseconds
+        """
+        values = sorted(self.history[phase])
+        return tuple(percentile(values, p) / 1e6 for p in (50, 95, 99))
+
+    # ___________ the box ___________
+    def set_note(self, text):
+        """
+        Changes the extra line of the box, it's drawn again next frame.
+
+        Args:
+            text (str): the line
+        Raises:
+            None
+        Returns:
+            None
+        """
+        if not self.enabled or text == self.note:
+            return
+        self.note = text
+        self._hud_time = None
+
+    def draw(self, win, dirty):
+        """
+        Draws the box with the percentiles when its numbers are due to
+        change or when the game was just drawn over it.
+
+        Args:
+            win (pygame.Surface): the window
+            dirty (list): rectangles drawn this frame, from Board.render,
+                the box's rectangle is added to it when it's drawn
+        Raises:
+            None
+        Returns:
+            list: dirty, for pygame.display.update
+        """
+        if not self.enabled:
+            return dirty
+        now = time.perf_counter_ns()
+        refresh = (
+            self._hud_time is None or now - self._hud_time >= HUD_REFRESH_NS
+        )
+        if refresh:
+            self._build_hud()
+            self._hud_time = now
+        covered = any(rect.colliderect(self.hud_rect) for rect in dirty)
+        if refresh or covered:
+            win.blit(self._hud, self.hud_rect)
+            dirty.append(self.hud_rect.copy())
+        return dirty
+
+    def _build_hud(self):
+        if self._hud is None:
+            self._hud_font = pygame.font.Font(None, HUD_FONT_SIZE)
+            line = self._hud_font.get_linesize()
+            self._number_width = self._hud_font.size("9999.99")[0]
+            width = HUD_COLUMNS[-1] + self._number_width + 12
+            height = line * (len(PHASES) + 4) + 8  # and the note
+            self._hud = pygame.Surface((width, height))
+            self.hud_rect = self._hud.get_rect(topleft=HUD_POSITION)
+
+        # opaque, so it never needs the game under it drawn again
+        self._hud.fill((20, 20, 20))
+        line = self._hud_font.get_linesize()
+        rows = [("ms", "p50", "p95", "p99")]
+        for name in PHASES + ("work", "total"):
+            rows.append(
+                (name,) + tuple(f"{value:.2f}" for value in
+                                self.percentiles(name))
+            )
+        for index, row in enumerate(rows):
+            y = 4 + index * line
+            color = (255, 215, 0) if index == 0 else (220, 220, 220)
+            for column, (x, text) in enumerate(zip(HUD_COLUMNS, row)):
+                surface = self._hud_font.render(text, True, color)
+                if column:  # numbers lined up on the right
+                    x += self._number_width - surface.get_width()
+                self._hud.blit(surface, (x + 6, y))
+        if self.note:
+            surface = self._hud_font.render(self.note, True, (220, 220, 220))
+            self._hud.blit(surface, (6, 4 + len(rows) * line))
+
+    def close(self):
+        """Closes the output file, if there is one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+            self._writer = None
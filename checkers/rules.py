@@ -0,0 +1,567 @@
+"""
+The rules of our checkers with no pygame at all, so that simulations and
+workers can generate moves, capture, promote and find winners without
+opening a window or loading any images. Board uses these same functions
+and only adds the drawing, the timers and the clicking on top.
+
+Every function works on a "grid": the 8x8 list of lists that Board.board
+is, holding 0 for empty squares or a piece with row, column, color and king
+attributes (Pawn, King or the plain Checker below).
+"""
+from collections import namedtuple
+
+from .constants import BLUE, DARK_PINK, ROWS, COLUMNS
+
+
+# these directions are about the index and not the actual direction, -1 is
+# up and left (first index up, second left) and so on
+KING_DIRECTIONS = ((-1, -1), (-1, 1), (1, -1), (1, 1))
+BLUE_DIRECTIONS = ((-1, -1), (-1, 1))  # blue pawns only go up
+PINK_DIRECTIONS = ((1, -1), (1, 1))  # pink pawns only go down
+
+COLOR_NAMES = {BLUE: "Blue", DARK_PINK: "Pink"}
+
+# everything needed to take a move back: the piece that moved (the pawn
+# itself if it got promoted), the square it came from, the pieces it
+# captured (they still remember their squares) and whether it was promoted
+UndoRecord = namedtuple("UndoRecord", "piece origin captured promoted")
+
+
+class Checker:
+    """
+    The plainest piece possible, for grids that are never drawn.
+    Has the same attributes the rules read from Pawn and King.
+
+    Attributes:
+        row (int): Current row
+        column (int): Current column
+        color (tuple): BLUE or DARK_PINK
+        king (bool): Whether the piece is a king
+    """
+
+    __slots__ = ("row", "column", "color", "king")
+
+    def __init__(self, row, column, color, king=False):
+        """
+        Creates a new piece.
+
+        Args:
+            row (int): Starting row
+            column (int): Starting column
+            color (tuple): BLUE or DARK_PINK
+            king (bool, optional): Whether it is a king. Defaults to False
+        """
+        self.row = row
+        self.column = column
+        self.color = color
+        self.king = king
+
+    def move(self, row, column):
+        self.row = row
+        self.column = column
+
+    def promoted(self):
+        """
+        Returns:
+            Checker: the king this piece turns into
+        """
+        return Checker(self.row, self.column, self.color, king=True)
+
+    def __repr__(self):
+        kind = "king" if self.king else "pawn"
+        return (
+            f"{self.color} {kind}, at row and column numbers"
+            f"{(self.row, self.column)}"
+        )
+
+
+def opponent(color):
+    return DARK_PINK if color == BLUE else BLUE
+
+
+def make_grid(piece_type=Checker):
+    """
+    Creates the starting position, 12 pieces for each player in alternating
+    squares on the first and last 3 rows.
+
+    Args:
+        piece_type (class, optional): called as piece_type(row, column, color)
+            for each piece. Defaults to Checker
+    Raises:
+        None
+    Returns:
+        list: 2D list representing board with pieces
+    """
+    grid = []
+    for row in range(ROWS):
+        grid.append([])
+        for column in range(COLUMNS):
+            if (row + column) % 2 == 1:  # only the dark squares
+                if row < 3:  # if top of the board
+                    grid[row].append(piece_type(row, column, DARK_PINK))
+                elif row > 4:  # bottom of the board
+                    grid[row].append(piece_type(row, column, BLUE))
+                else:
+                    grid[row].append(0)
+            else:
+                grid[row].append(0)
+    return grid
+
+
+def copy_grid(grid):
+    """
+    Copies a grid into plain Checker pieces, so the copy can be changed (or
+    handed to another thread) without touching the original pieces.
+
+    Args:
+        grid (list): the grid to copy
+    Raises:
+        None
+    Returns:
+        list: a new grid of Checker pieces
+    """
+    return [
+        [
+            0 if piece == 0
+            else Checker(piece.row, piece.column, piece.color, piece.king)
+            for piece in row
+        ]
+        for row in grid
+    ]
+
+
+def get_directions(color, king):
+    """
+    Directions a piece is allowed to move and capture in.
+
+    Args:
+        color (tuple): BLUE or DARK_PINK
+        king (bool): Whether the piece is a king
+    Returns:
+        tuple: (row direction, column direction) pairs
+    """
+    if king:
+        return KING_DIRECTIONS
+    return BLUE_DIRECTIONS if color == BLUE else PINK_DIRECTIONS
+
+
+def get_piece(grid, row, column):
+    if 0 <= row < ROWS and 0 <= column < COLUMNS:
+        return grid[row][column]
+    return None
+
+
+def get_all_pieces(grid, color):
+    """
+    Every piece of a color, from top left to bottom right.
+
+    Args:
+        grid (list): the board
+        color (tuple): BLUE or DARK_PINK
+    Returns:
+        list: the pieces of that color
+    """
+    return [
+        piece for row in grid for piece in row
+        if piece != 0 and piece.color == color
+    ]
+
+
+def get_regular_moves(grid, piece):
+    """
+    Non-capture moves of a piece.
+
+    Args:
+        grid (list): the board
+        piece (Piece): The piece to get moves for
+    Returns:
+        dict: valid move positions as keys and empty lists as values
+    """
+    moves = {}
+    for dirrow, dircol in get_directions(piece.color, piece.king):
+        new_row, new_col = piece.row + dirrow, piece.column + dircol
+        if (
+            0 <= new_row < ROWS
+            and 0 <= new_col < COLUMNS
+            and grid[new_row][new_col] == 0
+        ):
+            moves[(new_row, new_col)] = []  # no captures on this move
+    return moves
+
+
+def get_capture_moves(grid, piece):
+    """
+    Capture moves of a piece, every landing square of every jump chain.
+
+    Args:
+        grid (list): the board
+        piece (Piece): The piece to get captures for
+    Returns:
+        dict: landing positions as keys and the captured pieces as values
+    """
+    moves = {}
+    for dr, dc in get_directions(piece.color, piece.king):
+        find_captures(
+            grid, piece.row, piece.column, dr, dc, piece.color, moves,
+            piece.king,
+        )
+    return moves
+
+
+def find_captures(
+    grid, row, col, dr, dc, color, moves, is_king, captured=None
+):
+    """
+    Recursively finds all possible capture sequences in one direction.
+    A later path to the same landing square replaces an earlier one.
+
+    Args:
+        grid (list): the board
+        row (int): Current row position
+        col (int): Current column position
+        dr (int): Row direction
+        dc (int): Column direction (-1 or 1)
+        color (tuple): Piece color
+        moves (dict): Dictionary to store valid moves
+        is_king (bool): Whether piece is a king
+        captured (list, optional): List of pieces captured in sequence
+    Raises:
+        None
+    Returns:
+        None: Updates moves dictionary in place
+    """
+    if captured is None:
+        captured = []
+
+    enemy_row, enemy_col = row + dr, col + dc
+    if not (0 <= enemy_row < ROWS and 0 <= enemy_col < COLUMNS):
+        return
+
+    enemy_piece = grid[enemy_row][enemy_col]
+    if (
+        enemy_piece != 0
+        and enemy_piece.color != color
+        and enemy_piece not in captured
+    ):
+        # Found enemy, check landing square
+        land_row, land_col = enemy_row + dr, enemy_col + dc
+        if (
+            0 <= land_row < ROWS
+            and 0 <= land_col < COLUMNS
+            and grid[land_row][land_col] == 0
+        ):
+            new_captured = captured + [enemy_piece]
+            moves[(land_row, land_col)] = new_captured
+
+            # look for additional captures from landing position
+            for new_dr, new_dc in get_directions(color, is_king):
+                find_captures(
+                    grid, land_row, land_col, new_dr, new_dc, color, moves,
+                    is_king, new_captured,
+                )
+
+
+def _jump_table(directions):
+    """
+    For every square, the jumps that stay on the board in these directions:
+    (enemy row, enemy column, landing row, landing column, enemy bit).
+    """
+    table = {}
+    for row in range(ROWS):
+        for col in range(COLUMNS):
+            jumps = []
+            for dr, dc in directions:
+                land_row, land_col = row + 2 * dr, col + 2 * dc
+                if 0 <= land_row < ROWS and 0 <= land_col < COLUMNS:
+                    enemy_row, enemy_col = row + dr, col + dc
+                    jumps.append((
+                        enemy_row, enemy_col, land_row, land_col,
+                        1 << (enemy_row * COLUMNS + enemy_col),
+                    ))
+            table[(row, col)] = tuple(jumps)
+    return table
+
+
+# directions -> square -> jumps, so the capture search never checks edges
+JUMP_TABLES = {
+    directions: _jump_table(directions)
+    for directions in (KING_DIRECTIONS, BLUE_DIRECTIONS, PINK_DIRECTIONS)
+}
+# the same tables by (color, king), one lookup less per piece
+PIECE_JUMPS = {
+    (color, king): JUMP_TABLES[get_directions(color, king)]
+    for color in (BLUE, DARK_PINK) for king in (False, True)
+}
+
+
+def can_capture(grid, piece):
+    """
+    Whether the piece has at least one jump right now, only looks one jump
+    deep using the jump tables instead of following the chains.
+
+    Args:
+        grid (list): the board
+        piece (Piece): the piece to check
+    Returns:
+        bool: True if the piece can capture
+    """
+    return has_capture(grid, (piece,))
+
+
+def has_capture(grid, pieces):
+    """
+    The "is any capture possible?" check of the forced captures rule, one
+    pass over the pieces of the side to move.
+
+    Args:
+        grid (list): the board
+        pieces (iterable): pieces of the side to move
+    Returns:
+        bool: True if any of them can capture
+    """
+    for piece in pieces:
+        color = piece.color
+        jumps = PIECE_JUMPS[(color, piece.king)][(piece.row, piece.column)]
+        for enemy_row, enemy_col, land_row, land_col, _ in jumps:
+            if grid[land_row][land_col] == 0:
+                enemy_piece = grid[enemy_row][enemy_col]
+                if enemy_piece != 0 and enemy_piece.color != color:
+                    return True
+    return False
+
+
+def forced_moves(grid, pieces):
+    """
+    Moves under the forced captures rule: when any piece can capture only
+    the captures are allowed, otherwise every valid move is.
+
+    Args:
+        grid (list): the board
+        pieces (iterable): pieces of the side to move
+    Returns:
+        dict: piece -> {(row, col): captured pieces}, pieces without an
+        allowed move are left out when captures are forced
+    """
+    pieces = list(pieces)
+    if not has_capture(grid, pieces):
+        return {piece: get_valid_moves(grid, piece) for piece in pieces}
+    return {
+        piece: get_capture_moves(grid, piece)
+        for piece in pieces if can_capture(grid, piece)
+    }
+
+
+def capture_sequences(grid, piece):
+    """
+    Every complete capture path of a piece, each found once. Unlike
+    find_captures this keeps the whole route, only returns paths that can't
+    be taken any further, and remembers the jumped pieces in a bitset (one
+    bit per square) instead of searching through a list. Two routes that
+    reach the same square after taking the same pieces count as one: the
+    grid doesn't change during the search, so everything after that point
+    is the same too and is only searched the first time.
+    Squares are the same as find_captures: the captured pieces and the
+    piece's own starting square stay occupied until the move is made.
+
+    Args:
+        grid (list): the board
+        piece (Piece): the piece that captures
+    Raises:
+        None
+    Returns:
+        list: (route, captured) pairs, route is a tuple of (row, column)
+        from the starting square to the last landing square and captured
+        is the list of pieces taken in order
+    """
+    color = piece.color
+    jump_table = PIECE_JUMPS[(color, piece.king)]
+    start = (piece.row, piece.column)
+    # most pieces can't capture at all, skip the search for them (the same
+    # check as can_capture, without the two calls it takes to get there)
+    for enemy_row, enemy_col, land_row, land_col, _ in jump_table[start]:
+        if grid[land_row][land_col] == 0:
+            enemy_piece = grid[enemy_row][enemy_col]
+            if enemy_piece != 0 and enemy_piece.color != color:
+                break
+    else:
+        return []
+
+    sequences = []
+    visited = set()  # (square, captured bits) already searched from
+    route = [start]
+    captured = []
+
+    def extend(square, taken):
+        if (square, taken) in visited:
+            return  # another jump order got here first
+        visited.add((square, taken))
+        extended = False
+        for enemy_row, enemy_col, land_row, land_col, bit in jump_table[square]:
+            if taken & bit or grid[land_row][land_col] != 0:
+                continue
+            enemy_piece = grid[enemy_row][enemy_col]
+            if enemy_piece == 0 or enemy_piece.color == color:
+                continue
+
+            extended = True
+            landing = (land_row, land_col)
+            route.append(landing)
+            captured.append(enemy_piece)
+            extend(landing, taken | bit)
+            route.pop()
+            captured.pop()
+
+        if not extended and captured:  # nowhere else to go, path is done
+            sequences.append((tuple(route), list(captured)))
+
+    extend(start, 0)
+    return sequences
+
+
+def get_valid_moves(grid, piece):
+    """
+    Regular and capture moves together. Captures are never forced.
+
+    Args:
+        grid (list): the board
+        piece (Piece): The piece to get valid moves for
+    Returns:
+        dict: valid move positions as keys and captured pieces as values
+    """
+    return {
+        **get_regular_moves(grid, piece),
+        **get_capture_moves(grid, piece),
+    }
+
+
+def should_promote(piece):
+    """
+    Returns:
+        bool: True if the piece is a pawn standing on its last row
+    """
+    if piece.king:
+        return False
+    return (piece.color == BLUE and piece.row == 0) or (
+        piece.color == DARK_PINK and piece.row == ROWS - 1
+    )
+
+
+def apply_move(grid, piece, row, col, captures):
+    """
+    Plays a move on the grid: removes the captured pieces, moves the piece
+    and replaces it with a king (piece.promoted()) on its last row.
+
+    Args:
+        grid (list): the board
+        piece (Piece): the piece that moves
+        row (int): row the piece is going to
+        col (int): column the piece is going to
+        captures (list): pieces captured by the move
+    Raises:
+        None
+    Returns:
+        Piece: the piece now standing on (row, col), a new king if promoted
+    """
+    for captured_piece in captures:
+        grid[captured_piece.row][captured_piece.column] = 0
+
+    grid[piece.row][piece.column] = 0
+    grid[row][col] = piece
+    piece.move(row, col)
+
+    if should_promote(piece):
+        piece = piece.promoted()
+        grid[row][col] = piece
+    return piece
+
+
+def make_move(grid, piece, row, col, captures):
+    """
+    Same as apply_move but also returns what is needed to undo it.
+
+    Args:
+        grid (list): the board
+        piece (Piece): the piece that moves
+        row (int): row the piece is going to
+        col (int): column the piece is going to
+        captures (list): pieces captured by the move
+    Raises:
+        None
+    Returns:
+        UndoRecord: the record to pass to unmake_move
+    """
+    origin = (piece.row, piece.column)
+    moved = apply_move(grid, piece, row, col, captures)
+    return UndoRecord(piece, origin, tuple(captures), moved is not piece)
+
+
+def unmake_move(grid, record):
+    """
+    Takes back a move made with make_move. Moves must be taken back in the
+    opposite order they were made.
+
+    Args:
+        grid (list): the board
+        record (UndoRecord): what make_move returned
+    Raises:
+        None
+    Returns:
+        None
+    """
+    piece = record.piece
+    grid[piece.row][piece.column] = 0  # also removes the king if promoted
+    piece.move(*record.origin)
+    grid[piece.row][piece.column] = piece
+    for captured_piece in record.captured:
+        grid[captured_piece.row][captured_piece.column] = captured_piece
+
+
+def has_moves(grid, color, pieces=None):
+    """
+    Args:
+        grid (list): the board
+        color (tuple): BLUE or DARK_PINK
+        pieces (iterable, optional): the color's pieces if the caller already
+            knows them, found on the grid if not
+    Returns:
+        bool: whether any piece of the color has at least one move
+    """
+    if pieces is None:
+        pieces = get_all_pieces(grid, color)
+    for piece in pieces:
+        if get_valid_moves(grid, piece):
+            return True
+    return False
+
+
+def find_winner(grid, turn, pieces=None, moves=None):
+    """
+    Checks if the game is over on the board: a player with no pieces left or
+    a player that can't move on their turn loses. (Timers are Board's job.)
+
+    Args:
+        grid (list): the board
+        turn (tuple): color of the player to move
+        pieces (dict, optional): color -> that color's pieces, like
+            Board.pieces, so the grid doesn't have to be scanned for them
+        moves (dict, optional): piece -> valid moves for the side to move,
+            like Board.get_legal_moves, so they aren't generated again
+    Returns:
+        str: "Blue" or "Pink" if there is a winner, None if not
+    """
+    if pieces is None:
+        pieces = {
+            BLUE: get_all_pieces(grid, BLUE),
+            DARK_PINK: get_all_pieces(grid, DARK_PINK),
+        }
+    if not pieces[BLUE]:
+        return "Pink"
+    if not pieces[DARK_PINK]:
+        return "Blue"
+    if moves is not None:
+        stuck = not any(moves.values())
+    else:
+        stuck = not has_moves(grid, turn, pieces[turn])
+    if stuck:
+        return COLOR_NAMES[opponent(turn)]
+    return None
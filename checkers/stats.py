@@ -1,107 +1,361 @@
+"""
+Win statistics for checkers, kept as a history of the games played.
+
+Every finished game is one JSON line appended to database/history.jsonl: who
+won, how long it took, how many moves, the material left and when it ended.
+Each line is flushed and fsynced before add_win/record_game return, so a
+crash can at most cut off the line being written, and that broken last line
+is dropped the next time the log is read.
+
+The win totals are worked out from the log at startup. Every SNAPSHOT_EVERY
+lines (and on save()) the totals are written to history.snapshot.json with
+how far into the log they go, so startup only reads the lines after that.
+
+The old database/stats.txt ("blue,pink") is read when there is no log yet,
+its totals become the first line of the log.
+
+SqliteStats does the same job in database/history.sqlite3, with the games
+and their moves in indexed tables so questions like the win rate over the
+last N games are answered by sqlite without reading the whole history.
+Importing this module doesn't touch the disk. The game's stats are the
+module's `stats`, opened the first time they're used (or with stats.open())
+and closed with stats.close(). Which store it opens is picked with the
+CHECKERS_STATS environment variable: "sqlite" for SqliteStats, "memory" for
+an in-memory database that is gone when the game closes (tests, benchmarks
+and other headless runs) and the log otherwise.
+
+Games running at the same time can share the log: appends take a lock on it
+(where the system has fcntl) and catch up with lines the others wrote.
+"""
+import datetime
+import json
 import os
+import sqlite3
+
+try:
+    import fcntl  # file locks, there's no fcntl on Windows
+except ImportError:
+    fcntl = None
+
+DATABASE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(__file__)), "database"
+)  # the database folder next to the checkers package
+SNAPSHOT_EVERY = 100  # log lines between two snapshots
+BACKEND_VAR = "CHECKERS_STATS"
+SQLITE_FILE = "history.sqlite3"
+
+# "counts" holds the wins from before the first game in the tables (the old
+# stats.txt or log) and reset_after, the last game before the last reset
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS games (
+    id INTEGER PRIMARY KEY,
+    played_at TEXT NOT NULL,
+    winner TEXT NOT NULL,
+    duration INTEGER,
+    moves INTEGER,
+    blue_material INTEGER,
+    pink_material INTEGER,
+    time_control INTEGER
+);
+CREATE TABLE IF NOT EXISTS moves (
+    game_id INTEGER NOT NULL REFERENCES games (id),
+    step INTEGER NOT NULL,
+    color TEXT NOT NULL,
+    from_row INTEGER NOT NULL,
+    from_column INTEGER NOT NULL,
+    to_row INTEGER NOT NULL,
+    to_column INTEGER NOT NULL,
+    captures INTEGER NOT NULL,
+    PRIMARY KEY (game_id, step)
+);
+CREATE TABLE IF NOT EXISTS counts (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS games_played_at ON games (played_at);
+CREATE INDEX IF NOT EXISTS games_winner ON games (winner);
+CREATE INDEX IF NOT EXISTS moves_color ON moves (color);
+"""
 
 
 class Stats:
     """
     This is our data manager:
-    Handles reading/writing win counts to a file and provides
-    methods to update and retrieve stats.
+    Handles the game history log and the win counts worked out from it,
+    and provides methods to update and retrieve stats.
 
     Attributes:
-        file (str): Path to stats file
+        file (str): Path to the history log
+        snapshot_file (str): Path to the snapshot of the totals
         blue_wins (int): blue player wins
         pink_wins (int): pink player wins
+        games (int): games recorded, draws included
+        lines (int): lines in the log
     """
-    def __init__(self):
-        """
-        Creates the Stats with file path and loads existing data.
+    def __init__(self, folder=DATABASE_DIR):
         """
-        self.file = os.path.join(
-            os.path.dirname(os.path.dirname(__file__)), "database", "stats.txt"
-        )  # this makes sure we
-        # could find our .txt file which is inside parent directory and in our
-        # database directory
+        Creates the Stats with file paths and loads existing data. Nothing
+        is written until the first game (or reset) is recorded.
 
-        os.makedirs(os.path.dirname(self.file), exist_ok=True)
-        self.load_data()  # loads the data from the file
+        Args:
+            folder (str, optional): where the files are. Defaults to the
+                database folder
+        """
+        self.folder = folder
+        self.file = os.path.join(folder, "history.jsonl")
+        self.snapshot_file = os.path.join(folder, "history.snapshot.json")
+        self.legacy_file = os.path.join(folder, "stats.txt")
+        self.load_data()  # loads the data from the files
 
     def load_data(self):
         """
-        Reads win counts from stats file. Then creates new file with 
-        absolutely zero counts if file doesn't exist 
-        otherwise it can't be read.
+        Works out the win counts: from the snapshot if there is a good one,
+        then from every log line after it. Without a log the totals come
+        from the old stats.txt, if there is one.
+
         Args:
             None
         Raises:
-            None: Handles all exceptions internally
+            OSError: If the log is there but can't be read
         Returns:
             None
         """
+        self.blue_wins = self.pink_wins = 0
+        self.games = 0
+        self.lines = 0
+        self._end = 0  # bytes of the log read, the next line goes there
+        self._torn = False  # the log ends with half a line
+        self._pending = []  # lines to write before the next one
+        self._snapshot_lines = 0
+        self._head = ""  # first line of the log, snapshots are tied to it
+        self._size = self._log_size()  # what get() compares against
+
+        if not self._size:
+            self._import_legacy()
+            return
+
+        with open(self.file, "rb") as f:
+            self._head = f.readline().decode(errors="replace")
+        snapshot = self._read_snapshot()
+        if snapshot is not None:
+            self.blue_wins = snapshot["Blue"]
+            self.pink_wins = snapshot["Pink"]
+            self.games = snapshot["games"]
+            self.lines = self._snapshot_lines = snapshot["lines"]
+            self._end = snapshot["offset"]
+
+        with open(self.file, "rb") as f:
+            f.seek(self._end)
+            for raw in f:
+                if not raw.endswith(b"\n"):
+                    # a write that never finished, the next append cuts it
+                    self._torn = True
+                    break
+                self._end += len(raw)
+                self.lines += 1
+                try:
+                    record = json.loads(raw)
+                except ValueError:
+                    print(f"Skipping a broken line in {self.file}")
+                    continue
+                self._apply(record)
+
+    def _log_size(self):
         try:
-            with open(self.file, "r") as f:
-                blue, pink = f.read().strip().split(",") # reads after 
+            return os.path.getsize(self.file)
+        except OSError:
+            return 0
+
+    def _refresh(self):
+        # another game may have added to the log since it was read, it's
+        # only read again when the log's size changed
+        if self._log_size() != self._size:
+            self.load_data()
+
+    def _read_snapshot(self):
+        # a snapshot that can't be read or was taken of another log (one
+        # that was deleted since) is ignored, the whole log is read instead
+        try:
+            with open(self.snapshot_file, "r") as f:
+                snapshot = json.load(f)
+            if (
+                snapshot["head"] == self._head
+                and snapshot["offset"] <= os.path.getsize(self.file)
+            ):
+                return snapshot
+        except (OSError, ValueError, KeyError, TypeError):
+            pass
+        return None
+
+    def _import_legacy(self):
+        try:
+            with open(self.legacy_file, "r") as f:
+                blue, pink = f.read().strip().split(",")  # reads after
                 # splitting by commas
-                self.blue_wins = int(blue)
-                self.pink_wins = int(pink)
-        except:
-            self.blue_wins = self.pink_wins = 0 # if not successful then all 0
+            record = {"type": "import", "Blue": int(blue), "Pink": int(pink)}
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError) as error:
+            print(f"Could not read {self.legacy_file}: {error}")
+            return
+        self._apply(record)
+        self._pending.append(record)  # goes in the log with the first game
+
+    def _apply(self, record):
+        kind = record.get("type")
+        if kind == "game":
+            self.games += 1
+            if record.get("winner") == "Blue":
+                self.blue_wins += 1
+            elif record.get("winner") == "Pink":
+                self.pink_wins += 1
+        elif kind == "reset":
+            self.blue_wins = self.pink_wins = 0
+        elif kind == "import":
+            self.blue_wins += record["Blue"]
+            self.pink_wins += record["Pink"]
+
+    def _append(self, record):
+        """
+        Adds a line to the log and waits until it's on the disk.
+
+        Raises:
+            OSError: If unable to write to file
+        """
+        os.makedirs(self.folder, exist_ok=True)
+        with open(self.file, "ab") as f:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_EX)  # let go when f is closed
+            if os.fstat(f.fileno()).st_size != self._end:
+                # another game added to the log since we read it (or it
+                # ends with half a line), count from what's there now
+                self.load_data()
+            if self._torn:  # cut off the half line first
+                f.truncate(self._end)
+                self._torn = False
+            records = self._pending + [record]
+            data = "".join(json.dumps(r) + "\n" for r in records).encode()
+            if self._end == 0:
+                self._head = json.dumps(records[0]) + "\n"
+            f.write(data)
+            f.flush()
+            os.fsync(f.fileno())
+        self._end += len(data)
+        self._size = self._end
+        self.lines += len(records)
+        self._pending = []  # these were counted when they were read
+        self._apply(record)
+        if self.lines - self._snapshot_lines >= SNAPSHOT_EVERY:
             self.save()
 
     def save(self):
         """
-        Saves current win counts to stats.txt.
+        Writes a snapshot of the totals. The games themselves are already
+        in the log, this only makes the next startup quicker. The file is
+        swapped in whole so a crash never leaves half a snapshot.
 
         Raises:
-            IOError: If unable to write to file
+            OSError: If unable to write to file
         """
-        with open(self.file, "w") as f: # writing the wins by seperating by 
-            # columns
-            f.write(f"{self.blue_wins},{self.pink_wins}")
+        if self.lines == 0:
+            return  # no log yet, nothing to take a snapshot of
+        snapshot = {
+            "offset": self._end, "lines": self.lines, "games": self.games,
+            "Blue": self.blue_wins, "Pink": self.pink_wins,
+            "head": self._head,
+        }
+        # a name of its own, two games could be taking a snapshot at once
+        temporary = f"{self.snapshot_file}.{os.getpid()}.tmp"
+        with open(temporary, "w") as f:
+            json.dump(snapshot, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(temporary, self.snapshot_file)
+        self._snapshot_lines = self.lines
 
-    def add_win(self, color):
+    def record_game(
+        self, winner, duration=None, moves=None, material=None, when=None,
+        time_control=None, move_list=None,
+    ):
         """
-        It adds the win number for each color that has won by one. 
+        Adds a finished game to the history and the win counts.
 
         Args:
-            color (string): this is the color that has won the game. 
+            winner (str): "Blue", "Pink" or "Draw"
+            duration (int, optional): seconds the game took
+            moves (int, optional): turns played
+            material (dict, optional): "Blue" and "Pink" -> material left
+            when (datetime.datetime, optional): when it ended. Defaults to
+                now
+            time_control (int, optional): seconds each player's clock
+                started with
+            move_list (list, optional): Board.moves_played, the steps of
+                the game
         Raises:
+            OSError: If unable to write to file
+        Returns:
             None
-        Returns:   
+        """
+        when = when or datetime.datetime.now()
+        record = {
+            "type": "game",
+            "winner": winner,
+            "duration": duration,
+            "moves": moves,
+            "material": material,
+            "timestamp": when.isoformat(timespec="seconds"),
+        }
+        if time_control is not None:
+            record["time_control"] = time_control
+        if move_list is not None:
+            record["move_list"] = move_list
+        self._append(record)
+
+    def add_win(self, color):
+        """
+        It adds the win number for each color that has won by one, as a
+        game with nothing else known about it.
+
+        Args:
+            color (string): this is the color that has won the game.
+        Raises:
+            OSError: If unable to write to file
+        Returns:
             None
         """
-        if color == "Blue":
-            self.blue_wins += 1
-        elif color == "Pink":
-            self.pink_wins += 1
+        self.record_game(color)
 
     def get(self):
         """
-        Returns current win counts for both players.
+        Returns current win counts for both players, with the games other
+        windows added to the log since.
         Args:
             None
-        Raises: 
-            None
+        Raises:
+            OSError: If the log changed and can't be read
         Returns:
             dict: Dictionary with "Blue" and "Pink" keys mapping to win counts
 
         """
-
-
+        self._refresh()
         return {"Blue": self.blue_wins, "Pink": self.pink_wins}
 
     def reset(self):
         """
-        Resets all win counters to zero and saves to file.
+        Resets all win counters to zero. The games stay in the log, a
+        reset line after them is what sets the counts back to zero.
 
         Args:
             None
         Raises:
-            None
+            OSError: If unable to write to file
         Returns:
             None
         """
-        self.blue_wins = self.pink_wins = 0
-        self.save()
+        self._append({
+            "type": "reset",
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+        })
 
     def get_text(self):
         """
@@ -109,13 +363,344 @@ class Stats:
         Args:
             None
         Raises:
-            None
+            OSError: If the log changed and can't be read
         Returns:
             tuple: Two strings (bluewins,pinkwins)
 
         """
+        self._refresh()
         return f"W: {self.blue_wins}", f"W: {self.pink_wins}"
 
+    def close(self):
+        """Nothing stays open between games, this is here so every store
+        can be closed the same way."""
+
+
+class SqliteStats:
+    """
+    The win counts and game history in a sqlite database, in WAL mode so
+    reading the history doesn't block recording a game. Has the same
+    get/add_win/record_game/reset/get_text/save as Stats, plus queries
+    over the history that sqlite answers with its indexes.
+
+    Attributes:
+        path (str): the database file, or ":memory:"
+        connection (sqlite3.Connection): the open database
+        blue_wins (int): blue player wins since the last reset
+        pink_wins (int): pink player wins since the last reset
+    """
+
+    def __init__(self, path=None, folder=DATABASE_DIR):
+        """
+        Opens (or makes) the database. A new one starts with the wins
+        of the log or stats.txt in the same folder, if there are any.
+
+        Args:
+            path (str, optional): the database file, ":memory:" for one
+                that is never saved. Defaults to history.sqlite3 in folder
+            folder (str, optional): Defaults to the database folder
+        Raises:
+            sqlite3.Error: If the database can't be opened
+        """
+        self.path = path or os.path.join(folder, SQLITE_FILE)
+        if self.path != ":memory:":
+            os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        # waits up to 5 seconds for another game writing to the database
+        self.connection = sqlite3.connect(self.path, timeout=5)
+        self.connection.execute("PRAGMA journal_mode=WAL")
+        self.connection.execute("PRAGMA synchronous=FULL")  # like the log
+        self.connection.executescript(SCHEMA)
+        if self._count("reset_after") is None:
+            self._start_counts()
+        self.load_data()
+
+    def _count(self, name):
+        row = self.connection.execute(
+            "SELECT value FROM counts WHERE name = ?", (name,)
+        ).fetchone()
+        return row and row[0]
+
+    def _start_counts(self):
+        wins = {"Blue": 0, "Pink": 0}
+        if self.path != ":memory:":
+            wins = Stats(os.path.dirname(self.path)).get()  # only reads
+        with self.connection:
+            self.connection.executemany(
+                "INSERT OR IGNORE INTO counts (name, value) VALUES (?, ?)",
+                [("Blue", wins["Blue"]), ("Pink", wins["Pink"]),
+                 ("reset_after", 0)],
+            )
+
+    def load_data(self):
+        """
+        Counts the wins since the last reset, from the winner index.
+
+        Raises:
+            sqlite3.Error: If the database can't be read
+        """
+        # goes up when another connection commits, get() checks it
+        (self._version,) = self.connection.execute(
+            "PRAGMA data_version"
+        ).fetchone()
+        reset_after = self._count("reset_after")
+        wins = {}
+        for color in ("Blue", "Pink"):
+            (games,) = self.connection.execute(
+                "SELECT COUNT(*) FROM games WHERE winner = ? AND id > ?",
+                (color, reset_after),
+            ).fetchone()
+            wins[color] = self._count(color) + games
+        self.blue_wins, self.pink_wins = wins["Blue"], wins["Pink"]
+
+    def record_game(
+        self, winner, duration=None, moves=None, material=None, when=None,
+        time_control=None, move_list=None,
+    ):
+        """
+        Adds a finished game (and its moves) to the database and the win
+        counts, in one transaction.
+
+        Args:
+            the same as Stats.record_game
+        Raises:
+            sqlite3.Error: If unable to write to the database
+        Returns:
+            int: the game's id
+        """
+        when = when or datetime.datetime.now()
+        material = material or {}
+        with self.connection:
+            cursor = self.connection.execute(
+                "INSERT INTO games (played_at, winner, duration, moves, "
+                "blue_material, pink_material, time_control) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (when.isoformat(timespec="seconds"), winner, duration, moves,
+                 material.get("Blue"), material.get("Pink"), time_control),
+            )
+            game = cursor.lastrowid
+            self.connection.executemany(
+                "INSERT INTO moves VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                [
+                    (game, step, color, *origin, *target, captures)
+                    for step, (color, origin, target, captures)
+                    in enumerate(move_list or [])
+                ],
+            )
+        if winner == "Blue":
+            self.blue_wins += 1
+        elif winner == "Pink":
+            self.pink_wins += 1
+        return game
+
+    def add_win(self, color):
+        """
+        Records a win for color, as a game with nothing else known about it.
+
+        Args:
+            color (string): this is the color that has won the game.
+        Raises:
+            sqlite3.Error: If unable to write to the database
+        """
+        self.record_game(color)
+
+    def reset(self):
+        """
+        Sets the win counts back to zero. The games stay in the database,
+        only the ones after the reset are counted.
+
+        Raises:
+            sqlite3.Error: If unable to write to the database
+        """
+        with self.connection:
+            self.connection.execute(
+                "UPDATE counts SET value = 0 WHERE name IN ('Blue', 'Pink')"
+            )
+            self.connection.execute(
+                "UPDATE counts SET value = "
+                "(SELECT COALESCE(MAX(id), 0) FROM games) "
+                "WHERE name = 'reset_after'"
+            )
+        self.blue_wins = self.pink_wins = 0
+
+    def _refresh(self):
+        # counted again only when another game wrote to the database, our
+        # own writes keep the counts up to date themselves
+        (version,) = self.connection.execute(
+            "PRAGMA data_version"
+        ).fetchone()
+        if version != self._version:
+            self.load_data()
+
+    def get(self):
+        """
+        Returns:
+            dict: Dictionary with "Blue" and "Pink" keys mapping to win
+            counts, with the games other windows recorded since
+        """
+        self._refresh()
+        return {"Blue": self.blue_wins, "Pink": self.pink_wins}
+
+    def get_text(self):
+        """
+        Returns:
+            tuple: Two strings (bluewins,pinkwins)
+        """
+        self._refresh()
+        return f"W: {self.blue_wins}", f"W: {self.pink_wins}"
+
+    def save(self):
+        """
+        Games are committed when they're recorded, this only moves the WAL
+        into the database file.
+
+        Raises:
+            sqlite3.Error: If the database is busy or can't be written
+        """
+        self.connection.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+
+    def close(self):
+        """Closes the database."""
+        self.connection.close()
+
+    # ___________ questions about the history ___________
+    def win_rate(self, color, last=None, since=None):
+        """
+        How many of the games color won, resets don't matter here.
+
+        Args:
+            color (str): "Blue" or "Pink"
+            last (int, optional): only the last this many games
+            since (datetime.datetime, optional): only games from then on
+        Raises:
+            sqlite3.Error: If the database can't be read
+        Returns:
+            float: wins / games (draws are games not won), None when there
+            are no games
+        """
+        query = "SELECT winner FROM games"
+        arguments = []
+        if since is not None:
+            query += " WHERE played_at >= ?"
+            arguments.append(since.isoformat(timespec="seconds"))
+        query += " ORDER BY played_at DESC, id DESC LIMIT ?"
+        arguments.append(-1 if last is None else last)  # -1 is no limit
+        (rate,) = self.connection.execute(
+            f"SELECT AVG(winner = ?) FROM ({query})", [color] + arguments
+        ).fetchone()
+        return rate
+
+    def average_length(self, since=None):
+        """
+        Args:
+            since (datetime.datetime, optional): only games from then on
+        Raises:
+            sqlite3.Error: If the database can't be read
+        Returns:
+            dict: "games", and the average "duration" (seconds) and
+            "moves" of the games that have them (None if none do)
+        """
+        query = "SELECT COUNT(*), AVG(duration), AVG(moves) FROM games"
+        arguments = []
+        if since is not None:
+            query += " WHERE played_at >= ?"
+            arguments.append(since.isoformat(timespec="seconds"))
+        games, duration, moves = self.connection.execute(
+            query, arguments
+        ).fetchone()
+        return {"games": games, "duration": duration, "moves": moves}
+
+    def time_controls(self):
+        """
+        Results for each time control (seconds on each clock at the start).
+
+        Raises:
+            sqlite3.Error: If the database can't be read
+        Returns:
+            list: a dict for each time control, with "time_control",
+            "games", "Blue", "Pink" and "Draw" (the results) and
+            "duration" (average seconds), from the shortest time control
+        """
+        rows = self.connection.execute(
+            "SELECT time_control, COUNT(*), SUM(winner = 'Blue'), "
+            "SUM(winner = 'Pink'), SUM(winner = 'Draw'), AVG(duration) "
+            "FROM games GROUP BY time_control ORDER BY time_control"
+        )
+        names = ("time_control", "games", "Blue", "Pink", "Draw", "duration")
+        return [dict(zip(names, row)) for row in rows]
+
+
+def make_stats(environ=None, folder=DATABASE_DIR, backend=None):
+    """
+    The stats CHECKERS_STATS (or backend) asks for: SqliteStats if it's
+    "sqlite", an in-memory SqliteStats if it's "memory", the history log
+    otherwise.
+
+    Args:
+        environ (dict, optional): Defaults to os.environ
+        folder (str, optional): Defaults to the database folder
+        backend (str, optional): "log", "sqlite" or "memory", used instead
+            of CHECKERS_STATS
+    Raises:
+        ValueError: If backend isn't one of them
+    Returns:
+        Stats or SqliteStats
+    """
+    if backend is None:
+        environ = os.environ if environ is None else environ
+        backend = environ.get(BACKEND_VAR, "").lower() or "log"
+    if backend == "sqlite":
+        return SqliteStats(folder=folder)
+    if backend == "memory":
+        return SqliteStats(":memory:")
+    if backend == "log":
+        return Stats(folder)
+    raise ValueError(f"unknown stats backend: {backend}")
+
+
+class LazyStats:
+    """
+    The game's stats, opened the first time anything is asked of them
+    so importing the game never reads or writes a file. Everything else
+    (get, add_win, record_game...) is passed on to the open store.
+    """
+
+    def __init__(self):
+        self._store = None
+
+    @property
+    def is_open(self):
+        return self._store is not None
+
+    def open(self, backend=None, folder=DATABASE_DIR, environ=None):
+        """
+        Opens the store, closing the one that was open. Without a backend
+        it's the one CHECKERS_STATS asks for.
+
+        Args:
+            the same as make_stats
+        Raises:
+            ValueError: If backend isn't one make_stats knows
+        Returns:
+            Stats or SqliteStats: the open store
+        """
+        self.close()
+        self._store = make_stats(environ, folder, backend)
+        return self._store
+
+    def close(self):
+        """Closes the store, the next use opens it again."""
+        if self._store is not None:
+            self._store.close()
+            self._store = None
+
+    def __getattr__(self, name):
+        # only called for what LazyStats doesn't have itself
+        if name.startswith("_"):
+            raise AttributeError(name)
+        if self._store is None:
+            self.open()
+        return getattr(self._store, name)
+
 
-# Quick access
-stats = Stats()
+# Quick access, nothing is opened until it's used
+stats = LazyStats()
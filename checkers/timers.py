@@ -1,4 +1,4 @@
-import pygame
+from .clock import RealClock
 
 
 class GameTimer:
@@ -9,20 +9,24 @@ class GameTimer:
 
     Attributes:
         start_time (int): Initial time in milliseconds timer started
+        clock: where the time comes from, see checkers.clock
     """
-    def __init__(self):
+    def __init__(self, clock=None):
         """
         Starts the timer with current time as starting time and 
-        uses pygame.time.get_ticks() in milliseconds to count.
+        uses the clock (pygame.time.get_ticks() by default) in milliseconds
+        to count.
         Args:
-            None
+            clock (optional): a clock from checkers.clock. Defaults to the
+                RealClock
         Raises:
             None
         Returns:    
             None
         """
+        self.clock = clock or RealClock()
         self.start_time = (
-            pygame.time.get_ticks()
+            self.clock.ticks()
         )  # starting the built in timer
         # available in pygame itself, this is just a normal timer that tells the
         # user how much time they have spent in the game
@@ -38,7 +42,7 @@ class GameTimer:
             int: seconds passed
         """
         # Time in milliseconds since start
-        elapsed_ms = pygame.time.get_ticks() - self.start_time
+        elapsed_ms = self.clock.ticks() - self.start_time
         return elapsed_ms // 1000  # convert to seconds for easier calculations
         # further down the line
 
@@ -66,30 +70,86 @@ class GameTimer:
 class PlayerTimer:
     """
     countdown timer for each player's turns which tracks remaining time.
+
+    The time is kept in whole nanoseconds: what the turns that are over
+    used up, plus when the running turn started on the clock. The time left
+    is worked out from those when asked for, nothing is taken off every
+    frame, so there are no float errors building up over a long game.
     
     Attributes:
-        time_left (float): Remaining time in seconds
-        is_active (bool): is timer currently counting down
+        time_left (float): Remaining time in seconds, worked out when read
+        is_active (bool): is timer currently counting down, setting it
+            starts or stops the turn on the clock
+        clock: where the time comes from (see checkers.clock), None for a
+            timer that only goes down through update()
+        initial_ns (int): starting time in nanoseconds
+        used_ns (int): nanoseconds used by the turns that are over
+        turn_start_ns (int): clock time the running turn started at, None
+            when the timer is stopped
     """
-    def __init__(self, initial_time=300):  # 5 minutes default 300/60 =5 
+    def __init__(self, initial_time=300, clock=None):  # 5 minutes default 300/60 =5 
         """
         Creates new player timer with certain time limit.
 
         Args:
             initial_time (int, optional): Starting time in seconds. Defaults to 300 (5 minutes)
+            clock (optional): a clock from checkers.clock. Defaults to None,
+                the timer then only goes down through update()
         Raises:
             None
         Returns:
             None
         """
-        self.time_left = initial_time
-        self.is_active = False
+        self.clock = clock
+        self.initial_ns = round(initial_time * 1_000_000_000)
+        self.used_ns = 0
+        self.turn_start_ns = None
+        self._active = False
+
+    @property
+    def is_active(self):
+        return self._active
+
+    @is_active.setter
+    def is_active(self, active):
+        if active == self._active:
+            return
+        if self.clock is not None:
+            now = self.clock.ticks_ns()
+            if active:  # the turn starts now
+                self.turn_start_ns = now
+            else:  # the turn is over, keep what it used
+                self.used_ns += now - self.turn_start_ns
+                self.turn_start_ns = None
+        self._active = active
+
+    def ns_left(self):
+        """
+        Returns:
+            int: nanoseconds left, 0 or less once the time is over
+        """
+        left = self.initial_ns - self.used_ns
+        if self.turn_start_ns is not None:
+            left -= self.clock.ticks_ns() - self.turn_start_ns
+        return left
+
+    @property
+    def time_left(self):
+        return self.ns_left() / 1_000_000_000
+
+    @time_left.setter
+    def time_left(self, seconds):
+        # used up is whatever makes the time left come out right, a running
+        # turn starts over from now
+        if self.turn_start_ns is not None:
+            self.turn_start_ns = self.clock.ticks_ns()
+        self.used_ns = self.initial_ns - round(seconds * 1_000_000_000)
 
-    # this updates the time by bringing it down 
-    # each second that is passed in game
+    # this brings the time down by hand, the Board doesn't need it since
+    # the clock does the counting
     def update(self, dt):       
         """
-        Updates remaining time.
+        Takes time off the timer while it's active.
         
         Args:
             dt (float): delta time in seconds to subtract from remaining time
@@ -98,8 +158,8 @@ class PlayerTimer:
         Returns:
             None
         """
-        if self.is_active and self.time_left > 0:
-            self.time_left -= dt
+        if self.is_active and self.ns_left() > 0:
+            self.used_ns += round(dt * 1_000_000_000)
 
     def format_time(self):
         """
@@ -112,8 +172,9 @@ class PlayerTimer:
         Returns:
             str: formats the time to a mins:secs string 
         """
-        minutes = int(self.time_left) // 60
-        seconds = int(self.time_left) % 60
+        left = max(0, int(self.time_left))  # never below 00:00
+        minutes = left // 60
+        seconds = left % 60
         return f"{minutes:02}:{seconds:02}"
 
     def is_expired(self):
@@ -127,4 +188,4 @@ class PlayerTimer:
             bool: whether there's any time left or not, True if 0 or less
             and False if any time left
         """ 
-        return self.time_left <= 0
+        return self.ns_left() <= 0
@@ -1,3 +1,7 @@
+import functools
+
+import pygame
+
 from .constants import SQUARE_SIZE
 
 
@@ -18,53 +22,83 @@ def get_mouse_square(pos):
     column = x // SQUARE_SIZE
     return row, column
 
-# This algorithm has been inspired by our teacher Ms.Su!!!
-# really really interesting stuff
-def mergeSort(alist):
+
+def merge_rects(rects):
     """
-    Sorts list in descending order using merge sort algorithm!
-    
+    Joins rectangles that overlap until none of them do, so that a dirty
+    area is redrawn once instead of once for every rectangle covering it.
+
     Args:
-        alist (list): List of pieces to sort
+        rects (list): pygame.Rect objects, not changed
     Raises:
         None
-        
     Returns:
-        None: List is sorted in-place
-    Note:        
-        Comparison uses __gt__ method of pieces to sort kings before pawns.
+        list: new rectangles that don't overlap each other
     """
-    if len(alist) > 1:
-        mid = len(alist) // 2
-        left_half = alist[:mid]
-        right_half = alist[mid:]
+    merged = []
+    for rect in rects:
+        rect = rect.copy()
+        # a bigger rect can now touch ones that were apart before, so keep
+        # going until it doesn't grow any more
+        grown = True
+        while grown:
+            grown = False
+            for other in merged:
+                if rect.colliderect(other):
+                    rect.union_ip(other)
+                    merged.remove(other)
+                    grown = True
+                    break
+        merged.append(rect)
+    return merged
 
-        # recursion
-        mergeSort(left_half)
-        mergeSort(right_half)
 
-        left_half_index = 0
-        right_half_index = 0
-        full_list_index = 0
+# rendered text for every (font, text, antialias, color) lately used, the
+# panel shows the same few strings frame after frame and the clocks only
+# change once a second
+@functools.lru_cache(maxsize=256)
+def render_text(font, text, antialias, color):
+    """
+    font.render with a cache, takes the same arguments in the same order.
+    The surface is shared with everyone asking for the same text, so only
+    blit it and never draw on it.
 
-        while left_half_index < len(left_half) and right_half_index < len(
-            right_half
-        ):
-            if left_half[left_half_index] > right_half[right_half_index]:
-                alist[full_list_index] = left_half[left_half_index]
-                left_half_index += 1
-            else:
-                alist[full_list_index] = right_half[right_half_index]
-                right_half_index += 1
-            full_list_index += 1
+    Args:
+        font (pygame.font.Font): Font to render with
+        text (str): the text
+        antialias (bool): smooth edges
+        color (tuple): RGB color of the text
+    Raises:
+        pygame.error: If the font can't render the text
+    Returns:
+        pygame.Surface: the rendered text
+    """
+    return font.render(text, antialias, color)
 
-        while left_half_index < len(left_half):
-            alist[full_list_index] = left_half[left_half_index]
-            left_half_index += 1
-            full_list_index += 1
 
-        while right_half_index < len(right_half):
-            alist[full_list_index] = right_half[right_half_index]
-            right_half_index += 1
-            full_list_index += 1
+def wait_for_events(timeout, nap):
+    """
+    Sleeps until an event comes in or timeout milliseconds have passed,
+    like pygame.event.wait(timeout). That one checks for events every
+    millisecond while it waits and ends up costing more than running the
+    whole game loop at 30 FPS, so this one sleeps nap milliseconds between
+    checks (with the sleep the OS does for pygame.time.wait).
 
+    Args:
+        timeout (int): most milliseconds to wait
+        nap (int): milliseconds between checks, the longest an event waits
+            to be seen
+    Raises:
+        None
+    Returns:
+        list: the events, empty if the time ran out first
+    """
+    deadline = pygame.time.get_ticks() + timeout
+    while True:
+        events = pygame.event.get()
+        if events:
+            return events
+        left = deadline - pygame.time.get_ticks()
+        if left <= 0:
+            return []
+        pygame.time.wait(min(nap, left))
@@ -0,0 +1,146 @@
+"""
+Zobrist hashing for checkers positions and a transposition table.
+
+Every (color, king, square) gets a fixed random 64 bit number and a position's
+key is all the numbers of its pieces XORed together (plus SIDE_KEY when pink
+is to move). Since XOR undoes itself, a move only has to XOR out what left
+and XOR in what arrived, which is what move_key gives back.
+"""
+import random
+from collections import namedtuple
+
+from .constants import BLUE, DARK_PINK, ROWS, COLUMNS
+
+_random = random.Random(1387)  # fixed seed, keys are the same every run
+
+
+def _new_table():
+    return [[_random.getrandbits(64) for _ in range(COLUMNS)]
+            for _ in range(ROWS)]
+
+
+# (color, king) -> 8x8 table of keys
+PIECE_KEYS = {
+    (BLUE, False): _new_table(),
+    (BLUE, True): _new_table(),
+    (DARK_PINK, False): _new_table(),
+    (DARK_PINK, True): _new_table(),
+}
+SIDE_KEY = _random.getrandbits(64)  # XORed in when pink is to move
+
+
+def square_key(color, king, row, column):
+    return PIECE_KEYS[(color, king)][row][column]
+
+
+def hash_grid(grid, turn):
+    """
+    Computes a position's key from scratch.
+
+    Args:
+        grid (list): the board
+        turn (tuple): color to move
+    Raises:
+        None
+    Returns:
+        int: 64 bit key
+    """
+    key = SIDE_KEY if turn == DARK_PINK else 0
+    for row in grid:
+        for piece in row:
+            if piece != 0:
+                key ^= square_key(piece.color, piece.king, piece.row,
+                                  piece.column)
+    return key
+
+
+def move_key(color, king, origin, target, captures, promoted):
+    """
+    What a move changes in the key (without the side to move). XOR it in to
+    make the move and XOR it again to take it back.
+
+    Args:
+        color (tuple): color of the moving piece
+        king (bool): whether the piece was a king before the move
+        origin (tuple): (row, column) the piece left
+        target (tuple): (row, column) the piece landed on
+        captures (list): captured pieces, still on their squares
+        promoted (bool): whether the piece became a king
+    Raises:
+        None
+    Returns:
+        int: the key difference
+    """
+    key = square_key(color, king, *origin)
+    key ^= square_key(color, king or promoted, *target)
+    for captured_piece in captures:
+        key ^= square_key(captured_piece.color, captured_piece.king,
+                          captured_piece.row, captured_piece.column)
+    return key
+
+
+# what the table remembers about a searched position
+EXACT, LOWER, UPPER = 0, 1, 2
+Entry = namedtuple("Entry", "key depth score flag move")
+
+
+class TranspositionTable:
+    """
+    Fixed size table of search results indexed by Zobrist key. When two
+    positions fall on the same slot the one searched deeper stays.
+
+    Attributes:
+        size (int): number of slots, a power of two
+        entries (list): the slots, None when empty
+    """
+
+    def __init__(self, size=1 << 16):
+        """
+        Creates an empty table.
+
+        Args:
+            size (int, optional): slots, rounded up to a power of two.
+                Defaults to 65536
+        """
+        self.size = 1 << max(0, (size - 1).bit_length())
+        self._mask = self.size - 1
+        self.entries = [None] * self.size
+
+    def probe(self, key):
+        """
+        Returns:
+            Entry: what is stored for this exact key, None if nothing
+        """
+        entry = self.entries[key & self._mask]
+        if entry is not None and entry.key == key:
+            return entry
+        return None
+
+    def store(self, key, depth, score, flag, move=None):
+        """
+        Saves a search result unless a deeper result of another position
+        already sits in the slot (depth-preferred replacement).
+
+        Args:
+            key (int): Zobrist key of the position
+            depth (int): depth the position was searched to
+            score (int): the score found
+            flag (int): EXACT, LOWER (score >= beta) or UPPER (score <= alpha)
+            move (tuple, optional): best move found, for move ordering
+        Raises:
+            None
+        Returns:
+            bool: whether the result was stored
+        """
+        index = key & self._mask
+        old = self.entries[index]
+        if old is not None and old.key != key and old.depth > depth:
+            return False
+        self.entries[index] = Entry(key, depth, score, flag, move)
+        return True
+
+    def clear(self):
+        self.entries = [None] * self.size
+
+    def __len__(self):
+        return sum(1 for entry in self.entries if entry is not None)
@@ -13,6 +13,7 @@ from checkers.constants import (
     FONT_NAME,
     BOARD_BORDER,
     FONT_SIZE,
+    BLUE,
 )
 
 from checkers.board import Board
@@ -20,9 +21,11 @@ import pygame
 import sys
 import os
 
-from checkers.utils import get_mouse_square
+from checkers.utils import get_mouse_square, wait_for_events
 from checkers.timers import PlayerTimer
 from checkers.stats import stats
+from checkers.ai import AIPlayer
+from checkers.profiler import FrameProfiler
 
 # Add the parent directory to sys.path to run everything smoothly
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
@@ -32,9 +35,11 @@ pygame.init()
 SCREEN = pygame.display.set_mode((WIDTH, HEIGHT), pygame.SCALED)
 pygame.display.set_caption("Checkers Game")
 FPS = 30
+MENU_FPS = 10  # while the pause or winner menu is shown
 FONT = pygame.font.Font(FONT_NAME, FONT_SIZE)
 OVERALL_TIMER_EVENT = pygame.event.custom_type()
 OVERALL_TIME = pygame.time.set_timer(OVERALL_TIMER_EVENT, 1000)
+AI_DONE_EVENT = pygame.event.custom_type()  # the computer found its move
 
 
 def main():
@@ -61,15 +66,32 @@ def main():
     board = Board(SCREEN)
     win_recorded = False  # a flag to check if the win is already recorded
     # this is to make sure we don't add to the wins every single frame
+    ai = None  # the computer opponent, turned on and off with C
+    forced_captures = False  # mandatory captures, turned on and off with F
+    # frame times, only when CHECKERS_PROFILE is set (see profiler.py)
+    profiler = FrameProfiler.from_env()
+    stats.open()  # the win counts, CHECKERS_STATS picks where they're kept
 
     while running:
-        clock.tick(FPS)
+        profiler.start_frame()
+        # with a menu up (paused or game over) nothing moves on its own and
+        # only a key, a click or the overall timer changes the screen, so
+        # the loop goes round a lot less often
+        if board.paused or board.status == "game_over":
+            frame_rate = MENU_FPS
+        else:
+            frame_rate = FPS
+        clock.tick(frame_rate)  # never more than frame_rate frames a second
 
-        # UPDATE TIMERS FIRST (before events)
-        if not board.paused:
-            board.update_timers()
+        # idle mode: nothing is animated, so until a clock shows the next
+        # second only an event (a click, a key, the computer's move) can
+        # change the screen. Sleep until one comes in or until that second
+        events = wait_for_events(
+            board.ms_to_next_second(game_timer), 1000 // frame_rate
+        )
+        profiler.mark("wait")
 
-        for event in pygame.event.get():
+        for event in events:
             if event.type == pygame.QUIT:
                 running = False
 
@@ -89,16 +111,30 @@ def main():
                     row, col = get_mouse_square(pos)
                     print(f"Board position: row {row}, col {col}")
 
-                    # Handle the click through the board's click handler
-                    board.handle_click(row, col)
+                    # Handle the click through the board's click handler,
+                    # not on the computer's turn though
+                    if not (ai and board.turn == ai.color):
+                        board.handle_click(row, col)
          
 
             # add the win whenever someone wins to our database
             if board.status == "game_over" and not win_recorded:
-                stats.add_win(board.winner)
-                stats.save()  # Make sure to save the stats
+                # the whole game goes in the history, the win counts
+                # are worked out from it
+                stats.record_game(
+                    board.winner,
+                    duration=game_timer.get_time(),
+                    moves=board.move_count,
+                    material=board.material(),
+                    time_control=board.time_control(),
+                    move_list=board.moves_played,
+                )
+                board.refresh_wins(force=True)
                 win_recorded = True
-                print(f"{board.winner} win recorded!")
+                if board.winner == "Draw":
+                    print("Draw by repetition!")
+                else:
+                    print(f"{board.winner} win recorded!")
 
             
             if event.type == pygame.KEYDOWN:
@@ -111,10 +147,36 @@ def main():
                     board.paused == True or board.status == "game_over"
                 ):
                     stats.reset()
+                    board.refresh_wins(force=True)
+
+                # play against the computer (it plays pink) with C
+                if event.key == pygame.K_c:
+                    if ai:
+                        ai.cancel()
+                        ai = None
+                    else:
+                        ai = AIPlayer(done_event=AI_DONE_EVENT)
+                        # whatever was half selected belongs to the human
+                        if board.turn == ai.color:
+                            board.selected = None
+                            board.valid_moves = {}
+
+                # forced captures on and off with F, the next games keep it
+                if event.key == pygame.K_f:
+                    forced_captures = not board.forced_captures
+                    board.set_forced_captures(forced_captures)
+                    if ai:
+                        ai.cancel()  # it was thinking with the old rules
+                    print(
+                        "Forced captures on" if forced_captures
+                        else "Forced captures off"
+                    )
 
                 # Rest with R key 
                 if event.key == pygame.K_r:
-                    board = Board(SCREEN)
+                    if ai:
+                        ai.cancel()
+                    board = Board(SCREEN, forced_captures)
                     game_timer = GameTimer()
                     win_recorded = False  # Reset flag for new game, making
                     # sure we will record the result for this one
@@ -128,23 +190,64 @@ def main():
                 ):
                     running = False
 
-        # Clear screen and draw everything
-        SCREEN.fill((0, 0, 0))  # Black background put to be able to 
-        # smoothly erased the last frame
+        profiler.mark("events")
+
+        # the computer thinks in the background and we only check on it
+        # once per frame, so the game never freezes while it searches. It
+        # posts AI_DONE_EVENT when it's done, which wakes the loop up.
+        # This comes after the events so a move is answered straight away
+        if ai:
+            if board.paused or board.status != "playing":
+                ai.cancel()
+            elif board.turn == ai.color:
+                route = ai.poll()
+                if route:
+                    # how far it looked, in the frame times box when it's on
+                    profiler.set_note(
+                        f"AI depth {ai.depth}, {ai.nodes} nodes, "
+                        f"{ai.nps:.0f}/s"
+                    )
+                    # the whole turn, a multi-jump is played jump by jump
+                    if board.selected is None:
+                        board.select_piece(*route[0])
+                    for row, col in route[1:]:
+                        board.move(row, col)
+                # start thinking now, also when the turn it just played
+                # still goes on jumping, instead of after the loop sleeps
+                if (
+                    board.turn == ai.color
+                    and board.status == "playing"
+                    and not ai.thinking
+                ):
+                    ai_timer = (
+                        board.blue_timer if ai.color == BLUE
+                        else board.pink_timer
+                    )
+                    ai.start(board, ai_timer.time_left)
+
+        profiler.mark("ai")
 
-        board.update_timers()  # this checks if any of the times is over
+        # the one timer update of the frame, it checks if any of the times
+        # is over (the timers work out their time from the clock themselves)
+        board.update_timers()
+        profiler.mark("update_timers")
 
-        # Draw the board and pieces
-        board.draw_whole(SCREEN)
+        # Draw the board, the side panel with timer and game info and the
+        # pause menu, but only the parts that changed since the last frame.
+        # No need to clear the screen first, the board background and the
+        # side panel cover the whole window
+        dirty = board.render(SCREEN, FONT, game_timer, profiler)
+        dirty = profiler.draw(SCREEN, dirty)  # the frame times box, if on
+        profiler.mark("hud")
 
-        # Draw the side panel with timer and game info
-        board.draw_side_panel(SCREEN, FONT, game_timer)
-        #  if the board is paused draw the menu for it 
-        if board.paused:
-            board.draw_pause_menu(SCREEN, FONT)
+        # Update display, only the changed parts (nothing on idle frames)
+        if dirty:
+            pygame.display.update(dirty)
+        profiler.mark("display_update")
+        profiler.end_frame()
 
-        # Update display
-        pygame.display.update()
+    profiler.close()
+    stats.close()
 
     pygame.quit()
     sys.exit()
@@ -0,0 +1,225 @@
+import unittest
+from unittest import mock
+import time
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers import rules, zobrist
+from checkers.ai import (
+    AIPlayer, SAFETY_MARGIN, WIN_SCORE, generate_moves, make_turn,
+    score_from_table, score_to_table, unmake_turn,
+)
+from checkers.board import Board
+from checkers.perft import parse_position
+from checkers.rules import Checker
+from checkers.constants import BLUE, DARK_PINK, ROWS, COLUMNS
+
+
+class TestAI(unittest.TestCase):
+
+    # with a free piece to take the computer must take it
+    def test_01_takes_free_capture(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: AI takes a free piece')
+        grid = [[0] * COLUMNS for _ in range(ROWS)]
+        grid[2][3] = Checker(2, 3, DARK_PINK)
+        grid[3][4] = Checker(3, 4, BLUE)
+        grid[7][0] = Checker(7, 0, BLUE)
+        ai = AIPlayer(DARK_PINK, max_depth=4)
+        move = ai.choose_move(grid, DARK_PINK, 1.0)
+        print(f'AI move: {move}, depth {ai.depth}, {ai.nps:.0f} nodes/sec')
+        try:
+            self.assertEqual(move, ((2, 3), (4, 5)))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the search stops on time and leaves the board as it was. The clock is
+    # a fake one that moves 50ms every time it's read, so a slow machine
+    # can't make it late
+    def test_02_respects_time_budget(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: AI answers within its time budget')
+        grid = rules.make_grid()
+        before = [[piece != 0 and (piece.color, piece.king) for piece in row]
+                  for row in grid]
+        ai = AIPlayer(BLUE)
+        budget = ai.think_time(10.0)  # 10s on the clock, 0.5s to think
+        reads = []
+
+        def fake_clock():
+            reads.append(len(reads) * 0.05)
+            return reads[-1]
+
+        with mock.patch('checkers.ai.time.perf_counter',
+                        side_effect=fake_clock):
+            move = ai.choose_move(grid, BLUE, budget)
+        # the last read works out nodes/sec, the one before stopped it
+        elapsed = reads[-2]
+        after = [[piece != 0 and (piece.color, piece.king) for piece in row]
+                 for row in grid]
+        print(f'AI move: {move} in {elapsed:.2f}s of {budget:.2f}s, '
+              f'depth {ai.depth}')
+        try:
+            self.assertIsNotNone(move)
+            self.assertLessEqual(budget, 10.0 - SAFETY_MARGIN)
+            # it stops at the first clock read past the deadline
+            self.assertGreater(elapsed, budget)
+            self.assertLess(elapsed, budget + 0.06)
+            self.assertGreaterEqual(ai.depth, 1)
+            self.assertEqual(before, after)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # never plan to use more than the clock has left
+    def test_03_think_time_leaves_margin(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Think time leaves time on the clock')
+        ai = AIPlayer()
+        budgets = [ai.think_time(left) for left in (300, 10, 1, 0.2)]
+        print(f'Budgets: {budgets}')
+        try:
+            self.assertEqual(budgets[0], ai.max_think_time)
+            self.assertLessEqual(budgets[1], 10 - SAFETY_MARGIN)
+            self.assertLessEqual(budgets[2], 1 - SAFETY_MARGIN)
+            self.assertEqual(budgets[3], 0.0)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a multi-jump is one turn, the search can not stop half way
+    def test_04_plays_whole_double_jump(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: AI sees a jump chain through to its end')
+        grid = [[0] * COLUMNS for _ in range(ROWS)]
+        for row, col, color, king in ((3, 0, DARK_PINK, False),
+                                      (4, 3, DARK_PINK, False),
+                                      (3, 4, DARK_PINK, True),
+                                      (3, 6, DARK_PINK, True),
+                                      (3, 2, BLUE, True), (4, 5, BLUE, False),
+                                      (5, 0, BLUE, False), (6, 5, BLUE, False)):
+            grid[row][col] = Checker(row, col, color, king)
+        routes = [move[1] for move in generate_moves(grid, DARK_PINK)]
+        ai = AIPlayer(DARK_PINK, max_depth=2)
+        move = ai.choose_move(grid, DARK_PINK, 1.0)
+        print(f'Routes: {routes}')
+        print(f'AI move: {move}, depth {ai.depth}')
+        try:
+            # (3, 6) jumping to (5, 4) would have to go on to (7, 6)
+            self.assertNotIn(((3, 6), (5, 4)), routes)
+            self.assertIn(((3, 6), (5, 4), (7, 6)), routes)
+            self.assertEqual(move, ((3, 4), (5, 6), (7, 4)))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a pawn crowned in the middle of a jump goes on jumping as a king
+    def test_05_jumps_on_after_crowning(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 5: AI keeps jumping after crowning')
+        grid = [[0] * COLUMNS for _ in range(ROWS)]
+        grid[5][2] = Checker(5, 2, DARK_PINK)
+        grid[6][3] = Checker(6, 3, BLUE)
+        grid[6][5] = Checker(6, 5, BLUE)
+        grid[0][1] = Checker(0, 1, BLUE)
+        routes = [move[1] for move in generate_moves(grid, DARK_PINK)]
+        ai = AIPlayer(DARK_PINK, max_depth=3)
+        move = ai.choose_move(grid, DARK_PINK, 1.0)
+        print(f'Routes: {routes}')
+        print(f'AI move: {move}, depth {ai.depth}')
+        try:
+            self.assertNotIn(((5, 2), (7, 4)), routes)
+            self.assertEqual(move, ((5, 2), (7, 4), (5, 6)))
+            self.assertEqual(grid[5][2].color, DARK_PINK)
+            self.assertFalse(grid[5][2].king)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a win stored in the table is still as many plies away when the same
+    # position comes up again deeper in the tree
+    def test_06_table_keeps_win_distance(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 6: Table scores for wins depend on the ply')
+        grid = [[0] * COLUMNS for _ in range(ROWS)]
+        grid[2][3] = Checker(2, 3, DARK_PINK)
+        grid[3][4] = Checker(3, 4, BLUE)
+        ai = AIPlayer(DARK_PINK)
+        ai._deadline = time.perf_counter() + 60
+        key = zobrist.hash_grid(grid, DARK_PINK)
+        bound = WIN_SCORE + 1
+        near = ai._negamax(grid, DARK_PINK, 2, -bound, bound, 0, key)
+        stored = ai.table.probe(key)
+        # the second search gets its score straight from the table
+        nodes = ai.nodes
+        far = ai._negamax(grid, DARK_PINK, 2, -bound, bound, 5, key)
+        print(f'Score at ply 0: {near}, at ply 5: {far}, '
+              f'stored: {stored.score}')
+        try:
+            # taking the last piece wins on the next ply
+            self.assertEqual(near, WIN_SCORE - 1)
+            self.assertEqual(stored.score, WIN_SCORE - 1)
+            self.assertEqual(ai.nodes, nodes + 1)
+            self.assertEqual(far, WIN_SCORE - 6)
+            self.assertEqual(score_from_table(score_to_table(-near, 3), 3),
+                             -near)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # ahead in material it won't walk into the third repetition, a draw
+    def test_07_avoids_repetition_when_ahead(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 7: AI that is ahead avoids a repetition draw')
+        with mock.patch('pygame.time.get_ticks', return_value=0):
+            board = Board(None)
+            board.load_bitboard(parse_position("""
+                ........
+                ......P.
+                ........
+                ..P.....
+                ........
+                ........
+                ........
+                ....B...
+            """), DARK_PINK)
+        ai = AIPlayer(DARK_PINK, max_depth=4)
+        free = ai.choose_move(board.board, DARK_PINK, 5.0)
+        # the position after that move was already there twice
+        piece = board.get_piece(*free[0])
+        records, change = make_turn(board.board, piece, free, [[]])
+        repeated = board.key ^ zobrist.SIDE_KEY ^ change
+        unmake_turn(board.board, records)
+        board.position_counts[repeated] = 2
+        ai.start(board, 100.0)
+        ai._finished.wait(10)
+        move = ai.poll()
+        print(f'Without history: {free}, with it: {move}')
+        try:
+            self.assertIsNotNone(move)
+            self.assertNotEqual(move, free)
+            self.assertEqual(move[0], free[0])  # still the same good plan
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,150 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers.board import Board
+from checkers.bitboard import BitBoard, square_index, square_position, shift
+from checkers.pieces import King
+from checkers.constants import BLUE, DARK_PINK
+
+
+def board_moves(board, color):
+    # the moves of the real board in the same form as BitBoard.moves
+    result = []
+    for piece in board.get_all_pieces(color):
+        for (row, col), captured in board.get_valid_moves(piece).items():
+            mask = 0
+            for captured_piece in captured:
+                mask |= 1 << square_index(
+                    captured_piece.row, captured_piece.column
+                )
+            result.append(
+                (square_index(piece.row, piece.column),
+                 square_index(row, col), mask)
+            )
+    return result
+
+
+class TestBitBoard(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch('pygame.display.set_mode'), \
+             mock.patch('pygame.time.get_ticks', return_value=0):
+            self.board = Board(None)
+
+    # every playable square must map back to itself
+    def test_01_square_mapping(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Square numbering round trip')
+        squares = [square_index(*square_position(sq)) for sq in range(32)]
+        print(f'Round trip: {squares}')
+        try:
+            self.assertEqual(squares, list(range(32)))
+            self.assertEqual(square_position(0), (0, 1))
+            self.assertEqual(square_position(4), (1, 0))
+            with self.assertRaises(ValueError):
+                square_index(0, 0)  # light square
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # shifting off the edge of the board must drop the bit
+    def test_02_shift_edges(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Shifts drop pieces leaving the board')
+        left = 1 << square_index(1, 0)
+        right = 1 << square_index(0, 7)
+        print(f'Left edge piece: {left:#x}, right edge piece: {right:#x}')
+        try:
+            self.assertEqual(shift(left, 1, -1), 0)
+            self.assertEqual(shift(left, -1, -1), 0)
+            self.assertEqual(shift(right, 1, 1), 0)
+            self.assertEqual(shift(right, -1, 1), 0)
+            self.assertEqual(shift(left, 1, 1), 1 << square_index(2, 1))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the start position must be the same as the one the Board makes
+    def test_03_start_position(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Start position matches make_board')
+        bitboard = self.board.to_bitboard()
+        print(f'From board: {bitboard}')
+        try:
+            self.assertEqual(bitboard, BitBoard.start())
+            self.assertEqual(bitboard.count(BLUE), 12)
+            self.assertEqual(bitboard.count(DARK_PINK), 12)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # playing a game on both and checking that they always agree on moves
+    def test_04_moves_match_board(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: BitBoard moves match Board moves over a game')
+        bitboard = BitBoard.start()
+        color = BLUE
+        plies = 0
+        try:
+            for plies in range(80):
+                self.board.load_bitboard(bitboard)
+                expected = board_moves(self.board, color)
+                self.assertEqual(bitboard.moves(color), expected)
+                self.assertEqual(
+                    bitboard.movers(color),
+                    sum(1 << o for o in {o for o, _, c in expected if not c}),
+                )
+                self.assertEqual(
+                    bitboard.jumpers(color),
+                    sum(1 << o for o in {o for o, _, c in expected if c}),
+                )
+                if not expected:
+                    break
+                # prefer captures so that kings show up
+                captures = [move for move in expected if move[2]]
+                options = captures or expected
+                bitboard.make(*options[(plies * 7) % len(options)])
+                color = DARK_PINK if color == BLUE else BLUE
+            print(f'Plies compared: {plies + 1}')
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # loading a position with kings back into the board
+    def test_05_load_bitboard(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 5: Board syncs from a BitBoard')
+        bitboard = BitBoard(
+            blue_kings=1 << square_index(3, 2),
+            pink_men=1 << square_index(2, 1),
+        )
+        self.board.load_bitboard(bitboard)
+        king = self.board.get_piece(3, 2)
+        print(f'Piece at (3,2): {king}')
+        try:
+            self.assertIsInstance(king, King)
+            self.assertEqual(self.board.cyan_kings, 1)
+            self.assertEqual(self.board.pink_pawns, 1)
+            self.assertEqual(self.board.cyan_pawns, 0)
+            self.assertEqual(self.board.to_bitboard(), bitboard)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
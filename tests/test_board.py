@@ -3,11 +3,30 @@ from unittest import mock
 import sys
 import os
 
+import pygame
+
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
+from checkers import board as board_module
 from checkers.board import Board
+from checkers.clock import ManualClock
 from checkers.pieces import Pawn, King
-from checkers.constants import BLUE, DARK_PINK, ROWS, COLUMNS
+from checkers.perft import parse_position
+from checkers.timers import GameTimer
+from checkers.stats import stats
+from checkers.constants import (
+    BLUE, DARK_PINK, ROWS, COLUMNS, SQUARE_SIZE, WHITE, CYAN, WIDTH, HEIGHT,
+    FONT_NAME, FONT_SIZE, COOL_GREY,
+)
+
+
+def setUpModule():
+    # the scoreboard gets its wins from a store that is never saved
+    stats.open('memory')
+
+
+def tearDownModule():
+    stats.close()
 
 
 class TestBoard(unittest.TestCase):
@@ -362,6 +381,381 @@ class TestBoard(unittest.TestCase):
             print('Test Failed')
         print('----------------------------------------------------------------------\n\n')
 
+    # make_move and unmake_move must bring back the exact same position,
+    # captured pieces and promoted pawns included
+    def test_17_make_unmake_move(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 17: make_move then unmake_move restores the board')
+
+        # a blue pawn that captures into the last row and gets promoted
+        self.board.board[0][1] = 0
+        self.board.board[1][2] = Pawn(1, 2, DARK_PINK)
+        pawn = Pawn(2, 3, BLUE)
+        self.board.board[2][3] = pawn
+        before = self.board.to_bitboard()
+        counts = (self.board.cyan_pawns, self.board.pink_pawns,
+                  self.board.cyan_kings)
+
+        self.board.make_move(pawn, 0, 1)
+        promoted = self.board.get_piece(0, 1)
+        print(f'After make_move: {promoted}, turn {self.board.turn}')
+        try:
+            self.assertTrue(promoted.king)
+            self.assertEqual(self.board.get_piece(1, 2), 0)
+            self.assertEqual(self.board.cyan_kings, counts[2] + 1)
+            self.assertEqual(self.board.turn, DARK_PINK)
+            self.assertEqual(len(self.board.captured), 1)
+
+            record = self.board.unmake_move()
+            print(f'Undo record: {record}')
+            self.assertTrue(record.promoted)
+            self.assertIs(self.board.get_piece(2, 3), pawn)
+            self.assertEqual(self.board.to_bitboard(), before)
+            self.assertEqual(
+                (self.board.cyan_pawns, self.board.pink_pawns,
+                 self.board.cyan_kings), counts)
+            self.assertEqual(self.board.turn, BLUE)
+            self.assertEqual(self.board.captured, [])
+            self.assertEqual(self.board.history, [])
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+    # the piece sets must always hold exactly the pieces on the squares,
+    # through captures, promotions and taking moves back
+    def test_18_piece_sets_follow_moves(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 18: Piece sets stay the same as the board')
+
+        def scanned(color):
+            return {piece for row in self.board.board for piece in row
+                    if piece != 0 and piece.color == color}
+
+        plies = 0
+        try:
+            for plies in range(60):
+                # always the last move of the last piece that can move, so
+                # the game is the same every run and has captures in it
+                moves = [(piece, target, captures)
+                         for piece in self.board.get_all_pieces(self.board.turn)
+                         for target, captures
+                         in self.board.get_valid_moves(piece).items()]
+                if not moves:
+                    break
+                piece, (row, col), captures = moves[-1]
+                self.board.make_move(piece, row, col, captures)
+                for color in (BLUE, DARK_PINK):
+                    self.assertEqual(self.board.pieces[color], scanned(color))
+                    self.assertEqual(self.board.piece_count(color),
+                                     len(scanned(color)))
+
+            print(f'Plies played: {plies}, captured: {len(self.board.captured)}')
+            while self.board.history:
+                self.board.unmake_move()
+            self.assertEqual(self.board.piece_count(BLUE), 12)
+            self.assertEqual(self.board.pieces[DARK_PINK], scanned(DARK_PINK))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the moves of the side to move are worked out once and thrown away
+    # when a move is made
+    def test_19_legal_move_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 19: Legal moves are cached until the position changes')
+        try:
+            legal = self.board.get_legal_moves()
+            self.assertIs(self.board.get_legal_moves(), legal)
+            self.assertEqual(len(legal), 12)
+            self.assertTrue(self.board.select_piece(5, 2))
+            self.assertEqual(self.board.valid_moves,
+                             self.board.get_valid_moves(self.board.selected))
+            self.assertTrue(self.board.select_piece(5, 0))
+            self.assertIs(self.board.get_legal_moves(), legal)
+
+            self.assertTrue(self.board.move(4, 1))
+            # check_winner already worked out pink's moves for the new turn
+            pink = self.board.get_legal_moves()
+            print(f'Pink pieces in the cache: {len(pink)}')
+            self.assertIsNot(pink, legal)
+            self.assertTrue(all(piece.color == DARK_PINK for piece in pink))
+            self.assertEqual(
+                pink[self.board.get_piece(2, 1)],
+                self.board.get_valid_moves(self.board.get_piece(2, 1)),
+            )
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # with forced captures only the capture can be played and a jump chain
+    # can't be left halfway
+    def test_20_forced_captures(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 20: Forced captures mode')
+        # blue pawn at (6, 1) can jump (5, 2) and then (3, 4)
+        self.board.load_bitboard(parse_position("""
+            .....p..
+            ........
+            ........
+            ....p...
+            ........
+            ..p.....
+            .b......
+            ......b.
+        """), BLUE)
+        self.board.set_forced_captures(True)
+        try:
+            legal = self.board.get_legal_moves()
+            print(f'Pieces allowed to move: {[p.position for p in legal]}')
+            self.assertEqual([p.position for p in legal], [(6, 1)])
+            self.assertTrue(self.board.select_piece(7, 6))
+            self.assertEqual(self.board.valid_moves, {})  # has to capture
+
+            self.board.handle_click(6, 1)
+            self.assertEqual(set(self.board.valid_moves), {(4, 3), (2, 5)})
+            self.board.handle_click(4, 3)  # only the first jump
+            self.assertTrue(self.board.jumping)
+            self.board.handle_click(7, 6)  # can't switch to another piece
+            self.assertEqual(self.board.selected.position, (4, 3))
+            self.assertEqual(self.board.turn, BLUE)
+            self.board.handle_click(2, 5)
+            self.assertFalse(self.board.jumping)
+            self.assertEqual(self.board.turn, DARK_PINK)
+            self.assertEqual(len(self.board.captured), 2)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the squares are drawn once and only drawn again when the sizes change
+    def test_21_background_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 21: Board background is cached')
+        first = board_module.board_background()
+        again = board_module.board_background()
+        with mock.patch.object(board_module.constants, 'SQUARE_SIZE', 50):
+            smaller = board_module.board_background()
+        # a thicker border is drawn with the new width, not the old one
+        with mock.patch.object(board_module.constants, 'BOARD_BORDER', 20):
+            thicker = board_module.board_background()
+        print(f'Background size: {first.get_size()}')
+        try:
+            self.assertIs(first, again)
+            self.assertIsNot(first, smaller)
+            # top left square is white, the one next to it cyan
+            self.assertEqual(first.get_at((10, 10))[:3], WHITE)
+            self.assertEqual(first.get_at((SQUARE_SIZE + 10, 10))[:3], CYAN)
+            self.assertEqual(smaller.get_at((60, 10))[:3], CYAN)
+            self.assertEqual(thicker.get_at((15, 300))[:3], COOL_GREY)
+            self.assertNotEqual(first.get_at((15, 300))[:3], COOL_GREY)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # drawing only the dirty parts must end up with the same picture as
+    # drawing everything, and a frame where nothing changed draws nothing
+    def test_22_dirty_rectangles(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 22: Dirty rectangles match a full redraw')
+        pygame.font.init()
+        font = pygame.font.Font(FONT_NAME, FONT_SIZE)
+        with mock.patch('pygame.time.get_ticks', return_value=0):
+            game_timer = GameTimer()
+        window = pygame.Surface((WIDTH, HEIGHT))
+
+        def full_picture():
+            picture = pygame.Surface((WIDTH, HEIGHT))
+            self.board.draw_frame(picture, font, game_timer)
+            return pygame.image.tostring(picture, 'RGB')
+
+        try:
+            with mock.patch('pygame.time.get_ticks', return_value=0):
+                first = self.board.render(window, font, game_timer)
+                idle = self.board.render(window, font, game_timer)
+                print(f'First frame: {first}, idle frame: {idle}')
+                self.assertEqual(first, [window.get_rect()])
+                self.assertEqual(idle, [])
+
+                for click in [(5, 2), (4, 3), (2, 3), (3, 2)]:
+                    self.board.handle_click(*click)
+                    rects = self.board.render(window, font, game_timer)
+                    print(f'After clicking {click}: {len(rects)} rects')
+                    self.assertTrue(rects)
+                    self.assertTrue(all(rect.width * rect.height
+                                        < WIDTH * HEIGHT for rect in rects))
+                    self.assertEqual(pygame.image.tostring(window, 'RGB'),
+                                     full_picture())
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the menus are laid out once and drawing them again reuses the same
+    # surfaces, the picture is the same as drawing the text by hand
+    def test_23_menu_overlay_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 23: Pause and winner menus are built once')
+        pygame.font.init()
+        font = pygame.font.Font(FONT_NAME, FONT_SIZE)
+        window = pygame.Surface((WIDTH, HEIGHT))
+        pause = board_module.menu_overlay(font, board_module.PAUSE_LINES)
+        self.board.draw_pause_menu(window, font)
+
+        # the same menu drawn the old way, a new sheet and the text
+        expected = pygame.Surface((WIDTH, HEIGHT))
+        sheet = pygame.Surface((WIDTH, HEIGHT))
+        sheet.set_alpha(180)
+        sheet.fill((0, 0, 0))
+        expected.blit(sheet, (0, 0))
+        for text, color, offset in board_module.PAUSE_LINES:
+            line = font.render(text, True, color)
+            expected.blit(line, line.get_rect(
+                center=(WIDTH // 2, HEIGHT // 2 + offset)
+            ))
+
+        self.board.winner = "Pink"
+        pink = board_module.menu_overlay(
+            font, board_module.winner_lines("Pink")
+        )
+        print(f'Pause menu layers: {len(pause)}, winner: {pink[1][0]}')
+        try:
+            self.assertIs(
+                board_module.menu_overlay(font, board_module.PAUSE_LINES),
+                pause,
+            )
+            self.assertIs(pink[0][0], pause[0][0])  # one dark sheet for all
+            self.assertEqual(pygame.image.tostring(window, 'RGB'),
+                             pygame.image.tostring(expected, 'RGB'))
+            self.assertEqual(board_module.winner_lines("Draw")[0][0], "DRAW!")
+            self.assertEqual(board_module.winner_lines("Pink")[0][0],
+                             "PINK WINS!")
+            self.board.draw_winner(window, font)
+            self.assertIs(board_module.menu_overlay(
+                font, board_module.winner_lines("Pink")), pink)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the main loop sleeps until one of the clocks shows its next second
+    def test_24_ms_to_next_second(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 24: Time until a clock on screen changes')
+        with mock.patch('pygame.time.get_ticks', return_value=0):
+            game_timer = GameTimer()
+        try:
+            with mock.patch('pygame.time.get_ticks', return_value=1250):
+                self.board.update_timers()  # blue has 298.75s left
+                running = self.board.ms_to_next_second(game_timer)
+            with mock.patch('pygame.time.get_ticks', return_value=1600):
+                later = self.board.ms_to_next_second(game_timer)
+            with mock.patch('pygame.time.get_ticks', return_value=1900):
+                self.board.update_timers()
+                self.board.toggle_pause()  # only the overall timer runs
+                self.board.blue_timer.time_left = 298.99
+                paused = self.board.ms_to_next_second(game_timer)
+            print(f'Running: {running}ms, later: {later}ms, '
+                  f'paused: {paused}ms')
+            self.assertEqual(running, 751)
+            self.assertEqual(later, 401)
+            self.assertEqual(paused, 101)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # captured pieces are kept sorted as they come in and the panel strip is
+    # only drawn again after a capture (or taking one back)
+    def test_25_captured_strip(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 25: Sorted captured pieces and their cached strip')
+        self.board.load_bitboard(parse_position("""
+            ........
+            ........
+            ........
+            ........
+            ...P.p..
+            ..b.b...
+            ........
+            ........
+        """))
+        window = pygame.Surface((WIDTH, HEIGHT))
+        try:
+            pawn = self.board.get_piece(4, 5)
+            king = self.board.get_piece(4, 3)
+            self.board.make_move(self.board.get_piece(5, 4), 3, 6)
+            self.board.make_move(self.board.get_piece(5, 2), 3, 4)
+            captured = self.board.captured_sorted[DARK_PINK]
+            print(f'Captured pink pieces: {[p.points for p in captured]}')
+            self.assertEqual(captured, [king, pawn])  # king first
+            self.assertEqual(self.board.captured, [pawn, king])
+
+            self.board.draw_captured_pieces(window)
+            strip = self.board.captured_strips[DARK_PINK]
+            self.board.draw_captured_pieces(window)
+            self.assertIs(self.board.captured_strips[DARK_PINK], strip)
+            self.assertIsNone(self.board.captured_strips[BLUE])
+
+            self.board.unmake_move()
+            self.assertEqual(self.board.captured_sorted[DARK_PINK], [pawn])
+            self.assertIsNone(self.board.captured_strips[DARK_PINK])
+            self.board.draw_captured_pieces(window)
+            smaller = self.board.captured_strips[DARK_PINK]
+            print(f'Strip with 2 pieces: {strip[0].get_size()}, '
+                  f'with 1: {smaller[0].get_size()}')
+            self.assertLess(smaller[0].get_width(), strip[0].get_width())
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the wins in the panel are read from the stats once a second, not on
+    # every frame, and straight away when a game's result is in
+    def test_26_wins_read_once_a_second(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 26: Win counts are polled at most once a second')
+        clock = ManualClock()
+        board = Board(None, clock=clock)
+        game_timer = GameTimer(clock=clock)
+        try:
+            with mock.patch.object(stats, 'get', wraps=stats.get) as get:
+                for _ in range(30):  # a second of frames at 30 FPS
+                    board.find_changes(game_timer)
+                    clock.advance(33)
+                first_second = get.call_count
+                clock.advance(10)  # now a second since the first read
+                board.find_changes(game_timer)
+                board.find_changes(game_timer)
+                polled = get.call_count
+                stats.add_win('Pink')
+                board.refresh_wins(force=True)
+                board.find_changes(game_timer)
+            print(f'Reads: {first_second} in the first second, '
+                  f'{polled} after it, {get.call_count} with the win')
+            self.assertEqual(first_second, 1)
+            self.assertEqual(polled, 2)
+            self.assertEqual(get.call_count, 3)
+            self.assertEqual(board.wins, stats.get())
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,81 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers.board import Board
+from checkers.clock import ManualClock, AcceleratedClock
+from checkers.timers import GameTimer
+
+
+class TestClock(unittest.TestCase):
+
+    # a manual clock only moves when told to and never goes back
+    def test_01_manual_clock(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Manual clock drives the game timer')
+        clock = ManualClock(500)
+        timer = GameTimer(clock)
+        clock.advance(3_661_000)  # 1 hour, 1 minute and 1 second
+        print(f'Ticks: {clock.ticks()}, timer shows {timer.format_time()}')
+        try:
+            self.assertEqual(timer.start_time, 500)
+            self.assertEqual(timer.format_time(), '01:01:01')
+            with self.assertRaises(ValueError):
+                clock.advance(-1)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a whole timed game runs out without waiting or patching pygame
+    def test_02_timer_expiry(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: A player timer runs out on a manual clock')
+        clock = ManualClock()
+        board = Board(None, clock=clock)
+        try:
+            for _ in range(299):
+                clock.advance(1000)
+                board.update_timers()
+            self.assertEqual(board.status, 'playing')
+            self.assertEqual(board.blue_timer.format_time(), '00:01')
+            clock.advance(1000)
+            board.update_timers()
+            print(f'Blue has {board.blue_timer.time_left}s left, '
+                  f'winner: {board.winner}')
+            self.assertEqual(board.status, 'game_over')
+            self.assertEqual(board.winner, 'Pink')
+            self.assertEqual(board.pink_timer.time_left, 300)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the accelerated clock is real time multiplied by its factor
+    def test_03_accelerated_clock(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Accelerated clock runs faster than real time')
+        with mock.patch('time.monotonic_ns', return_value=10**9):
+            clock = AcceleratedClock(60)
+        # half a real second later
+        with mock.patch('time.monotonic_ns', return_value=15 * 10**8):
+            ticks = clock.ticks()
+        print(f'Ticks after half a second at 60x: {ticks}')
+        try:
+            self.assertEqual(ticks, 30_000)
+            with self.assertRaises(ValueError):
+                AcceleratedClock(0)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
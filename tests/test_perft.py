@@ -0,0 +1,130 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers.board import Board
+from checkers.bitboard import BitBoard
+from checkers.perft import (
+    KNOWN_COUNTS, perft, divide, perft_bitboard, parse_position,
+)
+from checkers.constants import BLUE, DARK_PINK
+
+START = """
+.p.p.p.p
+p.p.p.p.
+.p.p.p.p
+........
+........
+b.b.b.b.
+.b.b.b.b
+b.b.b.b.
+"""
+
+
+class TestPerft(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch('pygame.display.set_mode'), \
+             mock.patch('pygame.time.get_ticks', return_value=0):
+            self.board = Board(None)
+
+    # the move generator must give the same counts as always
+    def test_01_known_counts(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Perft from the start position')
+        before = self.board.to_bitboard()
+        counts = {depth: perft(self.board, depth) for depth in range(1, 5)}
+        print(f'Counts: {counts}')
+        try:
+            for depth, nodes in counts.items():
+                self.assertEqual(nodes, KNOWN_COUNTS[depth])
+            self.assertEqual(self.board.to_bitboard(), before)  # unchanged
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the split by first move adds up and the bitboard agrees
+    def test_02_divide_and_bitboard(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Divide adds up and matches the BitBoard')
+        counts = divide(self.board, 3)
+        print(f'Divide: {counts}')
+        try:
+            self.assertEqual(len(counts), KNOWN_COUNTS[1])
+            self.assertEqual(sum(counts.values()), KNOWN_COUNTS[3])
+            self.assertEqual(
+                perft_bitboard(BitBoard.start(), BLUE, 4), KNOWN_COUNTS[4]
+            )
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # reading a position from text
+    def test_03_parse_position(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Parse a position')
+        try:
+            self.assertEqual(parse_position(START), BitBoard.start())
+            kings = parse_position(START.replace("b", "B"))
+            self.assertEqual(kings.count(BLUE), 12)
+            self.assertEqual(kings.blue_men, 0)
+            self.assertEqual(kings.count(DARK_PINK), 12)
+            with self.assertRaises(ValueError):
+                parse_position("p.......\n" * 8)  # light square
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a jump chain is one turn, the other side only moves once it's over
+    def test_04_jump_chain_is_one_turn(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: Perft follows a jump chain to its end')
+        position = parse_position("""
+            .......p
+            ........
+            .p.p....
+            ........
+            .p......
+            b.......
+            ........
+            ......b.
+        """)
+        with mock.patch('pygame.time.get_ticks', return_value=0):
+            self.board.load_bitboard(position, BLUE)
+        before = self.board.to_bitboard()
+        first = divide(self.board, 1)
+        second = divide(self.board, 2)
+        counts = [perft(self.board, depth) for depth in range(1, 5)]
+        bit_counts = [perft_bitboard(position, BLUE, depth)
+                      for depth in range(1, 5)]
+        print(f'Turns: {list(first)}')
+        print(f'Counts: {counts}, bitboard: {bit_counts}')
+        try:
+            # the first jump alone isn't a turn, clicking the end square
+            # straight away is one of its own like in the game
+            self.assertNotIn('(5, 0)-(3, 2)', first)
+            self.assertIn('(5, 0)-(3, 2)-(1, 0)', first)
+            self.assertIn('(5, 0)-(1, 0)', first)
+            self.assertEqual(len(first), 6)
+            # after the chain it's pink with its 3 moves, not blue again
+            self.assertEqual(second['(5, 0)-(3, 2)-(1, 4)'], 3)
+            self.assertEqual(counts, bit_counts)
+            self.assertEqual(self.board.to_bitboard(), before)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,10 +1,15 @@
 import unittest
 from unittest import mock
+import subprocess
 import sys
 import os
 
-sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
 
+import pygame
+
+from checkers import pieces, constants
 from checkers.pieces import Pawn, King
 from checkers.constants import BLUE, DARK_PINK
 
@@ -156,9 +161,89 @@ class TestPieces(unittest.TestCase):
         except AssertionError:
             print('Test Failed')
         print('----------------------------------------------------------------------\n\n')
-     
 
+    # each picture is drawn once and then reused for every piece like it
+    def test_07_sprite_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 7: Piece sprites are drawn once and reused')
+        pieces.clear_sprites()
+        window = pygame.Surface((1200, 900))
+        for column in (1, 3, 5):
+            Pawn(5, column, BLUE).draw(window)
+        King(2, 1, BLUE).draw(window)
+        King(2, 3, BLUE).draw_small(window, 930, 264)
+        pawn_sprite, pawn_offset = pieces.piece_sprite(BLUE, False, "board")
+        king_sprite, king_offset = pieces.piece_sprite(BLUE, True, "board")
+        print(f'Sprites drawn: {sorted(key[1:] for key in pieces._sprites)}')
+        print(f'Pawn sprite: {pawn_sprite.get_size()} at {pawn_offset}')
+        print(f'King sprite: {king_sprite.get_size()} at {king_offset}')
+        try:
+            self.assertEqual(len(pieces._sprites), 3)
+            self.assertIs(
+                pieces.piece_sprite(BLUE, False, "board")[0], pawn_sprite
+            )
+            # the crown sticks out of the piece up and to the left
+            self.assertLess(king_offset[0], pawn_offset[0])
+            self.assertLess(king_offset[1], pawn_offset[1])
+            # the piece itself is drawn where it used to be
+            self.assertEqual(window.get_at((Pawn(5, 1, BLUE).x,
+                                            Pawn(5, 1, BLUE).y + 25))[:3],
+                             BLUE)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the crown is only scaled and rotated once for each size and angle
+    def test_08_crown_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 8: Crown transforms are cached')
+        pieces.clear_sprites()
+        with mock.patch('pygame.transform.rotate',
+                        wraps=pygame.transform.rotate) as rotate:
+            first = pieces.crown_image(69)
+            again = pieces.crown_image(69)
+            tilted = pieces.crown_image(69, 45)
+        # the picture is looked up when a crown is made, not at import
+        plain = pygame.Surface((10, 10))
+        plain.fill(BLUE)
+        pieces.clear_sprites()
+        with mock.patch.object(constants, 'CROWN', plain, create=True):
+            swapped = pieces.crown_image(20, 0)
+        pieces.clear_sprites()
+        print(f'rotate calls: {rotate.call_count}')
+        try:
+            self.assertIs(first, again)
+            self.assertIsNot(first, tilted)
+            self.assertEqual(rotate.call_count, 2)
+            self.assertEqual(swapped.get_at((10, 10))[:3], BLUE)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # importing the game's modules must not read the crown from the disk
+    def test_09_import_does_not_load_crown(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 9: Importing the board does not load the crown')
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import checkers.board, checkers.constants as constants;"
+             "print('CROWN' in vars(constants))"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        print(f'crown loaded: {result.stdout.strip().splitlines()[-1:]}')
+        try:
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.strip().splitlines()[-1], "False")
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
 
 
 if __name__ == '__main__':
-    unittest.main()
\ No newline at end of file
+    unittest.main()
@@ -0,0 +1,178 @@
+import unittest
+from unittest import mock
+import sys
+import os
+import csv
+import json
+import tempfile
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from checkers import profiler as profiler_module
+from checkers.profiler import FrameProfiler, PHASES, percentile
+
+
+def fake_clock(*times):
+    # perf_counter_ns that returns the given times one by one
+    return mock.patch('time.perf_counter_ns', side_effect=list(times))
+
+
+class TestProfiler(unittest.TestCase):
+
+    # marks add the time since the last mark to their phase
+    def test_01_phase_times(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Each phase gets the time since the last mark')
+        profiler = FrameProfiler()
+        with fake_clock(0, 30_000_000, 30_500_000, 31_000_000, 33_000_000):
+            profiler.start_frame()
+            profiler.mark('wait')
+            profiler.mark('update_timers')
+            profiler.mark('draw_whole')
+            profiler.mark('update_timers')  # twice a frame adds up
+            record = profiler.end_frame()
+        print(f'Record: {record}')
+        try:
+            self.assertEqual(record['wait'], 30_000_000)
+            self.assertEqual(record['update_timers'], 2_500_000)
+            self.assertEqual(record['draw_whole'], 500_000)
+            self.assertEqual(record['total'], 33_000_000)
+            self.assertEqual(record['work'], 3_000_000)
+            self.assertEqual(record['frame'], 1)
+            self.assertEqual(set(PHASES) - set(record), set())
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # percentiles over the last frames only, in milliseconds
+    def test_02_rolling_percentiles(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Rolling p50, p95 and p99')
+        profiler = FrameProfiler(window=100)
+        for ms in range(1, 151):  # the first 50 frames fall out
+            with fake_clock(0, ms * 1_000_000):
+                profiler.start_frame()
+                profiler.mark('events')
+                profiler.end_frame()
+        p50, p95, p99 = profiler.percentiles('events')
+        print(f'p50 {p50}, p95 {p95}, p99 {p99}')
+        try:
+            self.assertEqual((p50, p95, p99), (100.0, 145.0, 149.0))
+            self.assertEqual(percentile([], 50), 0)
+            self.assertEqual(percentile([7], 99), 7)
+            self.assertEqual(len(profiler.history['events']), 100)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the environment variable picks off, the box only, CSV or JSONL
+    def test_03_output_files(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: CHECKERS_PROFILE and the frame records')
+        with tempfile.TemporaryDirectory() as folder:
+            csv_path = os.path.join(folder, 'frames.csv')
+            jsonl_path = os.path.join(folder, 'frames.jsonl')
+            off = FrameProfiler.from_env({})
+            hud = FrameProfiler.from_env({'CHECKERS_PROFILE': '1'})
+            for path in (csv_path, jsonl_path):
+                profiler = FrameProfiler.from_env({'CHECKERS_PROFILE': path})
+                for frame in range(3):
+                    with fake_clock(0, 1000 * (frame + 1)):
+                        profiler.start_frame()
+                        profiler.mark('display_update')
+                        profiler.end_frame()
+                profiler.close()
+            with open(csv_path, newline='') as f:
+                rows = list(csv.DictReader(f))
+            with open(jsonl_path) as f:
+                records = [json.loads(line) for line in f]
+        print(f'CSV rows: {rows[-1]}')
+        print(f'JSONL records: {records[-1]}')
+        try:
+            self.assertFalse(off.enabled)
+            off.start_frame()
+            off.mark('events')
+            self.assertIsNone(off.end_frame())
+            self.assertTrue(hud.enabled)
+            self.assertIsNone(hud._file)
+            self.assertEqual([row['display_update'] for row in rows],
+                             ['1000', '2000', '3000'])
+            self.assertEqual([r['frame'] for r in records], [1, 2, 3])
+            self.assertEqual(records[2]['total'], 3000)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the box is drawn when its numbers change or the game drew over it
+    def test_04_hud_redraws(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: The box is only drawn when it has to be')
+        pygame.font.init()
+        window = pygame.Surface((400, 400))
+        profiler = FrameProfiler()
+        elsewhere = pygame.Rect(350, 350, 10, 10)
+        refresh = profiler_module.HUD_REFRESH_NS
+        with fake_clock(0, 1, 2, refresh + 5):
+            first = profiler.draw(window, [])
+            idle = profiler.draw(window, [elsewhere])
+            under = profiler.draw(window, [pygame.Rect(20, 20, 5, 5)])
+            later = profiler.draw(window, [])
+        print(f'Box: {profiler.hud_rect}')
+        try:
+            self.assertEqual(first, [profiler.hud_rect])
+            self.assertEqual(idle, [elsewhere])
+            self.assertIn(profiler.hud_rect, under)
+            self.assertEqual(later, [profiler.hud_rect])
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the extra line shows up at once and a disabled profiler ignores it
+    def test_05_note_line(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 5: The note line redraws the box')
+        pygame.font.init()
+        window = pygame.Surface((400, 400))
+        profiler = FrameProfiler()
+        off = FrameProfiler(enabled=False)
+        with fake_clock(0, 1, 2):
+            profiler.draw(window, [])
+            idle = profiler.draw(window, [])
+            profiler.set_note('AI depth 6, 5000 nodes, 40000/s')
+            noted = profiler.draw(window, [])
+        off.set_note('AI depth 6')
+        # the same box without a note, only its last line is different
+        plain = pygame.Surface((400, 400))
+        with fake_clock(0):
+            FrameProfiler().draw(plain, [])
+        line = profiler.hud_rect.copy()
+        line.height = 20
+        line.bottom = profiler.hud_rect.bottom
+        print(f'Note: {profiler.note!r}, box: {profiler.hud_rect}')
+        try:
+            self.assertEqual(idle, [])
+            self.assertEqual(noted, [profiler.hud_rect])
+            self.assertNotEqual(
+                pygame.image.tobytes(window.subsurface(line), 'RGB'),
+                pygame.image.tobytes(plain.subsurface(line), 'RGB'),
+            )
+            self.assertEqual(off.note, '')
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,213 @@
+import unittest
+import subprocess
+import sys
+import os
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.append(ROOT)
+
+from checkers import rules
+from checkers.rules import Checker
+from checkers.constants import BLUE, DARK_PINK, ROWS, COLUMNS
+
+
+def empty_grid():
+    return [[0] * COLUMNS for _ in range(ROWS)]
+
+
+class TestRules(unittest.TestCase):
+
+    # the whole point of the rules module, it must not bring pygame in
+    def test_01_no_pygame_import(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Importing the rules does not import pygame')
+        result = subprocess.run(
+            [sys.executable, "-c",
+             "import sys, checkers.rules, checkers.bitboard;"
+             "print('pygame' in sys.modules)"],
+            cwd=ROOT, capture_output=True, text=True,
+        )
+        print(f'pygame imported: {result.stdout.strip()}')
+        try:
+            self.assertEqual(result.stdout.strip(), "False")
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a pawn reaching the last row is replaced by a king
+    def test_02_promotion(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Pawn is promoted on the last row')
+        grid = empty_grid()
+        pawn = Checker(1, 2, BLUE)
+        grid[1][2] = pawn
+        moved = rules.apply_move(grid, pawn, 0, 1, [])
+        print(f'Piece after move: {moved}')
+        try:
+            self.assertTrue(moved.king)
+            self.assertIs(grid[0][1], moved)
+            self.assertEqual(grid[1][2], 0)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # captured pieces are taken off and the last piece standing wins
+    def test_03_capture_and_winner(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Capturing the last piece wins the game')
+        grid = empty_grid()
+        blue = Checker(5, 2, BLUE)
+        pink = Checker(4, 3, DARK_PINK)
+        grid[5][2] = blue
+        grid[4][3] = pink
+        moves = rules.get_valid_moves(grid, blue)
+        print(f'Moves: {moves}')
+        try:
+            self.assertEqual(moves[(3, 4)], [pink])
+            rules.apply_move(grid, blue, 3, 4, moves[(3, 4)])
+            self.assertEqual(grid[4][3], 0)
+            self.assertEqual(rules.find_winner(grid, DARK_PINK), "Blue")
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a player who can't move on their turn loses
+    def test_04_blocked_player_loses(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: No valid moves loses the game')
+        grid = empty_grid()
+        grid[0][1] = Checker(0, 1, BLUE)  # blue pawn on the top row can't move
+        grid[7][0] = Checker(7, 0, DARK_PINK)
+        winner = rules.find_winner(grid, BLUE)
+        print(f'Winner: {winner}')
+        try:
+            self.assertEqual(winner, "Pink")
+            self.assertIsNone(rules.find_winner(rules.make_grid(), BLUE))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+    # a king going round a ring of pieces both ways ends up with one path
+    def test_05_capture_sequences(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 5: Capture sequences are complete and found once')
+        grid = empty_grid()
+        king = Checker(0, 1, BLUE, king=True)
+        grid[0][1] = king
+        for row, column in [(1, 2), (3, 4), (5, 4), (5, 2), (3, 2)]:
+            grid[row][column] = Checker(row, column, DARK_PINK)
+        sequences = rules.capture_sequences(grid, king)
+        landings = rules.get_capture_moves(grid, king)
+        for route, captured in sequences:
+            print(f'Route: {route}, captured: {len(captured)}')
+        try:
+            # clockwise and anticlockwise round the ring are the same capture
+            self.assertEqual(len(sequences), 1)
+            route, captured = sequences[0]
+            self.assertEqual(route[0], (0, 1))
+            self.assertEqual(route[-1], (2, 3))
+            self.assertEqual(len(captured), 5)
+            self.assertEqual(len(set(captured)), 5)
+            self.assertEqual(len(route), len(captured) + 1)
+            # every landing square of the old search is on the route
+            self.assertEqual(set(route[1:]), set(landings))
+            # pieces that can't capture get nothing
+            self.assertEqual(
+                rules.capture_sequences(grid, grid[5][4]), []
+            )
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the one jump check must agree with the full find_captures search
+    def test_06_has_capture_matches_find_captures(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 6: has_capture agrees with get_capture_moves')
+        grid = rules.make_grid()
+        color = BLUE
+        checked = forced = 0
+        try:
+            for _ in range(80):
+                pieces = rules.get_all_pieces(grid, color)
+                slow = any(rules.get_capture_moves(grid, piece)
+                           for piece in pieces)
+                self.assertEqual(rules.has_capture(grid, pieces), slow)
+                moves = rules.forced_moves(grid, pieces)
+                if slow:
+                    forced += 1
+                    # only captures are left and every capture is there
+                    for piece, piece_moves in moves.items():
+                        self.assertTrue(all(piece_moves.values()))
+                        self.assertEqual(piece_moves,
+                                         rules.get_capture_moves(grid, piece))
+                checked += 1
+                options = [(piece, target, captures)
+                           for piece, piece_moves in moves.items()
+                           for target, captures in piece_moves.items()]
+                if not options:
+                    break
+                piece, (row, col), captures = options[len(options) // 2]
+                rules.apply_move(grid, piece, row, col, captures)
+                color = rules.opponent(color)
+            print(f'Positions checked: {checked}, with forced captures: {forced}')
+            self.assertGreater(forced, 0)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # two ways round a ring reach the same square with the same pieces taken,
+    # the search after that point must only run once
+    def test_07_capture_sequences_prune_transpositions(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 7: Capture search skips jump orders it has seen')
+        grid = empty_grid()
+        king = Checker(0, 1, BLUE, king=True)
+        grid[0][1] = king
+        for row in (1, 3, 5):
+            for column in (2, 4, 6):
+                grid[row][column] = Checker(row, column, DARK_PINK)
+        calls = [0]
+
+        def count_extend(frame, event, arg):
+            if event == 'call' and frame.f_code.co_name == 'extend':
+                calls[0] += 1
+
+        sys.setprofile(count_extend)
+        try:
+            sequences = rules.capture_sequences(grid, king)
+        finally:
+            sys.setprofile(None)
+        ends = [(route[-1], frozenset((piece.row, piece.column)
+                                      for piece in captured))
+                for route, captured in sequences]
+        print(f'extend calls: {calls[0]}, paths: {len(sequences)}')
+        try:
+            # 46 calls when every jump order is searched to the end
+            self.assertEqual(calls[0], 34)
+            self.assertEqual(len(sequences), 4)
+            self.assertEqual(len(set(ends)), 4)
+            longest = max(sequences, key=lambda sequence: len(sequence[1]))
+            self.assertEqual(len(longest[1]), 9)
+            self.assertEqual(longest[0][-1], (6, 7))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,392 @@
+import unittest
+from unittest import mock
+import sys
+import os
+import json
+import datetime
+import tempfile
+import subprocess
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers import stats as stats_module
+from checkers.stats import Stats, SqliteStats, LazyStats, make_stats
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+
+def read_lines(path):
+    with open(path) as f:
+        return [json.loads(line) for line in f]
+
+
+class TestStats(unittest.TestCase):
+
+    def setUp(self):
+        # every test gets its own database folder
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    # each game is one line, the counts come back from the log
+    def test_01_games_in_the_log(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Finished games are logged and counted again')
+        history = Stats(self.folder)
+        when = datetime.datetime(2024, 5, 1, 12, 30)
+        history.record_game('Blue', 95, 41, {'Blue': 7, 'Pink': 2}, when)
+        history.add_win('Pink')
+        history.record_game('Draw')
+        lines = read_lines(history.file)
+        print(f'First line: {lines[0]}')
+        again = Stats(self.folder)
+        try:
+            self.assertEqual(len(lines), 3)
+            self.assertEqual(lines[0]['winner'], 'Blue')
+            self.assertEqual(lines[0]['duration'], 95)
+            self.assertEqual(lines[0]['moves'], 41)
+            self.assertEqual(lines[0]['material'], {'Blue': 7, 'Pink': 2})
+            self.assertEqual(lines[0]['timestamp'], '2024-05-01T12:30:00')
+            self.assertEqual(again.get(), {'Blue': 1, 'Pink': 1})
+            self.assertEqual(again.games, 3)
+            self.assertEqual(again.get_text(), ('W: 1', 'W: 1'))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # stats.txt is read when there's no log, and ends up as its first line
+    def test_02_old_stats_file(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: The old stats.txt becomes the first log line')
+        with open(os.path.join(self.folder, 'stats.txt'), 'w') as f:
+            f.write('4,6')
+        history = Stats(self.folder)
+        nothing_yet = os.path.exists(history.file)
+        history.add_win('Blue')
+        lines = read_lines(history.file)
+        print(f'Log: {lines}')
+        try:
+            self.assertFalse(nothing_yet)
+            self.assertEqual(lines[0], {'type': 'import', 'Blue': 4,
+                                        'Pink': 6})
+            self.assertEqual(history.get(), {'Blue': 5, 'Pink': 6})
+            self.assertEqual(Stats(self.folder).get(), {'Blue': 5, 'Pink': 6})
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a reset is a line too, the games before it stay in the log
+    def test_03_reset(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Reset goes in the log')
+        history = Stats(self.folder)
+        history.add_win('Blue')
+        history.add_win('Blue')
+        history.reset()
+        history.add_win('Pink')
+        again = Stats(self.folder)
+        print(f'After the reset: {again.get()}, lines: {again.lines}')
+        try:
+            self.assertEqual(history.get(), {'Blue': 0, 'Pink': 1})
+            self.assertEqual(again.get(), {'Blue': 0, 'Pink': 1})
+            self.assertEqual(again.lines, 4)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # half a line from a crash is skipped and cut off by the next game
+    def test_04_torn_last_line(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 4: A half written last line is dropped')
+        history = Stats(self.folder)
+        history.add_win('Blue')
+        with open(history.file, 'a') as f:
+            f.write('{"type": "game", "winn')  # the crash
+        after_crash = Stats(self.folder)
+        after_crash.add_win('Pink')
+        lines = read_lines(history.file)
+        print(f'Log: {lines}')
+        try:
+            self.assertFalse(after_crash._torn)
+            self.assertEqual(len(lines), 2)
+            self.assertEqual(Stats(self.folder).get(), {'Blue': 1, 'Pink': 1})
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # with a snapshot only the lines after it are read
+    def test_05_snapshot(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 5: Startup reads the snapshot and the lines after it')
+        with mock.patch.object(stats_module, 'SNAPSHOT_EVERY', 4):
+            history = Stats(self.folder)
+            for winner in ['Blue', 'Pink', 'Blue', 'Blue', 'Pink']:
+                history.add_win(winner)
+        with open(history.snapshot_file) as f:
+            snapshot = json.load(f)
+        # change a line before the snapshot, startup shouldn't see it
+        with open(history.file) as f:
+            text = f.readlines()
+        text[1] = text[1].replace('"Pink"', '"Blue"')
+        with open(history.file, 'w') as f:
+            f.writelines(text)
+        again = Stats(self.folder)
+        print(f'Snapshot: {snapshot}')
+        try:
+            self.assertEqual(snapshot['lines'], 4)
+            self.assertEqual((snapshot['Blue'], snapshot['Pink']), (3, 1))
+            self.assertEqual(again.get(), {'Blue': 3, 'Pink': 2})
+            self.assertEqual(again.lines, 5)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a snapshot that doesn't belong to the log is not used
+    def test_06_bad_snapshot(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 6: Broken or old snapshots fall back to the whole log')
+        history = Stats(self.folder)
+        history.add_win('Blue')
+        history.add_win('Blue')
+        history.save()
+        os.remove(history.file)  # the log is gone, the snapshot isn't
+        fresh = Stats(self.folder)
+        fresh.add_win('Pink')
+        after_new_log = Stats(self.folder).get()
+        with open(history.snapshot_file, 'w') as f:
+            f.write('{"offset": ')
+        after_broken = Stats(self.folder).get()
+        print(f'New log: {after_new_log}, broken snapshot: {after_broken}')
+        try:
+            self.assertEqual(after_new_log, {'Blue': 0, 'Pink': 1})
+            self.assertEqual(after_broken, {'Blue': 0, 'Pink': 1})
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+class TestSqliteStats(unittest.TestCase):
+
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.folder = self.tmp.name
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    # same interface as the log, in a WAL database that keeps the moves
+    def test_07_games_and_moves(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 7: SqliteStats keeps the games, moves and win counts')
+        with open(os.path.join(self.folder, 'stats.txt'), 'w') as f:
+            f.write('2,1')
+        history = SqliteStats(folder=self.folder)
+        steps = [('Blue', (5, 0), (4, 1), 0), ('Pink', (2, 3), (3, 2), 0),
+                 ('Blue', (4, 1), (2, 3), 1)]
+        game = history.record_game('Blue', 30, 3, {'Blue': 12, 'Pink': 11},
+                                   time_control=300, move_list=steps)
+        history.add_win('Pink')
+        mode = history.connection.execute('PRAGMA journal_mode').fetchone()
+        moves = history.connection.execute(
+            'SELECT step, color, from_row, to_column, captures FROM moves '
+            'WHERE game_id = ? ORDER BY step', (game,)
+        ).fetchall()
+        history.close()
+        again = SqliteStats(folder=self.folder)
+        print(f'Moves: {moves}, wins: {again.get()}')
+        try:
+            self.assertEqual(mode, ('wal',))
+            self.assertEqual(moves[2], (2, 'Blue', 4, 3, 1))
+            self.assertEqual(len(moves), 3)
+            self.assertEqual(again.get(), {'Blue': 3, 'Pink': 2})
+            again.reset()
+            again.add_win('Blue')
+            again.close()
+            self.assertEqual(SqliteStats(folder=self.folder).get_text(),
+                             ('W: 1', 'W: 0'))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # the questions about the history, answered with the indexes
+    def test_08_history_queries(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 8: Win rate, game length and time controls')
+        history = SqliteStats(':memory:')
+        start = datetime.datetime(2024, 1, 1)
+        results = ['Blue', 'Pink', 'Draw', 'Blue', 'Blue', 'Pink']
+        for day, winner in enumerate(results):
+            history.record_game(
+                winner, duration=60 * (day + 1), moves=10 + day,
+                when=start + datetime.timedelta(days=day),
+                time_control=180 if day < 3 else 300,
+            )
+        plan = history.connection.execute(
+            'EXPLAIN QUERY PLAN SELECT winner FROM games '
+            'ORDER BY played_at DESC, id DESC LIMIT 3'
+        ).fetchall()
+        print(f'Plan: {plan}')
+        try:
+            self.assertEqual(history.win_rate('Blue'), 0.5)
+            self.assertAlmostEqual(history.win_rate('Blue', last=3), 2 / 3)
+            since = start + datetime.timedelta(days=4)
+            self.assertEqual(history.win_rate('Pink', since=since), 0.5)
+            self.assertEqual(history.average_length(),
+                             {'games': 6, 'duration': 210.0, 'moves': 12.5})
+            controls = history.time_controls()
+            self.assertEqual(
+                [(c['time_control'], c['games'], c['Blue'], c['Draw'])
+                 for c in controls],
+                [(180, 3, 1, 1), (300, 3, 2, 0)],
+            )
+            self.assertIn('games_played_at', str(plan))
+            self.assertIsNone(SqliteStats(':memory:').win_rate('Blue'))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # CHECKERS_STATS picks the backend
+    def test_09_backend_choice(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 9: CHECKERS_STATS=sqlite picks SqliteStats')
+        log = make_stats({}, self.folder)
+        database = make_stats({'CHECKERS_STATS': 'sqlite'}, self.folder)
+        print(f'Backends: {type(log).__name__}, {type(database).__name__}')
+        try:
+            self.assertIsInstance(log, Stats)
+            self.assertIsInstance(database, SqliteStats)
+            self.assertEqual(database.path,
+                             os.path.join(self.folder, 'history.sqlite3'))
+            database.close()
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+class TestLazyStats(unittest.TestCase):
+
+    # importing the game opens nothing
+    def test_10_import_has_no_side_effects(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 10: Importing checkers.board leaves the stats closed')
+        code = ('import checkers.board\n'
+                'from checkers.stats import stats\n'
+                'print(stats.is_open)')
+        result = subprocess.run(
+            [sys.executable, '-c', code], cwd=ROOT, capture_output=True,
+            text=True,
+        )
+        print(f'Open after import: {result.stdout.strip()}')
+        try:
+            self.assertEqual(result.returncode, 0, result.stderr)
+            self.assertEqual(result.stdout.strip().splitlines()[-1], 'False')
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # opened on first use, closed and opened again, in memory
+    def test_11_open_and_close(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 11: The stats open when used and close when told')
+        lazy = LazyStats()
+        closed_at_first = not lazy.is_open
+        with mock.patch.dict(os.environ, {'CHECKERS_STATS': 'memory'}):
+            lazy.add_win('Blue')  # opens the in-memory store
+        first = lazy.get()
+        lazy.close()
+        lazy.open('memory')
+        second = lazy.get()
+        print(f'Before closing: {first}, after: {second}')
+        try:
+            self.assertTrue(closed_at_first)
+            self.assertEqual(first, {'Blue': 1, 'Pink': 0})
+            self.assertEqual(second, {'Blue': 0, 'Pink': 0})
+            self.assertEqual(lazy.path, ':memory:')
+            with self.assertRaises(ValueError):
+                lazy.open('cloud')
+            self.assertFalse(lazy.is_open)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # two games on the same log don't lose or double anything
+    def test_12_shared_log(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 12: Two games writing the same log')
+        with tempfile.TemporaryDirectory() as folder:
+            with open(os.path.join(folder, 'stats.txt'), 'w') as f:
+                f.write('3,3')
+            first = Stats(folder)
+            second = Stats(folder)  # both have stats.txt still to write
+            first.add_win('Blue')
+            second.add_win('Pink')
+            first.add_win('Blue')
+            lines = read_lines(first.file)
+            totals = Stats(folder).get()
+            # the other game's wins show up without it writing anything
+            counts = [first.get(), second.get()]
+        print(f'Log: {[line["type"] for line in lines]}, totals: {totals}')
+        try:
+            self.assertEqual([line['type'] for line in lines],
+                             ['import', 'game', 'game', 'game'])
+            self.assertEqual(totals, {'Blue': 5, 'Pink': 4})
+            self.assertEqual(counts, [totals, totals])
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a database another game writes to shows the same counts, like the log
+    def test_13_shared_database(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 13: Two games writing the same database')
+        with tempfile.TemporaryDirectory() as folder:
+            first = SqliteStats(folder=folder)
+            second = SqliteStats(folder=folder)
+            first.add_win('Blue')
+            first.add_win('Pink')
+            second.add_win('Blue')
+            counts = [first.get(), second.get()]
+            second.reset()
+            first.add_win('Pink')
+            after_reset = [first.get_text(), second.get_text()]
+            first.close()
+            second.close()
+        print(f'Counts: {counts}, after a reset: {after_reset}')
+        try:
+            self.assertEqual(counts, [{'Blue': 2, 'Pink': 1}] * 2)
+            self.assertEqual(after_reset, [('W: 0', 'W: 1')] * 2)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
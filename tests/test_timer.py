@@ -7,6 +7,7 @@ import os
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
 from checkers.timers import GameTimer, PlayerTimer
+from checkers.clock import ManualClock
 
 class TestTimer(unittest.TestCase):
     # initilizies the pygame module before running it    
@@ -148,6 +149,36 @@ class TestTimer(unittest.TestCase):
             print('Test Failed')
         print('----------------------------------------------------------------------\n\n')
 
+    # the player timer counts whole nanoseconds on its clock, thousands of
+    # short turns add up exactly (float seconds would drift)
+    def test_07_player_timer_exact(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 7: Player Timer counts exactly on a clock')
+        clock = ManualClock()
+        timer = PlayerTimer(initial_time=300, clock=clock)
+        for _ in range(10000):  # 10000 turns of 7ms, 3ms for the other side
+            timer.is_active = True
+            clock.advance(7)
+            timer.is_active = False
+            clock.advance(3)
+        print(f'Time left after 10000 turns of 7ms: {timer.time_left}')
+        try:
+            self.assertEqual(timer.ns_left(), 230 * 10**9)
+            self.assertEqual(timer.time_left, 230)
+            timer.is_active = True
+            clock.advance(500)  # the running turn counts when read
+            self.assertEqual(timer.time_left, 229.5)
+            self.assertEqual(timer.format_time(), "03:49")
+            timer.time_left = 1  # setting it works while running too
+            clock.advance(1500)
+            self.assertTrue(timer.is_expired())
+            self.assertEqual(timer.format_time(), "00:00")
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
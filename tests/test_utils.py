@@ -0,0 +1,66 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pygame
+
+from checkers import utils
+from checkers.constants import FONT_NAME, FONT_SIZE, BLUE, WHITE
+
+
+class TestUtils(unittest.TestCase):
+
+    # the same text in the same font and color is only rendered once
+    def test_01_render_text_cache(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Rendered text is cached')
+        pygame.font.init()
+        # a real font that counts its render calls
+        font = mock.Mock(wraps=pygame.font.Font(FONT_NAME, FONT_SIZE))
+        utils.render_text.cache_clear()
+        first = utils.render_text(font, "05:00", True, BLUE)
+        again = utils.render_text(font, "05:00", True, BLUE)
+        white = utils.render_text(font, "05:00", True, WHITE)
+        render = font.render
+        print(f'font.render calls: {render.call_count}')
+        print(f'Cache: {utils.render_text.cache_info()}')
+        try:
+            self.assertIs(first, again)
+            self.assertIsNot(first, white)
+            self.assertEqual(render.call_count, 2)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # overlapping rectangles become one, the others stay as they are
+    def test_02_merge_rects(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Overlapping dirty rectangles are merged')
+        rects = [
+            pygame.Rect(0, 0, 10, 10),
+            pygame.Rect(50, 50, 10, 10),
+            pygame.Rect(5, 5, 10, 10),
+            # touches nothing until the first two are joined
+            pygame.Rect(12, 0, 5, 3),
+        ]
+        merged = utils.merge_rects(rects)
+        print(f'Merged: {merged}')
+        try:
+            self.assertEqual(len(merged), 2)
+            self.assertIn(pygame.Rect(0, 0, 17, 15), merged)
+            self.assertIn(pygame.Rect(50, 50, 10, 10), merged)
+            self.assertEqual(rects[0], pygame.Rect(0, 0, 10, 10))
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,103 @@
+import unittest
+from unittest import mock
+import sys
+import os
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from checkers.board import Board
+from checkers.bitboard import BitBoard, square_index
+from checkers import zobrist
+from checkers.zobrist import TranspositionTable, EXACT
+
+
+class TestZobrist(unittest.TestCase):
+
+    def setUp(self):
+        with mock.patch('pygame.display.set_mode'), \
+             mock.patch('pygame.time.get_ticks', return_value=0):
+            self.board = Board(None)
+
+    def play(self, from_square, to_square):
+        self.board.select_piece(*from_square)
+        self.board.move(*to_square)
+
+    # the key updated move by move must be the same as hashing from scratch
+    def test_01_incremental_key(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 1: Incremental key matches a full hash')
+        moves = [((5, 2), (4, 3)), ((2, 5), (3, 4)), ((4, 3), (2, 5))]
+        try:
+            for from_square, to_square in moves:
+                self.play(from_square, to_square)
+                full = zobrist.hash_grid(self.board.board, self.board.turn)
+                print(f'After {from_square}->{to_square}: {self.board.key:#x}')
+                self.assertEqual(self.board.key, full)
+
+            # make_move / unmake_move keep it in step as well
+            key = self.board.key
+            piece = [p for p in self.board.get_all_pieces(self.board.turn)
+                     if self.board.get_valid_moves(p)][0]
+            target = next(iter(self.board.get_valid_moves(piece)))
+            self.board.make_move(piece, *target)
+            self.assertEqual(
+                self.board.key,
+                zobrist.hash_grid(self.board.board, self.board.turn),
+            )
+            self.board.unmake_move()
+            self.assertEqual(self.board.key, key)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # a deeper result is not replaced by a shallower one of another position
+    def test_02_depth_preferred_replacement(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 2: Transposition table keeps the deeper entry')
+        table = TranspositionTable(size=4)
+        deep_key, other_key = 0x10, 0x20  # both land on slot 0
+        table.store(deep_key, 5, 42, EXACT)
+        stored = table.store(other_key, 2, 7, EXACT)
+        print(f'Shallow entry stored: {stored}, table size: {table.size}')
+        try:
+            self.assertFalse(stored)
+            self.assertEqual(table.probe(deep_key).score, 42)
+            self.assertIsNone(table.probe(other_key))
+            self.assertTrue(table.store(other_key, 6, 9, EXACT))
+            self.assertEqual(table.probe(other_key).score, 9)
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+    # kings going back and forth make the same position come up three times
+    def test_03_threefold_repetition(self):
+        print('\n\n----------------------------------------------------------------------')
+        print('Test Case 3: Threefold repetition is a draw')
+        self.board.load_bitboard(BitBoard(
+            blue_kings=1 << square_index(5, 0),
+            pink_kings=1 << square_index(2, 7),
+        ))
+        shuffle = [((5, 0), (4, 1)), ((2, 7), (3, 6)),
+                   ((4, 1), (5, 0)), ((3, 6), (2, 7))]
+        try:
+            for from_square, to_square in shuffle:
+                self.play(from_square, to_square)
+            self.assertEqual(self.board.status, "playing")
+            for from_square, to_square in shuffle:
+                self.play(from_square, to_square)
+            print(f'Status: {self.board.status}, winner: {self.board.winner}')
+            self.assertEqual(self.board.status, "game_over")
+            self.assertEqual(self.board.winner, "Draw")
+            print('Test Passed')
+        except AssertionError:
+            print('Test Failed')
+            raise
+        print('----------------------------------------------------------------------\n\n')
+
+
+if __name__ == '__main__':
+    unittest.main()